@@ -9,12 +9,14 @@ from agents.matmaster_agent.callback import (
     matmaster_set_lang,
     matmaster_use_quota,
 )
+from agents.matmaster_agent.config import WARM_UP_AGENTS
 from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
 from agents.matmaster_agent.flow_agents.agent import MatMasterFlowAgent
 from agents.matmaster_agent.llm_config import (
     MatMasterLlmConfig,
 )
 from agents.matmaster_agent.logger import setup_global_logger
+from agents.matmaster_agent.sub_agents.mapping import warm_up_agents
 
 logging.getLogger('google_adk.google.adk.tools.base_authenticated_tool').setLevel(
     logging.ERROR
@@ -37,6 +39,7 @@ def init_matmaster_agent() -> LlmAgent:
         after_agent_callback=matmaster_use_quota,
     )
     track_adk_agent_recursive(matmaster_agent, MatMasterLlmConfig.opik_tracer)
+    warm_up_agents(WARM_UP_AGENTS)
 
     return matmaster_agent
 
@@ -6,7 +6,6 @@ import traceback
 from functools import wraps
 from typing import Optional, Union
 
-import tiktoken
 from deepdiff import DeepDiff
 from dp.agent.adapter.adk import CalculationMCPTool
 from google.adk.agents.callback_context import CallbackContext
@@ -48,6 +47,7 @@ from agents.matmaster_agent.utils.helper_func import (
     update_llm_response,
 )
 from agents.matmaster_agent.utils.io_oss import update_tgz_dict
+from agents.matmaster_agent.utils.token_utils import latest_contents_within_limit
 from agents.matmaster_agent.utils.tool_response_utils import check_valid_tool_response
 
 logger = logging.getLogger(__name__)
@@ -71,35 +71,22 @@ def filter_safety_content(func: BeforeModelCallback) -> BeforeModelCallback:
         # 先调用被装饰的 before_model_callback
         await func(callback_context, llm_request)
 
-        contents = []
-        index = 0
-        record_tokens = 0
-        encoding = tiktoken.encoding_for_model('gpt-4')
         logger.info(
             f'{callback_context.session.id} {callback_context.agent_name} Prepare Filter Content, len = {len(llm_request.contents)}'
         )
-        for index, content in enumerate(llm_request.contents[::-1]):
-            current_tokens = 0
-            for part in content.parts:
-                if part.text:
-                    current_tokens += len(encoding.encode(part.text))
-                elif part.function_call:
-                    current_tokens += len(encoding.encode(str(part.function_call.args)))
-                elif part.function_response:
-                    current_tokens += len(
-                        encoding.encode(str(part.function_response.response))
-                    )
-            if record_tokens + current_tokens < MAX_TOKENS_LIMIT:
-                record_tokens += current_tokens
-                contents.insert(0, content)
-            else:
-                logger.warning(
-                    f'{callback_context.session.id} {callback_context.agent_name} Content too long, use latest {index+1} part'
-                )
-                break
+        kept, record_tokens = latest_contents_within_limit(
+            llm_request.contents,
+            MAX_TOKENS_LIMIT,
+            history_key=(callback_context.session.id, callback_context.agent_name),
+        )
+        if kept < len(llm_request.contents):
+            logger.warning(
+                f'{callback_context.session.id} {callback_context.agent_name} Content too long, use latest {kept+1} part'
+            )
+        contents = llm_request.contents[len(llm_request.contents) - kept :]
 
         logger.info(
-            f'{callback_context.session.id} {callback_context.agent_name} index={index}, record_tokens = {record_tokens}'
+            f'{callback_context.session.id} {callback_context.agent_name} kept={kept}, record_tokens = {record_tokens}'
         )
 
         if not contents:
@@ -115,15 +102,6 @@ def filter_safety_content(func: BeforeModelCallback) -> BeforeModelCallback:
     return wrapper
 
 
-async def inject_function_declarations(
-    callback_context: CallbackContext, llm_request: LlmRequest
-) -> Optional[LlmResponse]:
-    callback_context.state['function_declarations'] = [
-        item.to_json_dict()
-        for item in llm_request.config.tools[0].function_declarations
-    ]
-
-
 # after_model_callback
 async def default_after_model_callback(
     callback_context: CallbackContext, llm_response: LlmResponse
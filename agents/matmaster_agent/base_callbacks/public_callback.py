@@ -1,8 +1,12 @@
+import asyncio
 import json
 import logging
+import time
 import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, Type
+from typing import Awaitable, Callable, Optional, Type
 
 import litellm
 from google.adk.agents.callback_context import CallbackContext
@@ -10,14 +14,111 @@ from google.adk.agents.llm_agent import AfterModelCallback
 from google.adk.models import LlmResponse
 from google.genai.types import FunctionCall, Part
 
+from agents.matmaster_agent.config import (
+    TRANSFER_CHECK_CACHE_SIZE,
+    TRANSFER_CHECK_CACHE_TTL,
+)
 from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
 from agents.matmaster_agent.utils.llm_response_utils import has_function_call
 from agents.matmaster_agent.utils.model_utils import create_transfer_check_model
 
 logger = logging.getLogger(__name__)
 
+# (llm_prompt, 候选 agent)
+_TransferKey = tuple[str, tuple[str, ...]]
+
+
+@dataclass(frozen=True, slots=True)
+class _CachedTransferCheck:
+    result: dict
+    expires_at: float
+
+
+_transfer_cache: OrderedDict[_TransferKey, _CachedTransferCheck] = OrderedDict()
+_transfer_inflight: dict[_TransferKey, asyncio.Future] = {}
+_stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'fast_path': 0}
+
+
+def transfer_check_stats() -> dict[str, int]:
+    return {**_stats, 'size': len(_transfer_cache)}
+
+
+def clear_transfer_check_cache() -> None:
+    _transfer_cache.clear()
+
+
+def _transfer_target(llm_response: LlmResponse) -> Optional[str]:
+    for part in llm_response.content.parts:
+        if part.function_call and part.function_call.name == 'transfer_to_agent':
+            return str((part.function_call.args or {}).get('agent_name', ''))
+    return None
+
+
+async def _judge_transfer(
+    key: _TransferKey,
+    response_format,
+    completion: Callable[..., Awaitable],
+) -> Optional[dict]:
+    """LLM 判定结果，相同 prompt 与候选 agent 的判定在 TTL 内复用；失败返回 None"""
+    entry = _transfer_cache.get(key)
+    if entry is not None and entry.expires_at > time.monotonic():
+        _stats['hits'] += 1
+        _transfer_cache.move_to_end(key)
+        return dict(entry.result)
+
+    inflight = _transfer_inflight.get(key)
+    if inflight is not None:
+        _stats['coalesced'] += 1
+        result = await asyncio.shield(inflight)
+        return dict(result) if result is not None else None
+
+    _stats['misses'] += 1
+    future = asyncio.get_running_loop().create_future()
+    _transfer_inflight[key] = future
+    result = None
+    try:
+        response = await completion(
+            model='azure/gpt-4o',
+            messages=[{'role': 'user', 'content': key[0]}],
+            response_format=response_format,
+        )
+        if (
+            response
+            and response.choices
+            and response.choices[0]
+            and response.choices[0].message
+            and response.choices[0].message.content
+        ):
+            result = json.loads(response.choices[0].message.content)
+            _transfer_cache[key] = _CachedTransferCheck(
+                result, time.monotonic() + TRANSFER_CHECK_CACHE_TTL
+            )
+            _transfer_cache.move_to_end(key)
+            while len(_transfer_cache) > TRANSFER_CHECK_CACHE_SIZE:
+                _transfer_cache.popitem(last=False)
+        else:
+            logger.warning(
+                f'[{MATMASTER_AGENT_NAME}]:[check_transfer] LLM completion error, response = {response}'
+            )
+    finally:
+        # 失败（含取消）不缓存，等待中的相同请求拿到 None
+        del _transfer_inflight[key]
+        future.set_result(result)
+    return dict(result) if result is not None else None
+
+
+def check_transfer(
+    prompt: str,
+    target_agent_enum: Type[Enum],
+    completion: Optional[Callable[..., Awaitable]] = None,
+) -> AfterModelCallback:
+    """
+    ``completion`` defaults to litellm.acompletion (looked up per call), and
+    can be replaced by any async function with the same signature.
+    """
+    candidates = tuple(str(member.value) for member in target_agent_enum)
+    response_format = create_transfer_check_model(target_agent_enum)
 
-def check_transfer(prompt: str, target_agent_enum: Type[Enum]) -> AfterModelCallback:
     async def wrapper(
         callback_context: CallbackContext, llm_response: LlmResponse
     ) -> Optional[LlmResponse]:
@@ -32,33 +133,30 @@ def check_transfer(prompt: str, target_agent_enum: Type[Enum]) -> AfterModelCall
         ):
             return None
 
-        llm_prompt = prompt.format(response_text=llm_response.content.parts[0].text)
-        response = litellm.completion(
-            model='azure/gpt-4o',
-            messages=[{'role': 'user', 'content': llm_prompt}],
-            response_format=create_transfer_check_model(target_agent_enum),
+        symbol_name = (
+            f"[{callback_context.agent_name.replace('_agent', '')}_check_transfer]"
         )
-
-        if (
-            response
-            and response.choices
-            and response.choices[0]
-            and response.choices[0].message
-            and response.choices[0].message.content
-        ):
-            result: dict = json.loads(response.choices[0].message.content)
-        else:
-            logger.warning(
-                f'[{MATMASTER_AGENT_NAME}]:[check_transfer] LLM completion error, response = {response}'
+        # 模型已调用 transfer_to_agent 且目标合法，无需 LLM 判定
+        called_target = _transfer_target(llm_response)
+        if called_target in candidates:
+            _stats['fast_path'] += 1
+            logger.info(
+                f'[{MATMASTER_AGENT_NAME}]:[check_transfer] {symbol_name} target_agent = {called_target}, fast path'
             )
+            return None
+
+        llm_prompt = prompt.format(response_text=llm_response.content.parts[0].text)
+        result = await _judge_transfer(
+            (llm_prompt, candidates),
+            response_format,
+            completion or litellm.acompletion,
+        )
+        if result is None:
             return
 
         is_transfer = bool(result.get('is_transfer', False))
         target_agent = str(result.get('target_agent', ''))
         reason = str(result.get('reason', ''))
-        symbol_name = (
-            f"[{callback_context.agent_name.replace('_agent', '')}_check_transfer]"
-        )
         logger.info(
             f"[{MATMASTER_AGENT_NAME}]:[check_transfer] {symbol_name} target_agent = {target_agent}, is_transfer = {is_transfer}, "
             f"response_text = {llm_response.content.parts[0].text}, reason = {reason}"
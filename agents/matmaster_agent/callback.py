@@ -19,6 +19,7 @@ from agents.matmaster_agent.prompt import get_user_content_lang
 from agents.matmaster_agent.services.quota import check_quota_service, use_quota_service
 from agents.matmaster_agent.state import ERROR_DETAIL, ERROR_OCCURRED, PLAN, UPLOAD_FILE
 from agents.matmaster_agent.utils.helper_func import get_user_id
+from agents.matmaster_agent.utils.lang_utils import detect_language
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -133,12 +134,9 @@ async def matmaster_prepare_state(
     )
 
 
-async def matmaster_set_lang(
-    callback_context: CallbackContext,
-) -> Optional[types.Content]:
-    user_content = callback_context.user_content.parts[0].text
+async def _llm_detect_language(user_content: str) -> str:
     prompt = get_user_content_lang().format(user_content=user_content)
-    response = litellm.completion(
+    response = await litellm.acompletion(
         model='azure/gpt-4o',
         messages=[{'role': 'user', 'content': prompt}],
         response_format=UserContent,
@@ -147,10 +145,21 @@ async def matmaster_set_lang(
         result: dict = json.loads(response.choices[0].message.content)
     except BaseException:
         result = {}
+    logger.info(f'[{MATMASTER_AGENT_NAME}] llm language result = {result}')
+    return str(result.get('language', 'zh'))
+
+
+async def matmaster_set_lang(
+    callback_context: CallbackContext,
+) -> Optional[types.Content]:
+    user_content = callback_context.user_content.parts[0].text
+    language = detect_language(user_content)
+    if language is None:
+        # 本地无法判定（中英混杂、无有效字符）时才请求 LLM
+        language = await _llm_detect_language(user_content)
     logger.info(
-        f"[{MATMASTER_AGENT_NAME}]:[{inspect.currentframe().f_code.co_name}] result = {result}"
+        f"[{MATMASTER_AGENT_NAME}]:[{inspect.currentframe().f_code.co_name}] language = {language}"
     )
-    language = str(result.get('language', 'zh'))
     callback_context.state['target_language'] = language
     if callback_context.state['target_language'] in [
         'Chinese',
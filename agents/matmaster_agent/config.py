@@ -2,3 +2,62 @@ USE_PHOTON = False
 USER_DIRECT_CONSUME = False
 MAX_TOKENS_LIMIT = 128000
 MAX_TOOL_RETRIES = 2
+# 同一计划中可同时处于 submitted 状态（Bohrium 任务并行运行）的步骤上限
+MAX_PARALLEL_PLAN_STEPS = 3
+
+# Shared HTTP client (services/http_client.py)
+HTTP_POOL_LIMIT = 100
+HTTP_POOL_LIMIT_PER_HOST = 20
+HTTP_KEEPALIVE_TIMEOUT = 30
+HTTP_DNS_CACHE_TTL = 300
+# 任务结果文件并发下载/上传数（services/job.parse_and_prepare_results）
+RESULT_FILE_CONCURRENCY = 4
+# OSS 流式上传（utils/io_oss.py）：超过一个分片的对象走分片上传
+OSS_PART_SIZE = 8 * 1024 * 1024
+OSS_UPLOAD_PARALLEL = 4
+# toolset 函数声明缓存时间（秒），见 utils/tool_declarations.py
+TOOL_DECLARATIONS_TTL = 600
+# ResultMCPAgent 并发查询任务状态/准备结果的任务数
+JOB_POLL_CONCURRENCY = 8
+# 后台任务状态监控（services/job_watcher.py）：状态不变时间隔按倍数退避
+JOB_WATCH_MIN_INTERVAL = 5
+JOB_WATCH_MAX_INTERVAL = 120
+JOB_WATCH_BACKOFF = 1.5
+JOB_WATCH_CONCURRENCY = 8
+JOB_WATCH_CACHE_SIZE = 4096
+# memory_retrieve 结果缓存（services/memory.py），memory_write 成功后按会话失效
+MEMORY_RETRIEVE_CACHE_TTL = 300
+MEMORY_RETRIEVE_CACHE_SIZE = 1024
+# 后台批量写入记忆（services/memory_queue.py）：攒够一批或等待超时即写入，
+# 写入失败/积压过多时落盘，之后重试
+MEMORY_WRITE_BATCH_SIZE = 16
+MEMORY_WRITE_FLUSH_INTERVAL = 2.0
+MEMORY_WRITE_CONCURRENCY = 4
+MEMORY_WRITE_RETRY_MAX = 60
+# 每个队列实际写入 memory_write_spool.<pid>-<随机串>.jsonl，启动后认领已退出进程留下的文件
+MEMORY_WRITE_SPOOL_FILE = './tmp/memory_write_spool.jsonl'
+# ICL 示例检索（services/icl.py）：等待服务的延迟预算（秒），超出即用兜底示例
+ICL_LATENCY_BUDGET = 2.0
+ICL_CACHE_TTL = 1800
+ICL_CACHE_SIZE = 512
+# 'remote': ICL 服务；'local': 进程内 BM25 检索（services/icl_local.py），
+# remote 超时/出错时也先用本地检索结果兜底
+ICL_BACKEND = 'remote'
+ICL_LOCAL_INDEX_FILE = './tmp/icl_index.json'
+ICL_LOCAL_TOP_K = 3
+# 会话文件索引（services/session_files.py）：超过 TTL 后先用旧索引，后台刷新
+SESSION_FILE_INDEX_TTL = 300
+SESSION_FILE_INDEX_SIZE = 2048
+# 动态 pydantic schema 缓存（utils/schema_cache.py）：按规格摘要缓存的模型数上限
+SCHEMA_CACHE_SIZE = 256
+# update_state_event 事件 author 标注调用处 文件名:行号；关闭时 author 为 agent 名
+EVENT_CALLER_ATTRIBUTION = True
+# check_transfer（base_callbacks/public_callback.py）判定结果缓存，按 prompt 与候选 agent
+TRANSFER_CHECK_CACHE_TTL = 600
+TRANSFER_CHECK_CACHE_SIZE = 1024
+# 步骤标题由模板生成（flow_agents/step_title_agent/title.py）；开启时另在后台请求 LLM 标题
+# （每步一次模型调用），返回后替换 step_title 并更新步骤开始卡片，步骤执行不等待
+STEP_TITLE_LLM_REFINE = False
+
+# 启动时预加载的子 agent（sub_agents/mapping.py 默认按需 import）
+WARM_UP_AGENTS = []
@@ -1,4 +1,3 @@
-import copy
 import logging
 from typing import Any, AsyncGenerator, Optional, cast
 
@@ -41,6 +40,7 @@ from agents.matmaster_agent.core_agents.base_agents.error_agent import (
     ErrorHandleLlmAgent,
 )
 from agents.matmaster_agent.flow_agents.model import PlanStepStatusEnum
+from agents.matmaster_agent.flow_agents.plan_state import with_step_fields
 from agents.matmaster_agent.locales import i18n
 from agents.matmaster_agent.logger import PrefixFilter
 from agents.matmaster_agent.memory.inject_memory_callback import (
@@ -272,10 +272,11 @@ class MCPRunEventsMixin(BaseMixin):
                             ctx, self.name, '工具参数无变化，本次跳过执行', ModelRole
                         ):
                             yield _info_event
-                        update_plan = copy.deepcopy(ctx.session.state['plan'])
-                        update_plan['steps'][ctx.session.state['plan_index']][
-                            'status'
-                        ] = PlanStepStatusEnum.FAILED
+                        update_plan = with_step_fields(
+                            ctx.session.state['plan'],
+                            ctx.session.state['plan_index'],
+                            status=PlanStepStatusEnum.FAILED,
+                        )
                         yield update_state_event(ctx, state_delta={'plan': update_plan})
                 else:
                     yield event
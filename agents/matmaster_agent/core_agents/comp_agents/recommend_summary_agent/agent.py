@@ -1,6 +1,6 @@
 import copy
 import logging
-from typing import AsyncGenerator, List, Optional, Union, override
+from typing import AsyncGenerator, Optional, Union, override
 
 from google.adk.agents import InvocationContext
 from google.adk.agents.llm_agent import (
@@ -8,13 +8,12 @@ from google.adk.agents.llm_agent import (
     AfterToolCallback,
     BeforeToolCallback,
 )
+from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.events import Event
 from google.adk.models import BaseLlm
-from google.genai.types import FunctionDeclaration
 from pydantic import computed_field
 
 from agents.matmaster_agent.base_callbacks.private_callback import (
-    inject_function_declarations,
     remove_function_call,
 )
 from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME, ModelRole
@@ -50,9 +49,6 @@ from agents.matmaster_agent.core_agents.comp_agents.recommend_summary_agent.tool
     update_tool_call_info_with_function_declarations,
     update_tool_call_info_with_recommend_params,
 )
-from agents.matmaster_agent.core_agents.comp_agents.tool_connect_agent import (
-    ToolConnectAgent,
-)
 from agents.matmaster_agent.flow_agents.model import PlanStepStatusEnum
 from agents.matmaster_agent.llm_config import MatMasterLlmConfig
 from agents.matmaster_agent.locales import i18n
@@ -69,6 +65,7 @@ from agents.matmaster_agent.utils.event_utils import (
     context_function_event,
     update_state_event,
 )
+from agents.matmaster_agent.utils.tool_declarations import get_function_declarations
 
 logger = logging.getLogger(__name__)
 logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
@@ -89,14 +86,6 @@ class BaseAgentWithRecAndSum(
     def _after_init(self):
         agent_prefix = self.name.replace('_agent', '')
 
-        self._tool_connect_agent = ToolConnectAgent(
-            model=self.model,
-            name=f"{agent_prefix}_tool_connect_agent",
-            tools=self.tools,
-            before_model_callback=inject_function_declarations,
-            after_model_callback=remove_function_call,
-        )
-
         self._tool_call_info_agent = DisallowTransferAndContentLimitSchemaAgent(
             model=MatMasterLlmConfig.tool_schema_model,
             name=f"{agent_prefix}_tool_call_info_agent",
@@ -139,7 +128,6 @@ class BaseAgentWithRecAndSum(
             )
 
         self.sub_agents = [
-            self.tool_connect_agent,
             self.tool_call_info_agent,
             self.recommend_params_agent,
             self.recommend_params_schema_agent,
@@ -148,11 +136,6 @@ class BaseAgentWithRecAndSum(
 
         return self
 
-    @computed_field
-    @property
-    def tool_connect_agent(self) -> ToolConnectAgent:
-        return self._tool_connect_agent
-
     @computed_field
     @property
     def tool_call_info_agent(self) -> DisallowTransferAndContentLimitSchemaAgent:
@@ -183,14 +166,15 @@ class BaseAgentWithRecAndSum(
         ]
         current_step_tool_name = current_step['tool_name']
 
-        # 连接 tool-server，获取doc和函数声明
-        async for tool_connect_evenet in self.tool_connect_agent.run_async(ctx):
-            yield tool_connect_evenet
+        # 直接从 toolset 获取函数声明（按 toolset 缓存），无需 LLM 调用
+        function_declarations = await get_function_declarations(
+            self.tools, ReadonlyContext(ctx)
+        )
+        yield update_state_event(
+            ctx, state_delta={'function_declarations': function_declarations}
+        )
 
         # 根据用户问题先推荐一轮
-        function_declarations: List[FunctionDeclaration] = ctx.session.state[
-            'function_declarations'
-        ]
         logger.info(
             f'{ctx.session.id} function_declarations = {function_declarations}, current_step_tool_name = {current_step_tool_name}'
         )
@@ -6,6 +6,7 @@ from pydantic import BaseModel, Field, create_model
 
 from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
 from agents.matmaster_agent.logger import PrefixFilter
+from agents.matmaster_agent.utils.schema_cache import CachedSchemaModel, cached_models
 
 GENAI_TYPE_TO_PYDANTIC_MAPPING = {
     types.Type.NUMBER: float,
@@ -96,13 +97,26 @@ def get_field_type(field: Dict[str, Any]) -> Any:
 
 def create_tool_args_schema(missing_tool_args, function_declaration):
     properties = function_declaration[0]['parameters']['properties']
-    fields = {}
-
+    missing_tool_args = tuple(missing_tool_args)
     for field_name in missing_tool_args:
         if field_name not in properties:
             logger.warning(f'{field_name} Not In Properties')
-            continue
-        field_schema = properties[field_name]
+    # 只有缺失参数及其声明影响生成的模型，以此作为缓存键
+    arg_specs = {
+        name: properties[name] for name in missing_tool_args if name in properties
+    }
+
+    DynamicToolArgsSchema, ToolSchema = cached_models(
+        ['tool_args', missing_tool_args, arg_specs],
+        lambda: _build_tool_args_schema(missing_tool_args, arg_specs),
+    )
+    logger.info(f'DynamicToolArgsSchema = {DynamicToolArgsSchema.model_json_schema()}')
+    return DynamicToolArgsSchema, ToolSchema
+
+
+def _build_tool_args_schema(missing_tool_args: tuple, arg_specs: dict):
+    fields = {}
+    for field_name, field_schema in arg_specs.items():
         field_type = get_field_type(field_schema)
         field_kwargs = get_field_kwargs(field_schema)
 
@@ -111,16 +125,18 @@ def create_tool_args_schema(missing_tool_args, function_declaration):
     DynamicToolArgsSchema = create_model(
         'DynamicToolArgsSchema',
         **fields,
-        __base__=BaseModel,
+        __base__=CachedSchemaModel,
     )
-    logger.info(f'DynamicToolArgsSchema = {DynamicToolArgsSchema.model_json_schema()}')
 
     ToolSchema = create_model(
         'ToolSchema',
         tool_name=(str, Field(...)),
         tool_args=(DynamicToolArgsSchema, ...),
-        missing_tool_args=(List[str], Field(default_factory=lambda: missing_tool_args)),
-        __base__=BaseModel,
+        missing_tool_args=(
+            List[str],
+            Field(default_factory=lambda: list(missing_tool_args)),
+        ),
+        __base__=CachedSchemaModel,
     )
 
     return DynamicToolArgsSchema, ToolSchema
@@ -1,8 +1,9 @@
-import copy
+import asyncio
 import json
 import logging
 import os
-from typing import Any, AsyncGenerator, override
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Optional, override
 
 from google.adk.agents import InvocationContext
 from google.adk.events import Event
@@ -12,6 +13,7 @@ from agents.matmaster_agent.base_callbacks.private_callback import (
     _inject_ak,
     _inject_projectId,
 )
+from agents.matmaster_agent.config import JOB_POLL_CONCURRENCY
 from agents.matmaster_agent.constant import (
     FRONTEND_STATE_KEY,
     JOB_RESULT_KEY,
@@ -25,12 +27,18 @@ from agents.matmaster_agent.core_agents.base_agents.mcp_agent import MCPAgent
 from agents.matmaster_agent.core_agents.public_agents.job_agents.result_core_agent.prompt import (
     ResultCoreAgentDescription,
 )
+from agents.matmaster_agent.flow_agents.plan_state import (
+    with_entry_fields,
+    with_step_fields,
+)
 from agents.matmaster_agent.logger import PrefixFilter
 from agents.matmaster_agent.services.job import (
     get_job_detail,
     parse_and_prepare_err,
     parse_and_prepare_results,
 )
+from agents.matmaster_agent.services.job_watcher import get_job_watcher
+from agents.matmaster_agent.services.session_files import SessionFileBatch
 from agents.matmaster_agent.utils.event_utils import (
     all_text_event,
     context_function_event,
@@ -54,6 +62,15 @@ logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
 logger.setLevel(logging.INFO)
 
 
+@dataclass(frozen=True, slots=True)
+class _JobUpdate:
+    """轮询一个任务产生的进展：先是状态，任务结束后再是解析好的结果"""
+
+    origin_job_id: str
+    status: str
+    job_result: Optional[list] = None
+
+
 class ResultMCPAgent(MCPAgent):
     @model_validator(mode='before')
     @classmethod
@@ -66,6 +83,168 @@ class ResultMCPAgent(MCPAgent):
 
         return data
 
+    async def _prepare_job_result(
+        self,
+        ctx: InvocationContext,
+        job_id: str,
+        status: str,
+        access_key: str,
+        file_batch: Optional[SessionFileBatch] = None,
+    ) -> list:
+        if status == 'Failed':  # Job Failed
+            dict_result = await parse_and_prepare_err(
+                job_id=job_id, access_key=access_key
+            )
+        else:  # Job Success
+            dict_result = await parse_and_prepare_results(
+                job_id=job_id, access_key=access_key
+            )
+        logger.info(f"{ctx.session.id} dict_result = {dict_result}")
+
+        if self.enable_tgz_unpack:
+            tgz_flag, new_tool_result = await update_tgz_dict(
+                dict_result, session_id=ctx.session.id
+            )
+        else:
+            new_tool_result = dict_result
+        parsed_tool_result = await parse_result(ctx, new_tool_result, file_batch)
+        logger.info(f'{ctx.session.id} parsed_tool_result = {parsed_tool_result}')
+        return parsed_tool_result
+
+    async def _poll_jobs(
+        self, ctx: InvocationContext, jobs: list[tuple[str, str]], access_key: str
+    ) -> AsyncGenerator[_JobUpdate, None]:
+        """
+        并发查询 ``jobs``（origin_job_id, job_id）的状态并准备已结束任务的结果，
+        最多 JOB_POLL_CONCURRENCY 个任务同时进行；每个进展一出现就 yield，
+        顺序取决于完成先后。单个任务出错只记日志，不影响其他任务，下一轮会重试。
+        各任务的结果文件汇总后，在本轮结束时一次写入会话文件。
+        """
+        queue: asyncio.Queue[Optional[_JobUpdate]] = asyncio.Queue()
+        semaphore = asyncio.Semaphore(JOB_POLL_CONCURRENCY)
+        watcher = get_job_watcher()
+        file_batch = SessionFileBatch(ctx.session.id)
+
+        async def poll(origin_job_id: str, job_id: str):
+            try:
+                async with semaphore:
+                    # 后台 watcher 已确认结束的任务无需再查询
+                    status = watcher.terminal_status(job_id)
+                    if status is None:
+                        query_res = await get_job_detail(
+                            job_id=job_id, access_key=access_key
+                        )
+                        status = mapping_status(
+                            query_res.get('data', {}).get('status', -999)
+                        )
+                    logger.info(
+                        f'{ctx.session.id} origin_job_id = {origin_job_id}, '
+                        f'status = {status}'
+                    )
+                    await queue.put(_JobUpdate(origin_job_id, status))
+                    if status == 'Running':
+                        # 例如服务重启后的旧任务，交给 watcher 继续跟踪
+                        watcher.watch(job_id, access_key, ctx.session.id, origin_job_id)
+                        return
+
+                    job_result = await self._prepare_job_result(
+                        ctx, job_id, status, access_key, file_batch
+                    )
+                    await queue.put(_JobUpdate(origin_job_id, status, job_result))
+            except Exception:
+                logger.exception(
+                    f'{ctx.session.id} polling origin_job_id = {origin_job_id} failed'
+                )
+            finally:
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(poll(*job)) for job in jobs]
+        try:
+            pending = len(tasks)
+            while pending:
+                update = await queue.get()
+                if update is None:
+                    pending -= 1
+                    continue
+                yield update
+        finally:
+            for task in tasks:
+                task.cancel()
+            try:
+                await file_batch.flush()
+            except Exception:
+                logger.exception(f'{ctx.session.id} register result files failed')
+
+    async def _render_job_result(
+        self, ctx: InvocationContext, parsed_tool_result: list
+    ) -> AsyncGenerator[Event, None]:
+        job_result_comp_data = get_kv_result(parsed_tool_result)
+        for event in all_text_event(
+            ctx,
+            self.name,
+            f"<bohrium-chat-msg>{json.dumps(job_result_comp_data)}</bohrium-chat-msg>",
+            ModelRole,
+        ):
+            yield event
+
+        # 渲染 Markdown 图片
+        markdown_image_result = get_markdown_image_result(parsed_tool_result)
+        if markdown_image_result:
+            for item in markdown_image_result:
+                for markdown_image_event in all_text_event(
+                    ctx, self.name, item['data'], ModelRole
+                ):
+                    yield markdown_image_event
+
+        # 渲染 Matrix 结果
+        matrix_result = get_matrix_result(parsed_tool_result)
+        if matrix_result:
+            for item in matrix_result:
+                for markdown_matrix_event in all_text_event(
+                    ctx,
+                    self.name,
+                    matrix_to_markdown_table(item),
+                    ModelRole,
+                ):
+                    yield markdown_matrix_event
+
+        # 渲染 echarts
+        echarts_result = get_echarts_result(parsed_tool_result)
+        if echarts_result:
+            for echarts_event in context_function_event(
+                ctx,
+                self.name,
+                'matmaster_echarts',
+                None,
+                ModelRole,
+                {'echarts_url': [item['url'] for item in echarts_result]},
+            ):
+                yield echarts_event
+
+        # 渲染 csv
+        csv_result = get_csv_result(parsed_tool_result)
+        if csv_result:
+            for item in csv_result:
+                for csv_event in all_text_event(
+                    ctx,
+                    self.name,
+                    await csv_to_markdown_table(item['url']),
+                    ModelRole,
+                ):
+                    yield csv_event
+
+    def _job_status_events(
+        self, ctx: InvocationContext, origin_job_id: str, status: str
+    ):
+        # 包装成function_call，来避免在历史记录中展示；同时模型可以在上下文中感知
+        return context_function_event(
+            ctx,
+            self.name,
+            'system_job_status',
+            {'msg': f"Job {origin_job_id} status is {status}"},
+            ModelRole,
+        )
+
     @override
     async def _run_events(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
         logger.info(f"{ctx.session.id} state: {ctx.session.state}")
@@ -84,197 +263,101 @@ class ResultMCPAgent(MCPAgent):
                 ctx, Executor, BohriumStorge
             )
 
-        for origin_job_id in list(ctx.session.state['long_running_jobs'].keys()):
-            # 检查是否需要跳过当前长运行任务的处理
-            if ctx.session.state['long_running_jobs'][origin_job_id]['job_in_ctx']:
-                # 获取前端业务状态中的原始ID
-                frontend_origin_id = ctx.session.state[FRONTEND_STATE_KEY]['biz'].get(
-                    'origin_id'
-                )
-
-                # 如果当前任务ID与前端状态中的原始ID不匹配，跳过处理
-                if origin_job_id != frontend_origin_id:
-                    continue
+        jobs_to_poll = []
+        frontend_origin_id = ctx.session.state[FRONTEND_STATE_KEY]['biz'].get(
+            'origin_id'
+        )
+        for origin_job_id, job in ctx.session.state['long_running_jobs'].items():
+            # 已进入上下文的任务，只有前端再次请求且不是同一次调用时才重新处理
+            if job['job_in_ctx'] and (
+                origin_job_id != frontend_origin_id
+                or job['last_invocation_id'] == ctx.invocation_id
+            ):
+                continue
+            jobs_to_poll.append((origin_job_id, job['job_id']))
+        logger.info(
+            f'{ctx.session.id} executor = {Executor}, polling {len(jobs_to_poll)} jobs'
+        )
 
-                # 如果当前调用ID与该任务的上次调用ID相同，跳过重复处理
-                if (
-                    ctx.session.state['long_running_jobs'][origin_job_id][
-                        'last_invocation_id'
-                    ]
-                    == ctx.invocation_id
-                ):
-                    continue
+        async for update in self._poll_jobs(ctx, jobs_to_poll, access_key):
+            origin_job_id, status = update.origin_job_id, update.status
+            if status == 'Running':
+                for event in self._job_status_events(ctx, origin_job_id, status):
+                    yield event
+                continue
 
-            job_id = ctx.session.state['long_running_jobs'][origin_job_id]['job_id']
-            query_res = await get_job_detail(job_id=job_id, access_key=access_key)
-            status = mapping_status(query_res.get('data', {}).get('status', -999))
-            logger.info(
-                f'{ctx.session.id} origin_job_id = {origin_job_id}, executor = {Executor}, '
-                f'status = {status}'
-            )
-            if status != 'Running':
-                # 更新状态
+            if update.job_result is None:
+                # 更新状态；并行提交的任务各自回写所属步骤，旧任务没有记录时退回当前步骤
                 plan_status = 'success' if status == 'Finished' else 'failed'
-                update_plan = copy.deepcopy(ctx.session.state['plan'])
-                logger.info(
-                    f'{ctx.session.id} plan_index = {ctx.session.state['plan_index']}'
-                )
-                update_plan['steps'][ctx.session.state['plan_index']][
-                    'status'
-                ] = plan_status
-
-                update_long_running_jobs = copy.deepcopy(
-                    ctx.session.state['long_running_jobs']
+                step_index = ctx.session.state['long_running_jobs'][origin_job_id].get(
+                    'plan_index', ctx.session.state['plan_index']
                 )
-                update_long_running_jobs[origin_job_id]['job_status'] = status
+                logger.info(f'{ctx.session.id} plan_index = {step_index}')
                 yield update_state_event(
                     ctx,
                     state_delta={
-                        'long_running_jobs': update_long_running_jobs,
-                        'plan': update_plan,
+                        'long_running_jobs': with_entry_fields(
+                            ctx.session.state['long_running_jobs'],
+                            origin_job_id,
+                            job_status=status,
+                        ),
+                        'plan': with_step_fields(
+                            ctx.session.state['plan'], step_index, status=plan_status
+                        ),
                     },
                 )
+                continue
 
-                # 获取任务结果
-                if status == 'Failed':  # Job Failed
-                    dict_result = await parse_and_prepare_err(
-                        job_id=job_id, access_key=access_key
-                    )
-                else:  # Job Success
-                    dict_result = await parse_and_prepare_results(
-                        job_id=job_id, access_key=access_key
+            parsed_tool_result = update.job_result
+            yield update_state_event(
+                ctx,
+                state_delta={
+                    'long_running_jobs': with_entry_fields(
+                        ctx.session.state['long_running_jobs'],
+                        origin_job_id,
+                        job_result=parsed_tool_result,
                     )
-                logger.info(f"{ctx.session.id} dict_result = {dict_result}")
+                },
+            )
 
-                if self.enable_tgz_unpack:
-                    tgz_flag, new_tool_result = await update_tgz_dict(
-                        dict_result, session_id=ctx.session.id
-                    )
-                else:
-                    new_tool_result = dict_result
-                parsed_tool_result = await parse_result(ctx, new_tool_result)
-                logger.info(
-                    f'{ctx.session.id} parsed_tool_result = {parsed_tool_result}'
-                )
+            # Only for debug
+            if os.getenv('MODE', None) == 'debug':
+                ctx.session.state[FRONTEND_STATE_KEY]['biz'][
+                    'origin_id'
+                ] = origin_job_id
 
-                update_long_running_jobs = copy.deepcopy(
-                    ctx.session.state['long_running_jobs']
-                )
-                update_long_running_jobs[origin_job_id][
-                    'job_result'
-                ] = parsed_tool_result
-                yield update_state_event(
-                    ctx,
-                    state_delta={'long_running_jobs': update_long_running_jobs},
-                )
+            # 如果用户请求这个id的任务结果，渲染前端组件
+            if origin_job_id == ctx.session.state[FRONTEND_STATE_KEY]['biz'].get(
+                'origin_id', None
+            ):
+                async for event in self._render_job_result(ctx, parsed_tool_result):
+                    yield event
 
                 # Only for debug
                 if os.getenv('MODE', None) == 'debug':
-                    ctx.session.state[FRONTEND_STATE_KEY]['biz'][
-                        'origin_id'
-                    ] = origin_job_id
+                    ctx.session.state[FRONTEND_STATE_KEY]['biz']['origin_id'] = None
 
-                # 如果用户请求这个id的任务结果，渲染前端组件
-                if origin_job_id == ctx.session.state[FRONTEND_STATE_KEY]['biz'].get(
-                    'origin_id', None
-                ):
-                    job_result_comp_data = get_kv_result(
-                        ctx.session.state['long_running_jobs'][origin_job_id][
-                            'job_result'
-                        ]
-                    )
-                    for event in all_text_event(
-                        ctx,
-                        self.name,
-                        f"<bohrium-chat-msg>{json.dumps(job_result_comp_data)}</bohrium-chat-msg>",
-                        ModelRole,
-                    ):
-                        yield event
-
-                    # 渲染 Markdown 图片
-                    markdown_image_result = get_markdown_image_result(
-                        parsed_tool_result
-                    )
-                    if markdown_image_result:
-                        for item in markdown_image_result:
-                            for markdown_image_event in all_text_event(
-                                ctx, self.name, item['data'], ModelRole
-                            ):
-                                yield markdown_image_event
-
-                    # 渲染 Matrix 结果
-                    matrix_result = get_matrix_result(parsed_tool_result)
-                    if matrix_result:
-                        for item in matrix_result:
-                            for markdown_matrix_event in all_text_event(
-                                ctx,
-                                self.name,
-                                matrix_to_markdown_table(item),
-                                ModelRole,
-                            ):
-                                yield markdown_matrix_event
-
-                    # 渲染 echarts
-                    echarts_result = get_echarts_result(parsed_tool_result)
-                    if echarts_result:
-                        for echarts_event in context_function_event(
-                            ctx,
-                            self.name,
-                            'matmaster_echarts',
-                            None,
-                            ModelRole,
-                            {'echarts_url': [item['url'] for item in echarts_result]},
-                        ):
-                            yield echarts_event
-
-                    # 渲染 csv
-                    csv_result = get_csv_result(parsed_tool_result)
-                    if csv_result:
-                        for item in csv_result:
-                            for csv_event in all_text_event(
-                                ctx,
-                                self.name,
-                                await csv_to_markdown_table(item['url']),
-                                ModelRole,
-                            ):
-                                yield csv_event
-
-                    # Only for debug
-                    if os.getenv('MODE', None) == 'debug':
-                        ctx.session.state[FRONTEND_STATE_KEY]['biz']['origin_id'] = None
-
-                # 包装成function_call，来避免在历史记录中展示；同时模型可以在上下文中感知
-                for event in context_function_event(
-                    ctx,
-                    self.name,
-                    'system_job_result',
-                    {
-                        JOB_RESULT_KEY: ctx.session.state['long_running_jobs'][
-                            origin_job_id
-                        ]['job_result']
-                    },
-                    ModelRole,
-                ):
-                    yield event
-
-                update_long_running_jobs = copy.deepcopy(
-                    ctx.session.state['long_running_jobs']
-                )
-                update_long_running_jobs[origin_job_id]['job_in_ctx'] = True
-                update_long_running_jobs[origin_job_id][
-                    'last_invocation_id'
-                ] = ctx.invocation_id
-                yield update_state_event(
-                    ctx,
-                    state_delta={'long_running_jobs': update_long_running_jobs},
-                )
             # 包装成function_call，来避免在历史记录中展示；同时模型可以在上下文中感知
             for event in context_function_event(
                 ctx,
                 self.name,
-                'system_job_status',
-                {'msg': f"Job {origin_job_id} status is {status}"},
+                'system_job_result',
+                {JOB_RESULT_KEY: parsed_tool_result},
                 ModelRole,
             ):
                 yield event
+
+            yield update_state_event(
+                ctx,
+                state_delta={
+                    'long_running_jobs': with_entry_fields(
+                        ctx.session.state['long_running_jobs'],
+                        origin_job_id,
+                        job_in_ctx=True,
+                        last_invocation_id=ctx.invocation_id,
+                    )
+                },
+            )
+            for event in self._job_status_events(ctx, origin_job_id, status):
+                yield event
         yield Event(author=self.name, invocation_id=ctx.invocation_id)
@@ -1,4 +1,3 @@
-import copy
 import logging
 from typing import AsyncGenerator, override
 
@@ -15,11 +14,14 @@ from agents.matmaster_agent.core_agents.comp_agents.dntransfer_climit_mcp_agent
     DisallowTransferAndContentLimitMCPAgent,
 )
 from agents.matmaster_agent.flow_agents.model import PlanStepStatusEnum
+from agents.matmaster_agent.flow_agents.plan_state import with_step_fields
 from agents.matmaster_agent.locales import i18n
 from agents.matmaster_agent.logger import PrefixFilter
 from agents.matmaster_agent.model import BohrJobInfo, DFlowJobInfo
+from agents.matmaster_agent.services.job_watcher import get_job_watcher
 from agents.matmaster_agent.state import PLAN
 from agents.matmaster_agent.style import tool_response_failed_card
+from agents.matmaster_agent.utils.callback_utils import _get_ak
 from agents.matmaster_agent.utils.event_utils import (
     all_text_event,
     context_multipart2function_event,
@@ -99,10 +101,11 @@ class SubmitCoreMCPAgent(DisallowTransferAndContentLimitMCPAgent):
                             yield tool_response_failed_event
 
                         # 更新 plan 为失败
-                        update_plan = copy.deepcopy(ctx.session.state['plan'])
-                        update_plan['steps'][ctx.session.state['plan_index']][
-                            'status'
-                        ] = 'failed'
+                        update_plan = with_step_fields(
+                            ctx.session.state['plan'],
+                            ctx.session.state['plan_index'],
+                            status='failed',
+                        )
                         yield update_state_event(ctx, state_delta={'plan': update_plan})
 
                         raise RuntimeError('Tool Execution Failed')
@@ -189,10 +192,11 @@ class SubmitCoreMCPAgent(DisallowTransferAndContentLimitMCPAgent):
                                     yield tool_response_failed_event
 
                                 # 更新 plan 为失败
-                                update_plan = copy.deepcopy(ctx.session.state['plan'])
-                                update_plan['steps'][ctx.session.state['plan_index']][
-                                    'status'
-                                ] = 'failed'
+                                update_plan = with_step_fields(
+                                    ctx.session.state['plan'],
+                                    ctx.session.state['plan_index'],
+                                    status='failed',
+                                )
                                 yield update_state_event(
                                     ctx, state_delta={'plan': update_plan}
                                 )
@@ -223,6 +227,10 @@ class SubmitCoreMCPAgent(DisallowTransferAndContentLimitMCPAgent):
                                 job_detail_url=job_detail_url,
                                 agent_name=ctx.agent.name.replace('_submit_core', ''),
                             ).model_dump(mode='json')
+                            # 后台跟踪任务状态，结束时推送给本会话
+                            get_job_watcher().watch(
+                                bohr_job_id, _get_ak(ctx), ctx.session.id, origin_job_id
+                            )
                         else:  # Dflow Job (Deprecated)
                             workflow_id = dict_result['extra_info']['workflow_id']
                             workflow_uid = dict_result['extra_info']['workflow_uid']
@@ -236,10 +244,12 @@ class SubmitCoreMCPAgent(DisallowTransferAndContentLimitMCPAgent):
                                 workflow_url=workflow_url,
                             ).model_dump(mode='json')
 
-                        update_long_running_jobs = copy.deepcopy(
-                            ctx.session.state['long_running_jobs']
-                        )
-                        update_long_running_jobs[origin_job_id] = frontend_result
+                        # 记录任务所属步骤，便于多个任务并行时回写对应步骤状态
+                        frontend_result['plan_index'] = ctx.session.state['plan_index']
+                        update_long_running_jobs = {
+                            **ctx.session.state['long_running_jobs'],
+                            origin_job_id: frontend_result,
+                        }
                         yield update_state_event(
                             ctx,
                             state_delta={
@@ -272,10 +282,11 @@ class SubmitCoreMCPAgent(DisallowTransferAndContentLimitMCPAgent):
                         ctx, self.name, '工具参数无变化，本次跳过执行', ModelRole
                     ):
                         yield _info_event
-                    update_plan = copy.deepcopy(ctx.session.state['plan'])
-                    update_plan['steps'][ctx.session.state['plan_index']][
-                        'status'
-                    ] = PlanStepStatusEnum.FAILED
+                    update_plan = with_step_fields(
+                        ctx.session.state['plan'],
+                        ctx.session.state['plan_index'],
+                        status=PlanStepStatusEnum.FAILED,
+                    )
                     yield update_state_event(ctx, state_delta={'plan': update_plan})
             else:
                 yield event
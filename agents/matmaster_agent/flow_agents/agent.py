@@ -80,13 +80,6 @@ from agents.matmaster_agent.flow_agents.scene_agent.constant import SCENE_AGENT
 from agents.matmaster_agent.flow_agents.scene_agent.prompt import SCENE_INSTRUCTION
 from agents.matmaster_agent.flow_agents.scene_agent.schema import SceneSchema
 from agents.matmaster_agent.flow_agents.schema import FlowStatusEnum
-from agents.matmaster_agent.flow_agents.step_title_agent.callback import (
-    filter_llm_contents,
-)
-from agents.matmaster_agent.flow_agents.step_title_agent.prompt import (
-    STEP_TITLE_INSTRUCTION,
-)
-from agents.matmaster_agent.flow_agents.step_title_agent.schema import StepTitleSchema
 from agents.matmaster_agent.flow_agents.step_validation_agent.prompt import (
     STEP_VALIDATION_INSTRUCTION,
 )
@@ -104,6 +97,7 @@ from agents.matmaster_agent.flow_agents.utils import (
     is_plan_confirmed,
     scenes_contain_query_job_status,
     should_bypass_confirmation,
+    watched_jobs_state_delta,
 )
 from agents.matmaster_agent.llm_config import MatMasterLlmConfig
 from agents.matmaster_agent.locales import i18n
@@ -124,12 +118,10 @@ from agents.matmaster_agent.services.icl import (
     select_update_examples,
     toolchain_from_examples,
 )
-from agents.matmaster_agent.services.memory import (
-    format_short_term_memory,
-    memory_write,
-)
+from agents.matmaster_agent.services.memory import format_short_term_memory
+from agents.matmaster_agent.services.memory_queue import enqueue_memory_write
 from agents.matmaster_agent.services.questions import get_random_questions
-from agents.matmaster_agent.services.session_files import get_session_files
+from agents.matmaster_agent.services.session_files import get_session_file_index
 from agents.matmaster_agent.state import (
     BIZ,
     EXPAND,
@@ -141,7 +133,7 @@ from agents.matmaster_agent.sub_agents.mapping import (
     AGENT_CLASS_MAPPING,
     ALL_AGENT_TOOLS_LIST,
 )
-from agents.matmaster_agent.sub_agents.tools import ALL_TOOLS
+from agents.matmaster_agent.sub_agents.tool_registry import TOOL_REGISTRY
 from agents.matmaster_agent.utils.event_utils import (
     all_text_event,
     context_function_event,
@@ -321,26 +313,10 @@ class MatMasterFlowAgent(LlmAgent):
             state_key='step_validation',
             after_model_callback=MatMasterLlmConfig.opik_tracer.after_model_callback,
         )
-        step_title_agent = DisallowTransferAndContentLimitSchemaAgent(
-            name='step_title_agent',
-            model=MatMasterLlmConfig.tool_schema_model,
-            global_instruction=GLOBAL_INSTRUCTION,
-            description='给出每一步的标题',
-            instruction=STEP_TITLE_INSTRUCTION,
-            output_schema=StepTitleSchema,
-            state_key='step_title',
-            before_model_callback=filter_llm_contents,
-            after_model_callback=MatMasterLlmConfig.opik_tracer.after_model_callback,
-        )
         plan_steps = ctx.session.state.get('plan', {}).get('steps', [])
-        agent_names = []
-        for step in plan_steps:
-            tool_name = step.get('tool_name')
-            if not tool_name:
-                continue
-            belonging_agent = ALL_TOOLS.get(tool_name, {}).get('belonging_agent')
-            if belonging_agent and belonging_agent not in agent_names:
-                agent_names.append(belonging_agent)
+        agent_names = TOOL_REGISTRY.agents_for_tools(
+            step.get('tool_name') for step in plan_steps
+        )
 
         sub_agents = [
             AGENT_CLASS_MAPPING[agent_name](MatMasterLlmConfig)
@@ -353,7 +329,7 @@ class MatMasterFlowAgent(LlmAgent):
             model=MatMasterLlmConfig.default_litellm_model,
             description='根据 materials_plan 返回的计划进行总结',
             instruction='',
-            sub_agents=sub_agents + [step_title_agent] + [step_validation_agent],
+            sub_agents=sub_agents + [step_validation_agent],
         )
         track_adk_agent_recursive(execution_agent, MatMasterLlmConfig.opik_tracer)
         return execution_agent
@@ -366,7 +342,7 @@ class MatMasterFlowAgent(LlmAgent):
     ) -> AsyncGenerator[Event, None]:
         # 1. 检索 ICL 示例
         raw_user_text = ctx.user_content.parts[0].text if ctx.user_content.parts else ''
-        icl_examples = select_examples(
+        icl_examples = await select_examples(
             raw_user_text,
             ctx.session.id,
             CURRENT_ENV,
@@ -421,7 +397,7 @@ class MatMasterFlowAgent(LlmAgent):
         UPDATE_USER_CONTENT = '\nUSER INPUT FOR THIS TASK:\n' + sanitize_braces(
             raw_content
         )
-        icl_update_examples = select_update_examples(
+        icl_update_examples = await select_update_examples(
             ctx.session.state['expand']['update_user_content'],
             ctx.session.id,
             CURRENT_ENV,
@@ -503,19 +479,7 @@ class MatMasterFlowAgent(LlmAgent):
         available_tools = get_tools_list(ctx, scenes)
         if not available_tools:
             available_tools = ALL_AGENT_TOOLS_LIST
-        available_tools_with_info = {
-            item: {
-                'scene': ALL_TOOLS[item]['scene'],
-                'description': ALL_TOOLS[item]['description'],
-            }
-            for item in available_tools
-        }
-        available_tools_with_info_str = '\n'.join(
-            [
-                f"{key}\n    scene: {', '.join(value['scene'])}\n    description: {value['description']}"
-                for key, value in available_tools_with_info.items()
-            ]
-        )
+        available_tools_with_info_str = TOOL_REGISTRY.tools_prompt(available_tools)
         query_for_memory = ctx.session.state.get('expand', {}).get(
             'update_user_content', ''
         ) or (
@@ -530,10 +494,10 @@ class MatMasterFlowAgent(LlmAgent):
 
         # Get session files (after full tool list is available)
         try:
-            session_files = await get_session_files(ctx.session.id)
+            session_files = (await get_session_file_index(ctx.session.id)).files
         except Exception as e:
             logger.warning(
-                f'{ctx.session.id} get_session_files failed: {e}, fallback to empty'
+                f'{ctx.session.id} get_session_file_index failed: {e}, fallback to empty'
             )
             session_files = []
         session_has_file = bool(session_files) or bool(
@@ -671,18 +635,16 @@ class MatMasterFlowAgent(LlmAgent):
         output = ctx.session.state.get('memory_writer_output') or {}
         insights = output.get('insights', []) if isinstance(output, dict) else []
         if insights:
-            session_id = ctx.session.id
-            written = 0
+            # 后台批量写入，不阻塞后续执行
+            queued = 0
             for text in insights:
                 if isinstance(text, str) and text.strip():
-                    await memory_write(
-                        session_id=session_id, text=text.strip(), metadata={}
-                    )
-                    written += 1
+                    enqueue_memory_write(session_id=ctx.session.id, text=text.strip())
+                    queued += 1
             logger.info(
-                '%s memory_writer wrote %d insight(s) to memory',
+                '%s memory_writer queued %d insight(s) for memory',
                 ctx.session.id,
-                written,
+                queued,
             )
         else:
             logger.debug('%s memory_writer output 0 insights', ctx.session.id)
@@ -820,9 +782,7 @@ class MatMasterFlowAgent(LlmAgent):
             tool_count = sum(1 for step in plan_steps if step.get('tool_name'))
 
             is_async_agent = issubclass(
-                AGENT_CLASS_MAPPING[
-                    ALL_TOOLS[plan_steps[0]['tool_name']]['belonging_agent']
-                ],
+                AGENT_CLASS_MAPPING[TOOL_REGISTRY.agent_of(plan_steps[0]['tool_name'])],
                 BaseAsyncJobAgent,
             )
             logger.info(f'is_async_agent = {is_async_agent}, tool_count = {tool_count}')
@@ -868,13 +828,13 @@ class MatMasterFlowAgent(LlmAgent):
                         analysis_text += cur
                     yield analysis_event
                 if analysis_text.strip():
-                    await memory_write(
+                    enqueue_memory_write(
                         session_id=ctx.session.id,
                         text=f"Plan execution summary: {analysis_text.strip()}",
                         metadata={'source': 'execution_summary'},
                     )
                     logger.info(
-                        '%s wrote execution summary to memory (%d chars)',
+                        '%s queued execution summary for memory (%d chars)',
                         ctx.session.id,
                         len(analysis_text),
                     )
@@ -890,13 +850,13 @@ class MatMasterFlowAgent(LlmAgent):
 
                 if report_markdown.strip():
                     excerpt = report_markdown.strip()[:5000]
-                    await memory_write(
+                    enqueue_memory_write(
                         session_id=ctx.session.id,
                         text=f"Plan execution report (excerpt): {excerpt}",
                         metadata={'source': 'execution_report'},
                     )
                     logger.info(
-                        '%s wrote report excerpt to memory (%d chars)',
+                        '%s queued report excerpt for memory (%d chars)',
                         ctx.session.id,
                         len(excerpt),
                     )
@@ -972,7 +932,7 @@ class MatMasterFlowAgent(LlmAgent):
         short_term_memory_block = await format_short_term_memory(
             raw_user_text, ctx.session.id
         )
-        session_files = await get_session_files(ctx.session.id)
+        session_files = (await get_session_file_index(ctx.session.id)).files
         session_file_summary = '\n'.join(session_files) if session_files else ''
         # 扩写用户问题（带记忆 + 会话文件，延续上一步时只 expand 新步骤）
         async for _expand_event in self._run_expand_agent(
@@ -1066,6 +1026,10 @@ class MatMasterFlowAgent(LlmAgent):
                     yield quota_remaining_event
                 return
 
+            # 后台 watcher 已确认结束的任务，先回写任务状态；步骤状态仍由结果 agent 取回结果后更新
+            if job_state_delta := watched_jobs_state_delta(ctx):
+                yield update_state_event(ctx, state_delta=job_state_delta)
+
             # 上传文件特殊处理
             async for handle_upload_event in self.handle_upload_agent.run_async(ctx):
                 yield handle_upload_event
@@ -1,4 +1,4 @@
-from agents.matmaster_agent.sub_agents.tools import ALL_TOOLS
+from agents.matmaster_agent.sub_agents.tool_registry import TOOL_REGISTRY
 
 ChatAgentGlobalInstruction = (
     'Language: When think and answer, always use this language ({target_language}).'
@@ -7,12 +7,7 @@ ChatAgentDescription = '你是由苏州实验室、深势科技、北京科学
 ChatAgentInstruction = f"""
 <背景知识>
 你可以调用的工具如下：
-{'\n'.join(
-    [
-        f"{key}\n    scene: {', '.join(value['scene'])}\n    description: {value['description']}"
-        for key, value in ALL_TOOLS.items()
-    ]
-)}
+{TOOL_REGISTRY.tools_prompt(TOOL_REGISTRY.names)}
 
 你只负责回答用户的相关问题，不要调用工具
 """
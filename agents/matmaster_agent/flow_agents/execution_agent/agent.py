@@ -1,14 +1,19 @@
-import copy
+import asyncio
 import json
 import logging
-from typing import AsyncGenerator, override
+from typing import AsyncGenerator, Optional, override
 
 from google.adk.agents import InvocationContext
+from google.adk.agents.callback_context import CallbackContext
 from google.adk.events import Event
 from pydantic import model_validator
 
 from agents.matmaster_agent.base_callbacks.public_callback import check_transfer
-from agents.matmaster_agent.config import MAX_TOOL_RETRIES
+from agents.matmaster_agent.config import (
+    MAX_PARALLEL_PLAN_STEPS,
+    MAX_TOOL_RETRIES,
+    STEP_TITLE_LLM_REFINE,
+)
 from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME, ModelRole
 from agents.matmaster_agent.core_agents.comp_agents.dntransfer_climit_agent import (
     DisallowTransferAndContentLimitLlmAgent,
@@ -18,10 +23,18 @@ from agents.matmaster_agent.flow_agents.constant import (
     EXECUTION_TYPE_LABEL_RETRY,
     MATMASTER_SUPERVISOR_AGENT,
 )
+from agents.matmaster_agent.flow_agents.execution_agent.scheduler import (
+    next_runnable_step,
+)
 from agents.matmaster_agent.flow_agents.execution_agent.utils import (
     should_exit_retryLoop,
 )
 from agents.matmaster_agent.flow_agents.model import PlanStepStatusEnum
+from agents.matmaster_agent.flow_agents.plan_state import with_step_fields
+from agents.matmaster_agent.flow_agents.step_title_agent.title import (
+    refine_step_title,
+    template_step_title,
+)
 from agents.matmaster_agent.flow_agents.step_validation_agent.prompt import (
     STEP_VALIDATION_INSTRUCTION,
 )
@@ -74,29 +87,24 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
     def validation_agent(self):
         return self.sub_agents[-1]
 
-    @property
-    def title_agent(self):
-        return self.sub_agents[-2]
-
     async def _update_retry_count(
         self, ctx: InvocationContext, index, count
     ) -> AsyncGenerator[Event, None]:
-        update_plan = copy.deepcopy(ctx.session.state[PLAN])
+        plan = ctx.session.state[PLAN]
         if not count:
-            update_plan['steps'][index]['retry_count'] = update_plan['steps'][
-                index
-            ].get('retry_count', count)
-        else:
-            update_plan['steps'][index]['retry_count'] = count
+            count = plan['steps'][index].get('retry_count', count)
+        update_plan = with_step_fields(plan, index, retry_count=count)
         yield update_state_event(ctx, state_delta={PLAN: update_plan})
 
     async def _construct_function_call_ctx(
         self, ctx: InvocationContext, index
     ) -> AsyncGenerator[Event, None]:
-        update_plan = copy.deepcopy(ctx.session.state['plan'])
-        current_tool_name = update_plan['steps'][index]['tool_name']
-        current_tool_description = update_plan['steps'][index][STEP_DESCRIPTION]
-        update_plan['steps'][index]['status'] = PlanStepStatusEnum.PROCESS
+        current_step = ctx.session.state['plan']['steps'][index]
+        current_tool_name = current_step['tool_name']
+        current_tool_description = current_step[STEP_DESCRIPTION]
+        update_plan = with_step_fields(
+            ctx.session.state['plan'], index, status=PlanStepStatusEnum.PROCESS
+        )
         yield update_state_event(
             ctx,
             state_delta={
@@ -115,6 +123,52 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
         ):
             yield materials_plan_function_call_event
 
+    @staticmethod
+    def _step_tool_args(ctx: InvocationContext, step: dict) -> Optional[dict]:
+        """Tool arguments of ``step`` recorded by the recommend agent, if any."""
+        tool_call_info = ctx.session.state.get('tool_call_info') or {}
+        if tool_call_info.get('tool_name') != step.get('tool_name'):
+            return None
+        return tool_call_info.get('tool_args')
+
+    def _step_title_events(
+        self,
+        ctx: InvocationContext,
+        step_title: str,
+        card_title: str,
+        execution_type_label: str,
+    ):
+        """step_title / matmaster_flow_active state and the step start card."""
+        flow_style = {
+            'font_color': '#0E6DE8',
+            'bg_color': '#EBF2FB',
+            'border_color': '#B7D3F7',
+        }
+        yield update_state_event(
+            ctx,
+            state_delta={
+                'step_title': {'title': step_title},
+                'matmaster_flow_active': {'title': card_title, **flow_style},
+            },
+        )
+        yield from context_function_event(
+            ctx,
+            self.name,
+            'matmaster_flow',
+            None,
+            ModelRole,
+            {
+                'matmaster_flow_args': json.dumps(
+                    {
+                        'title': card_title,
+                        'status': 'start',
+                        **flow_style,
+                        'execution_type_label': execution_type_label,
+                    }
+                )
+            },
+        )
+
     async def _core_execution_agent(
         self, ctx: InvocationContext, index
     ) -> AsyncGenerator[Event, None]:
@@ -135,24 +189,6 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
             },
         )
 
-        # 引导标题
-        async for title_event in self.title_agent.run_async(ctx):
-            yield title_event
-        if ctx.session.state[PLAN]['steps'][index]['retry_count']:
-            step_title = (
-                i18n.t(separate_card_info)
-                + f'{retry_info}'
-                + ': '
-                + ctx.session.state.get('step_title', {}).get('title', '')
-            )
-        else:
-            step_title = ctx.session.state.get('step_title', {}).get('title', '')
-        if (
-            ctx.session.state[PLAN]['steps'][index]['status']
-            == PlanStepStatusEnum.SUBMITTED
-        ):
-            step_title = '获取任务结果'
-
         # 展示文案：更换工具 / 重试工具 / 空（正常执行），直接传给前端
         if ctx.session.state.pop('matmaster_flow_switched_tool', None):
             execution_type_label = EXECUTION_TYPE_LABEL_CHANGE_TOOL
@@ -161,37 +197,39 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
         else:
             execution_type_label = ''
 
-        yield update_state_event(
-            ctx,
-            state_delta={
-                'matmaster_flow_active': {
-                    'title': step_title,
-                    'font_color': '#0E6DE8',
-                    'bg_color': '#EBF2FB',
-                    'border_color': '#B7D3F7',
-                }
-            },
+        # 步骤标题：模板生成，工具参数确定（tool_call_info）后按参数更新；开启
+        # STEP_TITLE_LLM_REFINE 时 LLM 标题在后台生成，返回后替换。标题变化时同步更新开始卡片
+        current_step = ctx.session.state[PLAN]['steps'][index]
+        submitted = current_step['status'] == PlanStepStatusEnum.SUBMITTED
+        step_title = template_step_title(
+            current_step,
+            tool_args=(
+                self._step_tool_args(ctx, current_step)
+                if current_step['retry_count']
+                else None
+            ),
         )
-        for matmaster_flow_event in context_function_event(
-            ctx,
-            self.name,
-            'matmaster_flow',
-            None,
-            ModelRole,
-            {
-                'matmaster_flow_args': json.dumps(
-                    {
-                        'title': step_title,
-                        'status': 'start',
-                        'font_color': '#0E6DE8',
-                        'bg_color': '#EBF2FB',
-                        'border_color': '#B7D3F7',
-                        'execution_type_label': execution_type_label,
-                    }
+        title_task = None
+        if STEP_TITLE_LLM_REFINE and not submitted:
+            title_task = asyncio.create_task(
+                refine_step_title(
+                    current_step,
+                    ctx.session.state.get('target_language', 'English'),
+                    CallbackContext(ctx),
                 )
-            },
+            )
+
+        def card_title(title: str) -> str:
+            if submitted:
+                return i18n.t('StepJobResult')
+            if current_step['retry_count']:
+                return i18n.t(separate_card_info) + f'{retry_info}' + ': ' + title
+            return title
+
+        for title_event in self._step_title_events(
+            ctx, step_title, card_title(step_title), execution_type_label
         ):
-            yield matmaster_flow_event
+            yield title_event
 
         # 核心执行工具（更换工具时新工具所属 Agent 可能不在 sub_agents，需动态获取）
         current_tool_name = ctx.session.state[PLAN]['steps'][index]['tool_name']
@@ -199,8 +237,35 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
         logger.info(
             f'{ctx.session.id} tool_name = {current_tool_name}, target_agent = {target_agent.name}'
         )
-        async for event in target_agent.run_async(ctx):
-            yield event
+        refined = False
+        try:
+            async for event in target_agent.run_async(ctx):
+                yield event
+                if submitted:
+                    continue
+                new_title = None
+                if title_task is not None and title_task.done():
+                    new_title, title_task = title_task.result(), None
+                    refined = new_title is not None
+                elif (
+                    not refined
+                    and event.actions
+                    and 'tool_call_info' in event.actions.state_delta
+                ):
+                    new_title = template_step_title(
+                        current_step,
+                        tool_args=self._step_tool_args(ctx, current_step),
+                    )
+                if new_title and new_title != step_title:
+                    step_title = new_title
+                    for title_event in self._step_title_events(
+                        ctx, step_title, card_title(step_title), execution_type_label
+                    ):
+                        yield title_event
+        finally:
+            # 步骤结束时仍未返回的 LLM 标题直接丢弃
+            if title_task is not None:
+                title_task.cancel()
         logger.info(
             f'{ctx.session.id} After Run: plan = {ctx.session.state['plan']}, {check_plan(ctx)}'
         )
@@ -263,13 +328,16 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
             yield validation_failed_event
 
         # 重新标记为进行中状态，准备重试
-        update_plan = copy.deepcopy(ctx.session.state['plan'])
-        update_plan['steps'][index]['status'] = PlanStepStatusEnum.PROCESS
-        update_plan['steps'][index]['validation_failure_reason'] = validation_reason
         original_description = ctx.session.state[PLAN]['steps'][index][STEP_DESCRIPTION]
-        update_plan['steps'][index][
-            STEP_DESCRIPTION
-        ] = f"{original_description}\n\n注意：上次执行因以下原因校验失败，请改进：{validation_reason}"
+        update_plan = with_step_fields(
+            ctx.session.state['plan'],
+            index,
+            status=PlanStepStatusEnum.PROCESS,
+            validation_failure_reason=validation_reason,
+            **{
+                STEP_DESCRIPTION: f"{original_description}\n\n注意：上次执行因以下原因校验失败，请改进：{validation_reason}"
+            },
+        )
         yield update_state_event(ctx, state_delta={'plan': update_plan})
 
     async def _prepare_retry_failed_result(
@@ -280,8 +348,7 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
             ctx, index, ctx.session.state[PLAN]['steps'][index]['retry_count'] + 1
         ):
             yield _update_retry_event
-        update_plan = copy.deepcopy(ctx.session.state['plan'])
-        update_plan['steps'][index]['status'] = PlanStepStatusEnum.PROCESS
+        step_fields = {'status': PlanStepStatusEnum.PROCESS}
         retry_count = ctx.session.state[PLAN]['steps'][index]['retry_count']
         if validation_reason:
             logger.info(
@@ -291,13 +358,14 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
             original_description = ctx.session.state[PLAN]['steps'][index][
                 StepKey.STEP_DESCRIPTION
             ]
-            update_plan['steps'][index][
-                StepKey.STEP_DESCRIPTION
-            ] = f"{original_description}\n\n注意：上次执行因以下原因校验失败，请改进：{validation_reason}"
+            step_fields[StepKey.STEP_DESCRIPTION] = (
+                f"{original_description}\n\n注意：上次执行因以下原因校验失败，请改进：{validation_reason}"
+            )
         else:
             logger.info(
                 f'{ctx.session.id} Step {index + 1} execution failed, retrying {retry_count}/{MAX_TOOL_RETRIES}'
             )
+        update_plan = with_step_fields(ctx.session.state['plan'], index, **step_fields)
         yield update_state_event(ctx, state_delta={'plan': update_plan})
 
     async def _prepare_retry_other_tool(
@@ -308,15 +376,18 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
         )
 
         # 更新plan中的tool_name和status，并标记为「更换工具」供 matmaster_flow 告知前端
-        update_plan = copy.deepcopy(ctx.session.state['plan'])
-        update_plan['steps'][index]['tool_name'] = next_tool
-        update_plan['steps'][index]['status'] = PlanStepStatusEnum.PROCESS
         original_description = ctx.session.state[PLAN]['steps'][index][
             STEP_DESCRIPTION
         ].split('\n\n注意：')[
             0
         ]  # 移除之前的失败原因
-        update_plan['steps'][index][STEP_DESCRIPTION] = original_description
+        update_plan = with_step_fields(
+            ctx.session.state['plan'],
+            index,
+            tool_name=next_tool,
+            status=PlanStepStatusEnum.PROCESS,
+            **{STEP_DESCRIPTION: original_description},
+        )
         yield update_state_event(
             ctx,
             state_delta={
@@ -325,142 +396,156 @@ class MatMasterSupervisorAgent(DisallowTransferAndContentLimitLlmAgent):
             },
         )
 
-    @override
-    async def _run_events(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
-        plan = ctx.session.state['plan']
-        logger.info(f'{ctx.session.id} plan = {plan}')
-
-        for index, initial_step in enumerate(plan['steps']):
-            initial_current_tool_name = initial_step['tool_name']
-            tried_tools = [initial_current_tool_name]
-            alternatives = find_alternative_tool(initial_current_tool_name)
+    async def _run_step(
+        self, ctx: InvocationContext, index
+    ) -> AsyncGenerator[Event, None]:
+        """Run one plan step with same-tool retries and alternative-tool fallback."""
+        initial_current_tool_name = ctx.session.state[PLAN]['steps'][index]['tool_name']
+        tried_tools = [initial_current_tool_name]
+        alternatives = find_alternative_tool(initial_current_tool_name)
+
+        tool_attempt_success = False
+        while not tool_attempt_success:
+            if (
+                ctx.session.state[PLAN]['steps'][index]['status']
+                == PlanStepStatusEnum.SUCCESS
+            ):
+                tool_attempt_success = True
+                break
+            else:
+                # 初始化 retry_count
+                async for _update_retry_event in self._update_retry_count(
+                    ctx, index, 0
+                ):
+                    yield _update_retry_event
 
-            tool_attempt_success = False
-            while not tool_attempt_success:
-                if (
-                    ctx.session.state[PLAN]['steps'][index]['status']
-                    == PlanStepStatusEnum.SUCCESS
+                # 同一工具重试
+                while (
+                    ctx.session.state[PLAN]['steps'][index]['retry_count']
+                    <= MAX_TOOL_RETRIES
                 ):
-                    tool_attempt_success = True
-                    break
-                else:
-                    # 初始化 retry_count
-                    async for _update_retry_event in self._update_retry_count(
-                        ctx, index, 0
+                    # 制造工具调用上下文，已提交的任务跳过该步骤（仅切换 plan_index 以查询结果）
+                    if (
+                        ctx.session.state[PLAN]['steps'][index]['status']
+                        != PlanStepStatusEnum.SUBMITTED
                     ):
-                        yield _update_retry_event
-
-                    # 同一工具重试
-                    while (
-                        ctx.session.state[PLAN]['steps'][index]['retry_count']
-                        <= MAX_TOOL_RETRIES
+                        async for (
+                            _construct_function_call_event
+                        ) in self._construct_function_call_ctx(ctx, index):
+                            yield _construct_function_call_event
+                    else:
+                        yield update_state_event(ctx, state_delta={'plan_index': index})
+
+                    # 核心工具调用
+                    async for _core_execution_event in self._core_execution_agent(
+                        ctx, index
                     ):
-                        # 制造工具调用上下文，已提交的任务跳过该步骤
-                        if (
-                            ctx.session.state[PLAN]['steps'][index]['status']
-                            != PlanStepStatusEnum.SUBMITTED
+                        yield _core_execution_event
+
+                    current_steps = ctx.session.state['plan']['steps']
+                    # 工具调用结果返回【成功】
+                    if current_steps[index]['status'] == PlanStepStatusEnum.SUCCESS:
+                        # 对成功的工具调用结果进行校验
+                        if has_self_check(
+                            ctx.session.state[PLAN]['steps'][index]['tool_name']
                         ):
+                            # 校验工具结果
                             async for (
-                                _construct_function_call_event
-                            ) in self._construct_function_call_ctx(ctx, index):
-                                yield _construct_function_call_event
-
-                        # 核心工具调用
-                        async for _core_execution_event in self._core_execution_agent(
-                            ctx, index
-                        ):
-                            yield _core_execution_event
-
-                        current_steps = ctx.session.state['plan']['steps']
-                        # 工具调用结果返回【成功】
-                        if current_steps[index]['status'] == PlanStepStatusEnum.SUCCESS:
-                            # 对成功的工具调用结果进行校验
-                            if has_self_check(
-                                ctx.session.state[PLAN]['steps'][index]['tool_name']
-                            ):
-                                # 校验工具结果
-                                async for (
-                                    _tool_result_validation_event
-                                ) in self._tool_result_validation(ctx, index):
-                                    yield _tool_result_validation_event
-
-                                validation_result = ctx.session.state.get(
-                                    'step_validation', {}
-                                )
-                                is_valid = validation_result.get('is_valid', True)
-                                validation_reason = validation_result.get('reason', '')
-
-                                # “假成功”结果，计划重试
-                                if (not is_valid) and ctx.session.state[PLAN]['steps'][
-                                    index
-                                ]['retry_count'] < MAX_TOOL_RETRIES:
-                                    async for (
-                                        _prepare_retry_fake_success_event
-                                    ) in self._prepare_retry_fake_success(
-                                        ctx, index, validation_reason
-                                    ):
-                                        yield _prepare_retry_fake_success_event
-                                else:
-                                    # 校验成功，步骤完成
-                                    tool_attempt_success = True
-                                    break
-                            else:
-                                # 无需校验，步骤完成
-                                tool_attempt_success = True
-                                break
-                        # 工具调用失败，且符合重试条件
-                        elif (
-                            current_steps[index]['status'] == PlanStepStatusEnum.FAILED
-                            and ctx.session.state[PLAN]['steps'][index]['retry_count']
-                            < MAX_TOOL_RETRIES
-                        ):
-                            # 对于某些错误，重试没有必要，直接退出
-                            if should_exit_retryLoop(ctx):
-                                break
+                                _tool_result_validation_event
+                            ) in self._tool_result_validation(ctx, index):
+                                yield _tool_result_validation_event
 
                             validation_result = ctx.session.state.get(
                                 'step_validation', {}
                             )
+                            is_valid = validation_result.get('is_valid', True)
                             validation_reason = validation_result.get('reason', '')
-                            async for (
-                                _prepare_retry_failed_result_event
-                            ) in self._prepare_retry_failed_result(
-                                ctx, index, validation_reason
-                            ):
-                                yield _prepare_retry_failed_result_event
-                        # 异步任务，直接退出当前函数
-                        elif (
-                            current_steps[index]['status']
-                            == PlanStepStatusEnum.SUBMITTED
-                        ):
-                            return
+
+                            # “假成功”结果，计划重试
+                            if (not is_valid) and ctx.session.state[PLAN]['steps'][
+                                index
+                            ]['retry_count'] < MAX_TOOL_RETRIES:
+                                async for (
+                                    _prepare_retry_fake_success_event
+                                ) in self._prepare_retry_fake_success(
+                                    ctx, index, validation_reason
+                                ):
+                                    yield _prepare_retry_fake_success_event
+                            else:
+                                # 校验成功，步骤完成
+                                tool_attempt_success = True
+                                break
                         else:
-                            # 其他状态（SUBMITTED等），退出循环
+                            # 无需校验，步骤完成
+                            tool_attempt_success = True
                             break
-
-                    # 更换其他工具重试
-                    if (
-                        not tool_attempt_success
-                        and ctx.session.state['plan']['steps'][index]['status']
-                        != PlanStepStatusEnum.SUBMITTED
+                    # 工具调用失败，且符合重试条件
+                    elif (
+                        current_steps[index]['status'] == PlanStepStatusEnum.FAILED
+                        and ctx.session.state[PLAN]['steps'][index]['retry_count']
+                        < MAX_TOOL_RETRIES
                     ):
-                        available_alts = [
-                            alt for alt in alternatives if alt not in tried_tools
-                        ]
-                        if available_alts:
-                            # 尝试替换工具
-                            next_tool = available_alts[0]
-                            tried_tools.append(next_tool)
-                            async for (
-                                _prepare_retry_other_tool_event
-                            ) in self._prepare_retry_other_tool(ctx, index, next_tool):
-                                yield _prepare_retry_other_tool_event
-                        else:
-                            logger.warning(
-                                f'{ctx.session.id} No more alternative tools for step {index + 1}'
-                            )
-                            break  # 退出tool while
+                        # 对于某些错误，重试没有必要，直接退出
+                        if should_exit_retryLoop(ctx):
+                            break
+
+                        validation_result = ctx.session.state.get('step_validation', {})
+                        validation_reason = validation_result.get('reason', '')
+                        async for (
+                            _prepare_retry_failed_result_event
+                        ) in self._prepare_retry_failed_result(
+                            ctx, index, validation_reason
+                        ):
+                            yield _prepare_retry_failed_result_event
+                    # 异步任务，结束当前步骤，由调度器继续后续独立步骤
+                    elif current_steps[index]['status'] == PlanStepStatusEnum.SUBMITTED:
+                        return
+                    else:
+                        # 其他状态（SUBMITTED等），退出循环
+                        break
+
+                # 更换其他工具重试
+                if (
+                    not tool_attempt_success
+                    and ctx.session.state['plan']['steps'][index]['status']
+                    != PlanStepStatusEnum.SUBMITTED
+                ):
+                    available_alts = [
+                        alt for alt in alternatives if alt not in tried_tools
+                    ]
+                    if available_alts:
+                        # 尝试替换工具
+                        next_tool = available_alts[0]
+                        tried_tools.append(next_tool)
+                        async for (
+                            _prepare_retry_other_tool_event
+                        ) in self._prepare_retry_other_tool(ctx, index, next_tool):
+                            yield _prepare_retry_other_tool_event
+                    else:
+                        logger.warning(
+                            f'{ctx.session.id} No more alternative tools for step {index + 1}'
+                        )
+                        break  # 退出tool while
 
+    @override
+    async def _run_events(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        plan = ctx.session.state['plan']
+        logger.info(f'{ctx.session.id} plan = {plan}')
+
+        visited = set()
+        while (
+            index := next_runnable_step(
+                ctx.session.state[PLAN]['steps'], visited, MAX_PARALLEL_PLAN_STEPS
+            )
+        ) is not None:
+            visited.add(index)
+            async for _run_step_event in self._run_step(ctx, index):
+                yield _run_step_event
+
+            step_status = ctx.session.state[PLAN]['steps'][index]['status']
+            # 异步任务已提交/运行中，继续调度不依赖它的后续步骤
+            if step_status == PlanStepStatusEnum.SUBMITTED:
+                continue
             # 最终仍然没有成功，中止计划
-            if not tool_attempt_success:
+            if step_status != PlanStepStatusEnum.SUCCESS:
                 break
@@ -0,0 +1,65 @@
+"""
+Dependency-aware step scheduling for MatMasterSupervisorAgent.
+
+Each plan step may carry ``depends_on`` (1-based numbers of earlier steps).
+``None``/missing keeps the legacy behaviour of depending on the previous step,
+``[]`` marks the step as independent. Forward and self references are ignored,
+so the dependency graph is always acyclic.
+
+Steps are picked in plan order. A step whose async job is ``submitted`` no
+longer blocks later steps that do not depend on it, so independent Bohrium jobs
+run side by side; ``max_in_flight`` bounds how many may be submitted at once.
+"""
+
+from typing import Optional
+
+from agents.matmaster_agent.flow_agents.model import PlanStepStatusEnum
+from agents.matmaster_agent.state import StepKey
+
+
+def step_dependencies(steps: list[dict], index: int) -> list[int]:
+    """0-based indexes of the steps ``steps[index]`` waits for."""
+    depends_on = steps[index].get(StepKey.DEPENDS_ON)
+    if depends_on is None:
+        return [index - 1] if index > 0 else []
+
+    return sorted(
+        {
+            number - 1
+            for number in depends_on
+            if isinstance(number, int) and 0 < number <= index
+        }
+    )
+
+
+def is_step_ready(steps: list[dict], index: int) -> bool:
+    return all(
+        steps[dep]['status'] == PlanStepStatusEnum.SUCCESS
+        for dep in step_dependencies(steps, index)
+    )
+
+
+def count_in_flight(steps: list[dict]) -> int:
+    return sum(1 for step in steps if step['status'] == PlanStepStatusEnum.SUBMITTED)
+
+
+def next_runnable_step(
+    steps: list[dict], visited: set[int], max_in_flight: int
+) -> Optional[int]:
+    """
+    Return the first step (in plan order) that should run next, or None.
+
+    - success steps and steps already handled in this pass are skipped
+    - submitted steps are always polled (they already own a worker slot)
+    - other steps need all dependencies succeeded and a free worker slot
+    """
+    in_flight = count_in_flight(steps)
+    for index, step in enumerate(steps):
+        if index in visited or step['status'] == PlanStepStatusEnum.SUCCESS:
+            continue
+        if step['status'] == PlanStepStatusEnum.SUBMITTED:
+            return index
+        if in_flight < max_in_flight and is_step_ready(steps, index):
+            return index
+
+    return None
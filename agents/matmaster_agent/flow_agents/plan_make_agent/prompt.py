@@ -60,6 +60,7 @@ Return a JSON structure with the following format:
           "tool_name": <string|null>,  // Name of the tool to use (exact match from available list). Use null if no suitable tool exists
           "step_description": <string>,     // MUST be in {{target_language}} and follow STEP_DESCRIPTION FORMAT
           "feasibility": <string>,     // MUST be in {{target_language}}
+          "depends_on": <list[int]|null>,  // 1-based numbers of earlier steps whose outputs this step needs; [] if independent; null means "depends on the previous step"
           "status": "plan"             // Always return "plan"
         }}
       ]
@@ -89,6 +90,7 @@ EXECUTION PRINCIPLES:
 - **Maintain strict sequential processing: complete all operations for one structure before moving to the next, or group by operation type across all structures**
 - Prioritize accuracy over assumptions
 - Maintain logical flow in step sequencing
+- Fill "depends_on" precisely: steps that do not consume any earlier step's output (e.g. searching or calculating different structures independently) MUST use [] so they can run in parallel; only reference earlier steps
 - Ensure step_descriptions clearly communicate purpose
 - Validate tool compatibility before assignment
 
@@ -3,15 +3,25 @@ from typing import List, Literal, Optional
 from pydantic import BaseModel, create_model
 
 from agents.matmaster_agent.flow_agents.model import PlanStepStatusEnum
+from agents.matmaster_agent.utils.schema_cache import CachedSchemaModel, cached_models
 
 
 def create_dynamic_multi_plans_schema(available_tools: list):
+    # 同一组工具复用同一个 schema（工具排序后作为缓存键）
+    tools = sorted(set(available_tools))
+    return cached_models(
+        ['multi_plans', tools], lambda: _build_multi_plans_schema(tuple(tools))
+    )
+
+
+def _build_multi_plans_schema(available_tools: tuple):
     # 动态创建 PlanStepSchema
     DynamicPlanStepSchema = create_model(
         'DynamicPlanStepSchema',
-        tool_name=(Optional[Literal[tuple(available_tools)]], None),
+        tool_name=(Optional[Literal[available_tools]], None),
         step_description=(str, ...),
         feasibility=(str, ...),
+        depends_on=(Optional[List[int]], None),
         status=(
             Literal[tuple(PlanStepStatusEnum.__members__.values())],
             PlanStepStatusEnum.PLAN.value,
@@ -34,7 +44,7 @@ def create_dynamic_multi_plans_schema(available_tools: list):
         intro=(str, ...),
         plans=(List[DynamicPlanSchema], ...),
         overall=(str, ...),
-        __base__=BaseModel,
+        __base__=CachedSchemaModel,
     )
 
     return DynamicMultiPlansSchema
@@ -0,0 +1,85 @@
+"""
+Copy-on-write updates of the plan (and other nested session state).
+
+State values are treated as immutable: an update builds a new plan that
+shares every untouched step with the previous one, instead of deep-copying
+the whole plan. ADK applies a state delta by replacing the key, so events
+still carry a full plan, but only the changed step is new memory and the
+change itself is described by StepDelta (update_state_event logs the deltas
+rather than the whole plan).
+
+apply_step_deltas is the reducer: replaying the deltas of diff_steps(old,
+new) onto ``old`` reconstructs ``new``.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Optional
+
+from agents.matmaster_agent.state import PLAN
+
+
+@dataclass(frozen=True, slots=True)
+class StepDelta:
+    """Fields of ``plan['steps'][index]`` to set."""
+
+    index: int
+    fields: Mapping[str, Any]
+
+
+def apply_step_deltas(plan: dict, deltas: Iterable[StepDelta]) -> dict:
+    """New plan with ``deltas`` applied; ``plan`` is not modified."""
+    steps = list(plan['steps'])
+    for delta in deltas:
+        steps[delta.index] = {**steps[delta.index], **delta.fields}
+    return {**plan, 'steps': steps}
+
+
+def with_step_fields(plan: dict, index: int, **fields) -> dict:
+    return apply_step_deltas(plan, [StepDelta(index, fields)])
+
+
+def with_entry_fields(mapping: dict, key: str, **fields) -> dict:
+    """``mapping`` with ``fields`` set on ``mapping[key]``, e.g. one of long_running_jobs."""
+    return {**mapping, key: {**mapping.get(key, {}), **fields}}
+
+
+def diff_steps(old: dict, new: dict) -> Optional[list[StepDelta]]:
+    """
+    Step deltas turning ``old`` into ``new``, or None when they differ
+    elsewhere (other plan keys, number of steps, removed step fields).
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None
+    old_steps, new_steps = old.get('steps'), new.get('steps')
+    if not isinstance(old_steps, list) or not isinstance(new_steps, list):
+        return None
+    if len(old_steps) != len(new_steps) or old.keys() != new.keys():
+        return None
+    if any(old[key] != new[key] for key in old if key != 'steps'):
+        return None
+
+    deltas = []
+    for index, (old_step, new_step) in enumerate(zip(old_steps, new_steps)):
+        if old_step is new_step:
+            continue
+        if old_step.keys() - new_step.keys():
+            return None
+        fields = {
+            k: v for k, v in new_step.items() if k not in old_step or old_step[k] != v
+        }
+        if fields:
+            deltas.append(StepDelta(index, fields))
+    return deltas
+
+
+def loggable_state_delta(state: Mapping, state_delta: dict) -> dict:
+    """``state_delta`` with the plan replaced by its step deltas when possible."""
+    if PLAN not in state_delta:
+        return state_delta
+    deltas = diff_steps(state.get(PLAN), state_delta[PLAN])
+    if deltas is None:
+        return state_delta
+    return {
+        **state_delta,
+        PLAN: [{'step': d.index, **d.fields} for d in deltas],
+    }
@@ -0,0 +1,187 @@
+"""
+Step titles for the execution flow.
+
+template_step_title() derives the heading of a plan step without a model
+call, through the locale templates 'StepTitle' / 'StepTitleWithArgs': the
+action is the first clause of the step description, which the planner writes
+in the session language, followed by the step's tool arguments once known.
+Without a description, English titles use the "What it does" line of the
+tool's ALL_TOOLS metadata (which has no Chinese descriptions); otherwise
+'StepTitleFallback' names the tool.
+
+refine_step_title() is the former LLM title, requested through
+MatMasterLlmConfig.tool_schema_model and traced by its opik tracer; the
+execution agent runs it in the background when STEP_TITLE_LLM_REFINE is on
+and the step never waits for it.
+"""
+
+import json
+import logging
+import re
+import unicodedata
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import BaseLlm, LlmRequest
+from google.genai import types
+
+from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
+from agents.matmaster_agent.flow_agents.step_title_agent.prompt import (
+    STEP_TITLE_INSTRUCTION,
+)
+from agents.matmaster_agent.flow_agents.step_title_agent.schema import StepTitleSchema
+from agents.matmaster_agent.llm_config import MatMasterLlmConfig
+from agents.matmaster_agent.locales import i18n
+from agents.matmaster_agent.logger import PrefixFilter
+from agents.matmaster_agent.state import STEP_DESCRIPTION
+from agents.matmaster_agent.sub_agents.tools import ALL_TOOLS
+
+logger = logging.getLogger(__name__)
+logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
+logger.setLevel(logging.INFO)
+
+# 标题最大显示宽度，中日韩等全角字符计 2
+MAX_TITLE_WIDTH = 60
+# 标题中展示的参数个数及单个参数的最大显示宽度
+MAX_TITLE_ARGS = 2
+MAX_ARG_WIDTH = 24
+# 句末标点或换行（含重试时追加的「注意：」说明）处截断
+_CLAUSE_END = re.compile(r'[。；;！!？?\n]|\.(?:\s|$)')
+_LEADING_MARKS = re.compile(r'^[\s#>*\-•\d.、)）]+')
+
+
+def _first_clause(text: str) -> str:
+    clause = _CLAUSE_END.split(_LEADING_MARKS.sub('', text or ''), maxsplit=1)[0]
+    return clause.strip(' \t*_`:：,，')
+
+
+def _what_it_does(tool_name: str) -> str:
+    description = ALL_TOOLS.get(tool_name, {}).get('description', '')
+    for line in description.splitlines():
+        if line.startswith('What it does:'):
+            return _first_clause(line.removeprefix('What it does:'))
+    return ''
+
+
+def _char_width(char: str) -> int:
+    return 2 if unicodedata.east_asian_width(char) in 'WF' else 1
+
+
+def title_width(text: str) -> int:
+    return sum(_char_width(char) for char in text)
+
+
+def _truncate(text: str, max_width: int) -> str:
+    if title_width(text) <= max_width:
+        return text
+    width = 1  # 省略号
+    for end, char in enumerate(text):
+        width += _char_width(char)
+        if width > max_width:
+            return text[:end].rstrip() + '…'
+    return text
+
+
+def _arg_text(name: str, value: Any) -> str:
+    """Short display form of one tool argument, '' when it does not fit a title."""
+    if isinstance(value, list) and value:
+        first = _arg_text(name, value[0])
+        return f'{first} +{len(value) - 1}' if first and len(value) > 1 else first
+    if isinstance(value, bool) or value is None:
+        return ''
+    if isinstance(value, (int, float)):
+        return f'{name}={value:g}'
+    if not isinstance(value, str):
+        return ''
+    # 文件 URL / 路径只保留文件名
+    text = value.strip().rstrip('/').rsplit('/', 1)[-1]
+    if not text or '\n' in text or title_width(text) > MAX_ARG_WIDTH:
+        return ''
+    return text
+
+
+def _args_summary(tool_args: Optional[dict]) -> str:
+    texts = []
+    for name, value in (tool_args or {}).items():
+        if text := _arg_text(name, value):
+            texts.append(text)
+        if len(texts) == MAX_TITLE_ARGS:
+            break
+    return ', '.join(texts)
+
+
+def template_step_title(
+    step: dict, language: Optional[str] = None, tool_args: Optional[dict] = None
+) -> str:
+    """
+    Deterministic title of plan ``step`` in ``language`` (default:
+    i18n.language); ``tool_args`` are the step's tool arguments, when known.
+    """
+    language = language or i18n.language
+    tool_name = step.get('tool_name') or ''
+    action = _first_clause(step.get(STEP_DESCRIPTION, ''))
+    if not action and language == 'en':
+        action = _what_it_does(tool_name)
+    if not action:
+        return _truncate(
+            i18n.t('StepTitleFallback', language=language, tool_name=tool_name),
+            MAX_TITLE_WIDTH,
+        )
+    args = _args_summary(tool_args)
+    key = 'StepTitleWithArgs' if args else 'StepTitle'
+    title = i18n.t(key, language=language, action=action, args=args)
+    # 过长时先截短动作描述，尽量保留参数
+    overflow = title_width(title) - MAX_TITLE_WIDTH
+    if overflow > 0 and args:
+        action = _truncate(action, title_width(action) - overflow)
+        title = i18n.t(key, language=language, action=action, args=args)
+    return _truncate(title, MAX_TITLE_WIDTH)
+
+
+async def refine_step_title(
+    step: dict,
+    target_language: str,
+    callback_context: Optional[CallbackContext] = None,
+    llm: Optional[BaseLlm] = None,
+) -> Optional[str]:
+    """
+    LLM title of ``step`` from ``llm`` (default:
+    MatMasterLlmConfig.tool_schema_model), traced by the opik tracer under
+    ``callback_context`` when given; None on any failure, the template title
+    stays.
+    """
+    llm = llm or MatMasterLlmConfig.tool_schema_model
+    tracer = MatMasterLlmConfig.opik_tracer
+    llm_request = LlmRequest(
+        model=llm.model,
+        contents=[
+            types.Content(
+                role='user',
+                parts=[
+                    types.Part(
+                        text=f"According to the plan, I will call the "
+                        f"`{step.get('tool_name')}`: {step.get(STEP_DESCRIPTION, '')}"
+                    )
+                ],
+            )
+        ],
+        config=types.GenerateContentConfig(),
+    )
+    llm_request.append_instructions(
+        [STEP_TITLE_INSTRUCTION.format(target_language=target_language)]
+    )
+    llm_request.set_output_schema(StepTitleSchema)
+    try:
+        if callback_context is not None:
+            tracer.before_model_callback(callback_context, llm_request)
+        llm_response = None
+        async for llm_response in llm.generate_content_async(llm_request):
+            pass
+        if callback_context is not None:
+            tracer.after_model_callback(callback_context, llm_response)
+        text = ''.join(part.text or '' for part in llm_response.content.parts)
+        title = json.loads(text).get('title')
+    except Exception as e:
+        logger.warning(f'refine_step_title failed: {e}')
+        return None
+    return str(title or '').strip() or None
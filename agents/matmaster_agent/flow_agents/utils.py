@@ -6,9 +6,11 @@ from google.adk.agents import InvocationContext
 
 from agents.matmaster_agent.constant import FRONTEND_STATE_KEY
 from agents.matmaster_agent.flow_agents.model import PlanStepStatusEnum
+from agents.matmaster_agent.flow_agents.plan_state import with_entry_fields
 from agents.matmaster_agent.flow_agents.scene_agent.model import SceneEnum
 from agents.matmaster_agent.flow_agents.schema import FlowStatusEnum
 from agents.matmaster_agent.llm_config import MatMasterLlmConfig
+from agents.matmaster_agent.services.job_watcher import get_job_watcher
 from agents.matmaster_agent.state import (
     BIZ,
     MULTI_PLANS,
@@ -20,7 +22,7 @@ from agents.matmaster_agent.sub_agents.mapping import (
     AGENT_CLASS_MAPPING,
     ALL_AGENT_TOOLS_LIST,
 )
-from agents.matmaster_agent.sub_agents.tools import ALL_TOOLS
+from agents.matmaster_agent.sub_agents.tool_registry import TOOL_REGISTRY
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -30,28 +32,19 @@ def get_tools_list(ctx: InvocationContext, scenes: list):
     if not scenes:
         return ALL_AGENT_TOOLS_LIST
     else:
-        tools_list_by_scene = [
-            k
-            for k, v in ALL_TOOLS.items()
-            if any(scene in v['scene'] for scene in scenes)
-        ]
-        if not ctx.session.state[UPLOAD_FILE]:
-            final_tools_list = [
-                t
-                for t in tools_list_by_scene
-                if SceneEnum.NEED_UPLOAD_FILE not in ALL_TOOLS[t]['scene']
-            ]
-        else:
-            final_tools_list = tools_list_by_scene
+        return list(
+            TOOL_REGISTRY.tools_for_scenes(scenes, ctx.session.state[UPLOAD_FILE])
+        )
 
-        return final_tools_list
+
+def _belonging_agent(tool_name):
+    if tool_name not in TOOL_REGISTRY:
+        raise RuntimeError(f"ToolName Error: {tool_name}")
+    return TOOL_REGISTRY.agent_of(tool_name)
 
 
 def get_agent_name(tool_name, sub_agents):
-    try:
-        target_agent_name = ALL_TOOLS[tool_name]['belonging_agent']
-    except BaseException:
-        raise RuntimeError(f"ToolName Error: {tool_name}")
+    target_agent_name = _belonging_agent(tool_name)
 
     for sub_agent in sub_agents:
         if sub_agent.name == target_agent_name:
@@ -66,10 +59,7 @@ def get_agent_for_tool(tool_name, sub_agents):
     agent = get_agent_name(tool_name, sub_agents)
     if agent is not None:
         return agent
-    try:
-        target_agent_name = ALL_TOOLS[tool_name]['belonging_agent']
-    except BaseException:
-        raise RuntimeError(f"ToolName Error: {tool_name}")
+    target_agent_name = _belonging_agent(tool_name)
     if target_agent_name not in AGENT_CLASS_MAPPING:
         raise RuntimeError(
             f"Agent for tool {tool_name} (belonging_agent={target_agent_name}) "
@@ -130,7 +120,7 @@ def should_bypass_confirmation(ctx: InvocationContext) -> bool:
         first_tool_name = plan_steps[0].get('tool_name', '')
 
         # Check if this tool has bypass_confirmation set to True
-        if ALL_TOOLS.get(first_tool_name, {}).get('bypass_confirmation') is True:
+        if TOOL_REGISTRY.bypass_confirmation(first_tool_name):
             return True
 
     # TODO: Add more logic here for handling multiple tools in the plan
@@ -149,18 +139,12 @@ def should_bypass_confirmation(ctx: InvocationContext) -> bool:
 
 def find_alternative_tool(current_tool_name: str) -> List[str]:
     """Return alternative tool names for the current tool (maybe empty)."""
-    tool = ALL_TOOLS.get(current_tool_name)
-    if not tool:
-        return []
-    return tool.get('alternative', [])
+    return TOOL_REGISTRY.alternatives(current_tool_name)
 
 
 def has_self_check(current_tool_name: str) -> bool:
     """Return self check info for the current tool."""
-    tool = ALL_TOOLS.get(current_tool_name)
-    if not tool:
-        return False
-    return tool.get('self_check', False)
+    return TOOL_REGISTRY.self_check(current_tool_name)
 
 
 def scenes_contain_query_job_status(ctx: InvocationContext) -> bool:
@@ -170,6 +154,27 @@ def scenes_contain_query_job_status(ctx: InvocationContext) -> bool:
     return any(getattr(s, 'value', s) == query_value for s in scenes)
 
 
+def watched_jobs_state_delta(ctx: InvocationContext) -> dict:
+    """
+    State delta recording in long_running_jobs the ``job_status`` of the jobs
+    the JobWatcher saw finish since the last turn. The submitting steps stay
+    SUBMITTED: the result agent fetches each job's result and updates its step.
+    """
+    jobs = ctx.session.state.get('long_running_jobs') or {}
+    state_delta = {}
+    for event in get_job_watcher().drain(ctx.session.id):
+        job = jobs.get(event.origin_job_id)
+        if job is None or job.get('job_status') == event.status:
+            continue
+        logger.info(
+            f'{ctx.session.id} origin_job_id = {event.origin_job_id}, '
+            f'watched status = {event.status}'
+        )
+        jobs = with_entry_fields(jobs, event.origin_job_id, job_status=event.status)
+        state_delta['long_running_jobs'] = jobs
+    return state_delta
+
+
 def is_plan_confirmed(ctx: InvocationContext) -> bool:
     # 1) 原有：前端状态里已确认
     biz_state = ctx.session.state.get(FRONTEND_STATE_KEY, {}).get(BIZ, {})
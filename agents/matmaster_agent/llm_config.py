@@ -2,8 +2,6 @@ import logging
 import os
 
 from dotenv import load_dotenv
-from google.adk.models.lite_llm import LiteLlm
-from opik.integrations.adk import OpikTracer
 
 from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
 
@@ -53,9 +51,56 @@ MODEL_MAPPING = {
 
 DEFAULT_MODEL = os.getenv('DEFAULT_MODEL', 'litellm_proxy/azure/gpt-5-chat')
 TOOL_SCHEMA_MODEL = os.getenv('TOOL_SCHEMA_MODEL', 'azure/gpt-4o')
+ENABLE_OPIK_TRACER = os.getenv('ENABLE_OPIK_TRACER', '1').lower() not in (
+    '0',
+    'false',
+)
+
+
+# LLMConfig attribute -> MODEL_MAPPING key
+MODEL_ATTRS = {
+    # Gemini Models
+    'gemini_2_0_flash': ('litellm_proxy', 'gemini-2.0-flash'),
+    'gemini_2_5_flash': ('litellm_proxy', 'gemini-2.5-flash'),
+    'gemini_2_5_pro': ('litellm_proxy', 'gemini-2.5-pro'),
+    'gemini_3_flash': ('litellm_proxy', 'gemini-3-flash'),
+    'gemini_3_pro': ('litellm_proxy', 'gemini-3-pro'),
+    # Claude Models
+    'claude_sonnet_4': ('litellm_proxy', 'claude-sonnet-4'),
+    # Deepseek Models
+    'deepseek_chat': ('deepseek', 'deepseek-chat'),
+    # GPT Models
+    'gpt_4o_mini': ('azure', 'gpt-4o-mini'),
+    'gpt_4o': ('azure', 'gpt-4o'),
+    'gpt_5': ('litellm_proxy', 'gpt-5'),
+    'gpt_5_nano': ('litellm_proxy', 'gpt-5-nano'),
+    'gpt_5_mini': ('litellm_proxy', 'gpt-5-mini'),
+    'gpt_5_chat': ('litellm_proxy', 'gpt-5-chat'),
+}
+
+
+class _NoopTracer:
+    """Stand-in for OpikTracer when tracing is disabled; every callback is a no-op."""
+
+    def _noop(self, *args, **kwargs):
+        return None
+
+    before_agent_callback = after_agent_callback = _noop
+    before_model_callback = after_model_callback = _noop
+    before_tool_callback = after_tool_callback = _noop
 
 
 class LLMConfig:
+    """
+    Singleton holding the LiteLlm instances used across agents.
+
+    Models are built on first attribute access (``config.gpt_4o``,
+    ``config.default_litellm_model`` ...) and cached per resolved model name, so
+    importing this module neither imports litellm nor creates any client.
+    The OpikTracer is created lazily as well and can be disabled with
+    ``ENABLE_OPIK_TRACER=0``.
+    """
+
     _instance = None
 
     def __new__(cls):
@@ -68,78 +113,51 @@ class LLMConfig:
         if self._initialized:
             return
 
-        azure_provider = 'azure'
-        litellm_provider = 'litellm_proxy'
-        deepseek_provider = 'deepseek'
-
-        gpt_4o = 'gpt-4o'
-        gpt_4o_mini = 'gpt-4o-mini'
-        gemini_2_5_flash = 'gemini-2.5-flash'
-        gemini_2_0_flash = 'gemini-2.0-flash'
-        gemini_2_5_pro = 'gemini-2.5-pro'
-        gemini_3_flash = 'gemini-3-flash'
-        gemini_3_pro = 'gemini-3-pro'
-        claude_sonnet_4 = 'claude-sonnet-4'
-        deepseek_chat = 'deepseek-chat'
-        gpt_5 = 'gpt-5'
-        gpt_5_nano = 'gpt-5-nano'
-        gpt_5_mini = 'gpt-5-mini'
-        gpt_5_chat = 'gpt-5-chat'
-
-        # Helper to init any provider model
-        def _init_model(model: str):
+        self._models = {}  # model name -> LiteLlm
+        self._opik_tracer = None
+
+        self._initialized = True
+
+    def get_model(self, model: str):
+        """Return the cached LiteLlm for ``model``, creating it on first use."""
+        if model not in self._models:
+            from google.adk.models.lite_llm import LiteLlm
+
             llm_kwargs = {}
-            if model.endswith(gpt_5_chat) and 'litellm' in model:
+            if model.endswith('gpt-5-chat') and 'litellm' in model:
                 llm_kwargs = {'stream_options': {'include_usage': True}}
             logger.info(
                 f'[{MATMASTER_AGENT_NAME}] model = {model}, llm_kwargs = {llm_kwargs}'
             )
-
-            return LiteLlm(model=model, **llm_kwargs)
-
-        # Gemini Models
-        self.gemini_2_0_flash = _init_model(
-            MODEL_MAPPING.get((litellm_provider, gemini_2_0_flash))
-        )
-        self.gemini_2_5_flash = _init_model(
-            MODEL_MAPPING.get((litellm_provider, gemini_2_5_flash))
-        )
-        self.gemini_2_5_pro = _init_model(
-            MODEL_MAPPING.get((litellm_provider, gemini_2_5_pro))
-        )
-        self.gemini_3_flash = _init_model(
-            MODEL_MAPPING.get((litellm_provider, gemini_3_flash))
-        )
-        self.gemini_3_pro = _init_model(
-            MODEL_MAPPING.get((litellm_provider, gemini_3_pro))
-        )
-
-        # Claude Models
-        self.claude_sonnet_4 = _init_model(
-            MODEL_MAPPING.get((litellm_provider, claude_sonnet_4))
-        )
-
-        # Deepseek Models
-        self.deepseek_chat = _init_model(
-            MODEL_MAPPING.get((deepseek_provider, deepseek_chat))
-        )
-
-        # GPT Models
-        self.gpt_4o_mini = _init_model(MODEL_MAPPING.get((azure_provider, gpt_4o_mini)))
-        self.gpt_4o = _init_model(MODEL_MAPPING.get((azure_provider, gpt_4o)))
-        self.gpt_5 = _init_model(MODEL_MAPPING.get((litellm_provider, gpt_5)))
-        self.gpt_5_nano = _init_model(MODEL_MAPPING.get((litellm_provider, gpt_5_nano)))
-        self.gpt_5_mini = _init_model(MODEL_MAPPING.get((litellm_provider, gpt_5_mini)))
-        self.gpt_5_chat = _init_model(MODEL_MAPPING.get((litellm_provider, gpt_5_chat)))
-
-        # Default Model
-        self.default_litellm_model = _init_model(DEFAULT_MODEL)
-        self.tool_schema_model = _init_model(TOOL_SCHEMA_MODEL)
-
-        # tracing
-        self.opik_tracer = OpikTracer()
-
-        self._initialized = True
+            self._models[model] = LiteLlm(model=model, **llm_kwargs)
+        return self._models[model]
+
+    def __getattr__(self, name):
+        # only called when normal lookup fails, i.e. for not-yet-built models
+        if name == 'default_litellm_model':
+            model = DEFAULT_MODEL
+        elif name == 'tool_schema_model':
+            model = TOOL_SCHEMA_MODEL
+        elif name in MODEL_ATTRS:
+            model = MODEL_MAPPING[MODEL_ATTRS[name]]
+        else:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        llm = self.get_model(model)
+        setattr(self, name, llm)
+        return llm
+
+    @property
+    def opik_tracer(self):
+        if self._opik_tracer is None:
+            if ENABLE_OPIK_TRACER:
+                from opik.integrations.adk import OpikTracer
+
+                self._opik_tracer = OpikTracer()
+            else:
+                self._opik_tracer = _NoopTracer()
+        return self._opik_tracer
 
 
 def create_default_config() -> LLMConfig:
@@ -1,3 +1,6 @@
+from contextvars import ContextVar
+from typing import Optional
+
 from toolsy.i8n import I18N
 
 translations = {
@@ -26,6 +29,10 @@ translations = {
         'NoFoundStructure': 'No eligible structures found.',
         'WalletNoFee': 'Insufficient wallet balance',
         'WalletNoFeeAction': 'Insufficient wallet balance. Please top up your account on [this page](https://www.bohrium.com/consume?menu=cash) and try again.',
+        'StepTitle': '{action}',
+        'StepTitleWithArgs': '{action}: {args}',
+        'StepTitleFallback': 'Run {tool_name}',
+        'StepJobResult': 'Retrieve Job Result',
     },
     'zh': {
         'JobStatus': '任务状态',
@@ -52,7 +59,54 @@ translations = {
         'NoFoundStructure': '未找到符合条件的结构',
         'WalletNoFee': '钱包余额不足',
         'WalletNoFeeAction': '钱包余额不足，请在[此页面](https://www.bohrium.com/consume?menu=cash)充值后重试。',
+        'StepTitle': '{action}',
+        'StepTitleWithArgs': '{action}：{args}',
+        'StepTitleFallback': '执行 {tool_name}',
+        'StepJobResult': '获取任务结果',
     },
 }
 
-i18n = I18N(translations=translations)
+# 当前请求（asyncio task）的界面语言；create_task 会复制 context，子任务自动继承
+_current_language: ContextVar[Optional[str]] = ContextVar(
+    'matmaster_language', default=None
+)
+
+
+class SessionI18N:
+    """
+    I18N facade whose ``language`` lives in a ContextVar instead of on a
+    module-global object, so concurrent sessions served by one process never
+    overwrite each other's language.
+
+    ``i18n.language = 'zh'`` only affects the current task (and tasks it
+    spawns afterwards); ``i18n.t(key)`` reads from the matching catalog.
+    """
+
+    def __init__(self, translations: dict):
+        self._default = I18N(translations=translations)
+        self._catalogs = {}
+        for language in translations:
+            catalog = I18N(translations=translations)
+            catalog.language = language
+            self._catalogs[language] = catalog
+
+    @property
+    def language(self) -> str:
+        return _current_language.get() or self._default.language
+
+    @language.setter
+    def language(self, language: str) -> None:
+        # 与 toolsy I18N 一致：未配置翻译的语言忽略
+        if language in self._catalogs:
+            _current_language.set(language)
+
+    def t(self, *args, language: Optional[str] = None, **kwargs):
+        # language 指定时按该语言翻译，不改变当前语言
+        catalog = self._catalogs.get(language or self.language, self._default)
+        return catalog.t(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._default, name)
+
+
+i18n = SessionI18N(translations=translations)
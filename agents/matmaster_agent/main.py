@@ -8,6 +8,9 @@ from rich import print
 from agents.matmaster_agent.agent import root_agent
 from agents.matmaster_agent.constant import DBUrl
 from agents.matmaster_agent.logger import logger
+from agents.matmaster_agent.services.http_client import close_http_client
+from agents.matmaster_agent.services.job_watcher import close_job_watcher
+from agents.matmaster_agent.services.memory_queue import close_memory_write_queue
 
 # litellm._turn_on_debug()
 
@@ -117,6 +120,9 @@ async def agent_main() -> None:
 
     # Clean up resources
     await runner.close()
+    await close_job_watcher()
+    await close_memory_write_queue()
+    await close_http_client()
 
 
 if __name__ == '__main__':
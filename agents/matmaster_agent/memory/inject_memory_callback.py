@@ -15,7 +15,10 @@ from google.genai.types import Content, Part
 
 from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
 from agents.matmaster_agent.logger import PrefixFilter
-from agents.matmaster_agent.services.memory import format_short_term_memory
+from agents.matmaster_agent.services.memory import (
+    format_short_term_memory,
+    memory_cache_stats,
+)
 from agents.matmaster_agent.state import PLAN, STEP_DESCRIPTION
 
 logger = logging.getLogger(__name__)
@@ -69,11 +72,13 @@ async def inject_memory_before_model_impl(
     memory_content = Content(role='user', parts=[Part(text=block)])
     llm_request.contents = [memory_content] + list(llm_request.contents)
     logger.info(
-        'inject_memory session_id=%s agent=%s query_len=%d block_len=%d',
+        'inject_memory session_id=%s agent=%s query_len=%d block_len=%d '
+        'cache_hit_rate=%.2f',
         session_id,
         callback_context.agent_name,
         len(query),
         len(block),
+        memory_cache_stats().hit_rate,
     )
 
 
@@ -16,7 +16,7 @@ from mcp.types import CallToolResult
 from agents.matmaster_agent.constant import FRONTEND_STATE_KEY, MATMASTER_AGENT_NAME
 from agents.matmaster_agent.logger import PrefixFilter
 from agents.matmaster_agent.memory.constant import MEMORY_TOOLS_STORE_RESULTS
-from agents.matmaster_agent.services.memory import memory_write
+from agents.matmaster_agent.services.memory_queue import enqueue_memory_write
 
 logger = logging.getLogger(__name__)
 logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
@@ -79,13 +79,13 @@ def store_tool_result_in_memory(func: Any) -> Any:
             logger.debug('store_tool_result_in_memory: no session_id, skip')
             return inner_result
         summary = _format_tool_result_summary(tool, args, tool_response)
-        await memory_write(
+        enqueue_memory_write(
             session_id=session_id,
             text=summary,
             metadata={'tool': tool.name, 'source': 'tool_result'},
         )
         logger.info(
-            'store_tool_result_in_memory session_id=%s tool=%s stored',
+            'store_tool_result_in_memory session_id=%s tool=%s queued',
             session_id,
             tool.name,
         )
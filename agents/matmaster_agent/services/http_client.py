@@ -0,0 +1,180 @@
+"""
+Process-wide pooled aiohttp client shared by services/*.
+
+One ClientSession per running event loop, backed by a TCPConnector with
+per-host connection caps, keep-alive and DNS caching (see config.HTTP_*).
+Every call carries an EndpointPolicy (timeouts + retries); connection errors,
+timeouts and retryable status codes are retried with exponential backoff
+before the response is handed to the caller.
+
+Call close_http_client() on shutdown to release pooled connections.
+"""
+
+import asyncio
+import logging
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+import aiohttp
+
+from agents.matmaster_agent.config import (
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class EndpointPolicy:
+    """Timeout and retry policy applied to one class of endpoints."""
+
+    connect_timeout: Optional[float] = 5
+    total_timeout: Optional[float] = 60
+    # 两次读取之间的最长间隔，适用于大文件下载
+    sock_read_timeout: Optional[float] = None
+    retries: int = 0
+    backoff: float = 0.5
+    retry_statuses: tuple[int, ...] = (502, 503, 504)
+
+    def client_timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(
+            connect=self.connect_timeout,
+            total=self.total_timeout,
+            sock_read=self.sock_read_timeout,
+        )
+
+
+DEFAULT_POLICY = EndpointPolicy()
+# memory service: connect 3s, read 10s
+MEMORY_POLICY = EndpointPolicy(connect_timeout=3, total_timeout=13, retries=1)
+# memory_retrieve 在 before_model 热路径上，失败直接返回空结果，不重试
+MEMORY_RETRIEVE_POLICY = EndpointPolicy(connect_timeout=3, total_timeout=13)
+# matmaster-tools-server (session files / quota / questions)
+TOOLS_SERVER_POLICY = EndpointPolicy(connect_timeout=5, total_timeout=30, retries=2)
+# ICL 示例检索：超出延迟预算时调用方直接用兜底示例，请求在后台继续
+ICL_POLICY = EndpointPolicy(connect_timeout=3, total_timeout=10)
+# Bohrium OpenAPI (project / job)
+OPENAPI_POLICY = EndpointPolicy(connect_timeout=5, total_timeout=60, retries=2)
+# 非幂等请求（提交任务、扣费）不重试
+WRITE_POLICY = EndpointPolicy(connect_timeout=5, total_timeout=60)
+# 文件下载 / 结构文件：总时长上限与原 aiohttp 默认值（300s）一致，读取停滞 60s 即失败
+DOWNLOAD_POLICY = EndpointPolicy(
+    connect_timeout=10, total_timeout=300, sock_read_timeout=60, retries=1
+)
+
+# event loop -> ClientSession（aiohttp 的 session 不能跨 loop 复用）
+_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _new_client() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def get_http_client() -> aiohttp.ClientSession:
+    """Return the pooled ClientSession bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.closed:
+        client = _new_client()
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the pooled ClientSession of the running event loop, if any."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.closed:
+        await client.close()
+
+
+async def _send(
+    method: str, url: str, policy: EndpointPolicy, **kwargs: Any
+) -> aiohttp.ClientResponse:
+    kwargs.setdefault('timeout', policy.client_timeout())
+    attempt = 0
+    while True:
+        try:
+            response = await get_http_client().request(method, url, **kwargs)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if attempt >= policy.retries:
+                raise
+            logger.info(f'{method} {url} failed ({e!r}), retry {attempt + 1}')
+        else:
+            if (
+                response.status not in policy.retry_statuses
+                or attempt >= policy.retries
+            ):
+                return response
+            logger.info(
+                f'{method} {url} returned {response.status}, retry {attempt + 1}'
+            )
+            response.release()
+
+        await asyncio.sleep(policy.backoff * 2**attempt)
+        attempt += 1
+
+
+@asynccontextmanager
+async def request(
+    method: str,
+    url: str,
+    *,
+    policy: EndpointPolicy = DEFAULT_POLICY,
+    **kwargs: Any,
+) -> AsyncIterator[aiohttp.ClientResponse]:
+    """
+    Issue a request through the shared pool.
+
+    Usage mirrors ``session.request``::
+
+        async with request('GET', url, policy=TOOLS_SERVER_POLICY) as response:
+            ...
+
+    The connection is returned to the pool when the block exits.
+    """
+    response = await _send(method, url, policy, **kwargs)
+    try:
+        yield response
+    finally:
+        response.release()
+
+
+async def request_json(
+    method: str,
+    url: str,
+    *,
+    policy: EndpointPolicy = DEFAULT_POLICY,
+    raise_for_status: bool = True,
+    **kwargs: Any,
+) -> Any:
+    """Shortcut for a request whose body is read as JSON."""
+    async with request(method, url, policy=policy, **kwargs) as response:
+        if raise_for_status:
+            response.raise_for_status()
+        return await response.json(content_type=None)
+
+
+async def request_text(
+    method: str,
+    url: str,
+    *,
+    policy: EndpointPolicy = DEFAULT_POLICY,
+    raise_for_status: bool = True,
+    **kwargs: Any,
+) -> str:
+    """Shortcut for a request whose body is read as text."""
+    async with request(method, url, policy=policy, **kwargs) as response:
+        if raise_for_status:
+            response.raise_for_status()
+        return await response.text()
@@ -1,44 +1,127 @@
-import requests
+"""
+ICL example selection from the ICL service.
 
+Lookups are cached per (endpoint, env, normalized query) for ICL_CACHE_TTL
+seconds and identical concurrent lookups share one request. Callers wait at
+most ICL_LATENCY_BUDGET seconds: past that they get the fallback examples
+while the request keeps running in the background and fills the cache.
+
+Fallback examples come from the in-process retriever (services/icl_local.py),
+or FALLBACK_EXAMPLES when it finds nothing. With ICL_BACKEND = 'local' the
+service is not called at all.
+"""
+
+import asyncio
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+
+from agents.matmaster_agent.config import (
+    ICL_BACKEND,
+    ICL_CACHE_SIZE,
+    ICL_CACHE_TTL,
+    ICL_LATENCY_BUDGET,
+)
 from agents.matmaster_agent.constant import ICL_SERVICE_URL
+from agents.matmaster_agent.services.http_client import ICL_POLICY, request_json
+from agents.matmaster_agent.services.icl_local import get_local_retriever
 
+FALLBACK_EXAMPLES = [
+    {
+        'input': '请为我构建一个铁的 bcc 结构',
+        'update_input': '请构建铁的体心立方（bcc）晶体结构，空间群为Im-3m，晶格常数为2.87Å',
+        'toolchain': ['build_bulk_structure_by_template', 'optimize_structure'],
+        'scene_tags': ['structure_generate', 'optimize_structure'],
+    }
+]
+
+# (endpoint, current_env, normalized query)
+_IclKey = tuple[str, str, str]
+
+_cache: OrderedDict[_IclKey, tuple[list, float]] = OrderedDict()
+_inflight: dict[_IclKey, asyncio.Task] = {}
+
+
+def normalize_query(query: str) -> str:
+    """全角/半角、大小写、空白和结尾标点不同的查询视为同一个"""
+    query = unicodedata.normalize('NFKC', query or '').lower()
+    query = re.sub(r'\s+', ' ', query).strip()
+    return query.rstrip('。.!！?？~ ')
+
+
+def _cached(key: _IclKey):
+    entry = _cache.get(key)
+    if entry is None or entry[1] <= time.monotonic():
+        return None
+    _cache.move_to_end(key)
+    return entry[0]
+
+
+def _store(key: _IclKey, task: asyncio.Task) -> None:
+    _inflight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    _cache[key] = (task.result(), time.monotonic() + ICL_CACHE_TTL)
+    _cache.move_to_end(key)
+    while len(_cache) > ICL_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+async def _fetch(endpoint: str, query, session_id, current_env) -> list:
+    payload = await request_json(
+        'POST',
+        f"http://{ICL_SERVICE_URL}/api/v1/icl/{endpoint}",
+        policy=ICL_POLICY,
+        json={'query': query, 'session_id': session_id, 'current_env': current_env},
+    )
+    return payload['data']
+
+
+async def _local_select(endpoint: str, query) -> list:
+    retriever = await asyncio.to_thread(get_local_retriever)
+    if endpoint == 'select-update-examples':
+        examples = retriever.select_update_examples(query)
+    else:
+        examples = retriever.select_examples(query)
+    return examples or FALLBACK_EXAMPLES
+
+
+async def _select(endpoint: str, query, session_id, current_env, logger) -> list:
+    if ICL_BACKEND == 'local':
+        return await _local_select(endpoint, query)
+
+    key = (endpoint, current_env, normalize_query(query))
+    if (examples := _cached(key)) is not None:
+        logger.info(f"{endpoint} cache hit")
+        return examples
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch(endpoint, query, session_id, current_env))
+        task.add_done_callback(lambda t: _store(key, t))
+        _inflight[key] = task
 
-def select_examples(query, session_id, current_env, logger):
-    try:
-        return requests.post(
-            url=f"http://{ICL_SERVICE_URL}/api/v1/icl/select-examples",
-            json={'query': query, 'session_id': session_id, 'current_env': current_env},
-            timeout=10,
-        ).json()['data']
-    except Exception as e:
-        logger.info(f"select_examples fallback due to error: {e}")
-        return [
-            {
-                'input': '请为我构建一个铁的 bcc 结构',
-                'update_input': '请构建铁的体心立方（bcc）晶体结构，空间群为Im-3m，晶格常数为2.87Å',
-                'toolchain': ['build_bulk_structure_by_template', 'optimize_structure'],
-                'scene_tags': ['structure_generate', 'optimize_structure'],
-            }
-        ]
-
-
-def select_update_examples(query, session_id, current_env, logger):
     try:
-        return requests.post(
-            url=f"http://{ICL_SERVICE_URL}/api/v1/icl/select-update-examples",
-            json={'query': query, 'session_id': session_id, 'current_env': current_env},
-            timeout=10,
-        ).json()['data']
+        return await asyncio.wait_for(asyncio.shield(task), ICL_LATENCY_BUDGET)
+    except asyncio.TimeoutError:
+        logger.info(
+            f"{endpoint} fallback: exceeded {ICL_LATENCY_BUDGET}s budget, "
+            f"result will be cached when it arrives"
+        )
     except Exception as e:
-        logger.info(f"select_update_examples fallback due to error: {e}")
-        return [
-            {
-                'input': '请为我构建一个铁的 bcc 结构',
-                'update_input': '请构建铁的体心立方（bcc）晶体结构，空间群为Im-3m，晶格常数为2.87Å',
-                'toolchain': ['build_bulk_structure_by_template', 'optimize_structure'],
-                'scene_tags': ['structure_generate', 'optimize_structure'],
-            }
-        ]
+        logger.info(f"{endpoint} fallback due to error: {e}")
+    return await _local_select(endpoint, query)
+
+
+async def select_examples(query, session_id, current_env, logger):
+    return await _select('select-examples', query, session_id, current_env, logger)
+
+
+async def select_update_examples(query, session_id, current_env, logger):
+    return await _select(
+        'select-update-examples', query, session_id, current_env, logger
+    )
 
 
 def scene_tags_from_examples(examples):
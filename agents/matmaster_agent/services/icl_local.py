@@ -0,0 +1,213 @@
+"""
+In-process ICL example retriever, an offline alternative to the ICL service.
+
+Examples ({input, update_input, toolchain, scene_tags}) are indexed with BM25
+over Han unigrams/bigrams and Latin words, one index for ``input``
+(select_examples) and one for ``update_input`` (select_update_examples), so the
+results plug into scene_tags_from_examples / toolchain_from_examples /
+expand_input_examples unchanged.
+
+The index is persisted to ICL_LOCAL_INDEX_FILE and seeded from
+icl_examples.json on first use; add_examples() extends it incrementally. The
+index records the digest of the seed file it was seeded from, so edits to
+icl_examples.json are added to an existing index on the next load.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from agents.matmaster_agent.config import ICL_LOCAL_INDEX_FILE, ICL_LOCAL_TOP_K
+from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
+from agents.matmaster_agent.logger import PrefixFilter
+
+logger = logging.getLogger(__name__)
+logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
+logger.setLevel(logging.INFO)
+
+SEED_EXAMPLES_FILE = Path(__file__).resolve().parent.parent / 'icl_examples.json'
+INDEX_VERSION = 1
+FIELDS = ('input', 'update_input')
+
+_TOKEN_RE = re.compile(r'[\u4e00-\u9fff]+|[a-z0-9]+(?:[._-][a-z0-9]+)*')
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    for run in _TOKEN_RE.findall(text):
+        if '\u4e00' <= run[0] <= '\u9fff':
+            tokens.extend(run)
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def _dedup_key(example: dict) -> str:
+    return ' '.join(tokenize(example.get('input', '')))
+
+
+class _Bm25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> [[doc, tf], ...]
+        self.postings: dict[str, list[list[int]]] = {}
+        self.lengths: list[int] = []
+
+    def add(self, text: str) -> None:
+        doc = len(self.lengths)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings.setdefault(term, []).append([doc, tf])
+        self.lengths.append(sum(counts.values()))
+
+    def scores(self, query: str) -> np.ndarray:
+        n_docs = len(self.lengths)
+        scores = np.zeros(n_docs)
+        if not n_docs:
+            return scores
+        lengths = np.asarray(self.lengths, dtype=float)
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1.0))
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            docs, tfs = np.asarray(posting).T
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+        return scores
+
+    def to_json(self) -> dict:
+        return {'postings': self.postings, 'lengths': self.lengths}
+
+    @classmethod
+    def from_json(cls, data: dict) -> '_Bm25Index':
+        index = cls()
+        index.postings = data['postings']
+        index.lengths = data['lengths']
+        return index
+
+
+class LocalIclRetriever:
+    def __init__(self, examples: Iterable[dict] = ()):
+        self.examples: list[dict] = []
+        # 建立索引时 icl_examples.json 的摘要
+        self.seed_digest: Optional[str] = None
+        self._keys: set[str] = set()
+        self._indexes = {field: _Bm25Index() for field in FIELDS}
+        self._lock = threading.Lock()
+        self.add_examples(examples)
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def add_examples(self, examples: Iterable[dict]) -> int:
+        """Index new examples (same ``input`` is kept once); returns how many were added."""
+        added = 0
+        with self._lock:
+            for example in examples:
+                key = _dedup_key(example)
+                if not key or key in self._keys or 'update_input' not in example:
+                    continue
+                self._keys.add(key)
+                self.examples.append(dict(example))
+                for field, index in self._indexes.items():
+                    index.add(example.get(field, ''))
+                added += 1
+        return added
+
+    def _top(self, field: str, query: str, k: int) -> list[dict]:
+        with self._lock:
+            scores = self._indexes[field].scores(query)
+            order = np.argsort(-scores, kind='stable')[:k]
+            return [dict(self.examples[i]) for i in order if scores[i] > 0]
+
+    def select_examples(self, query: str, k: int = ICL_LOCAL_TOP_K) -> list[dict]:
+        return self._top('input', query, k)
+
+    def select_update_examples(
+        self, query: str, k: int = ICL_LOCAL_TOP_K
+    ) -> list[dict]:
+        return self._top('update_input', query, k)
+
+    def save(self, path: str = ICL_LOCAL_INDEX_FILE) -> None:
+        with self._lock:
+            data = {
+                'version': INDEX_VERSION,
+                'seed_digest': self.seed_digest,
+                'examples': self.examples,
+                'indexes': {f: i.to_json() for f, i in self._indexes.items()},
+            }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: str = ICL_LOCAL_INDEX_FILE) -> 'LocalIclRetriever':
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+        if data.get('version') != INDEX_VERSION:
+            # 索引格式变化时从样例重建
+            retriever = cls(data.get('examples', []))
+        else:
+            retriever = cls()
+            retriever.examples = data['examples']
+            retriever._keys = {_dedup_key(example) for example in retriever.examples}
+            retriever._indexes = {
+                field: _Bm25Index.from_json(data['indexes'][field]) for field in FIELDS
+            }
+        retriever.seed_digest = data.get('seed_digest')
+        return retriever
+
+
+_retriever: Optional[LocalIclRetriever] = None
+_retriever_lock = threading.Lock()
+
+
+def load_seed_examples() -> list[dict]:
+    return json.loads(SEED_EXAMPLES_FILE.read_text(encoding='utf-8'))['examples']
+
+
+def seed_digest() -> str:
+    return hashlib.sha256(SEED_EXAMPLES_FILE.read_bytes()).hexdigest()
+
+
+def get_local_retriever() -> LocalIclRetriever:
+    """
+    Process-wide retriever: loads ICL_LOCAL_INDEX_FILE, or builds it from the
+    seed examples. When icl_examples.json changed since the index was seeded,
+    its new examples are added to the index (and the index saved).
+    """
+    global _retriever
+    with _retriever_lock:
+        if _retriever is None:
+            digest = seed_digest()
+            try:
+                retriever = LocalIclRetriever.load()
+            except (FileNotFoundError, json.JSONDecodeError, KeyError):
+                retriever = LocalIclRetriever(load_seed_examples())
+                retriever.seed_digest = digest
+                retriever.save()
+                logger.info(f'built local ICL index, examples = {len(retriever)}')
+            else:
+                if retriever.seed_digest != digest:
+                    added = retriever.add_examples(load_seed_examples())
+                    retriever.seed_digest = digest
+                    retriever.save()
+                    logger.info(
+                        f'icl_examples.json changed, {added} new example(s) indexed'
+                    )
+            _retriever = retriever
+        return _retriever
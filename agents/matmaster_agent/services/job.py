@@ -2,11 +2,14 @@ import asyncio
 import json
 import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator, Optional
 
 import aiohttp
 import jsonpickle
 
+from agents.matmaster_agent.config import RESULT_FILE_CONCURRENCY
 from agents.matmaster_agent.constant import (
     MATMASTER_AGENT_NAME,
     OPENAPI_FILE_TOKEN_API,
@@ -15,12 +18,22 @@ from agents.matmaster_agent.constant import (
     OpenAPIJobAPI,
 )
 from agents.matmaster_agent.logger import PrefixFilter
-from agents.matmaster_agent.utils.io_oss import file_to_base64, upload_to_oss_wrapper
+from agents.matmaster_agent.services.http_client import (
+    DOWNLOAD_POLICY,
+    OPENAPI_POLICY,
+    WRITE_POLICY,
+    request,
+    request_json,
+    request_text,
+)
+from agents.matmaster_agent.utils.io_oss import upload_to_oss
 
 logger = logging.getLogger(__name__)
 logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
 logger.setLevel(logging.INFO)
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+
 
 async def check_job_create_service(access_key, project_id):
     job_create_url = f"{OPENAPI_HOST}/openapi/v1/sandbox/job/create"
@@ -31,32 +44,37 @@ async def check_job_create_service(access_key, project_id):
     params = {'accessKey': access_key}
     logger.info(f"project_id = {project_id}, ak = {access_key}")
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            job_create_url, json=payload, params=params
-        ) as response:
-            res = json.loads(await response.text())
-            if res['code'] != 0:
-                if res['code'] == 140202:
-                    res['error'][
-                        'msg'
-                    ] = '钱包余额不足，请在[此页面](https://www.bohrium.com/consume?menu=cash)充值后重试。'
+    res = json.loads(
+        await request_text(
+            'POST',
+            job_create_url,
+            policy=WRITE_POLICY,
+            raise_for_status=False,
+            json=payload,
+            params=params,
+        )
+    )
+    if res['code'] != 0:
+        if res['code'] == 140202:
+            res['error'][
+                'msg'
+            ] = '钱包余额不足，请在[此页面](https://www.bohrium.com/consume?menu=cash)充值后重试。'
 
-                return res
+        return res
 
 
 async def get_job_detail(job_id, access_key):
-    async with aiohttp.ClientSession() as session:
-        async with session.get(
-            f'{OpenAPIJobAPI}/{job_id}', headers={'accessKey': access_key}
-        ) as response:
-            res_text = await response.text()
-            logger.info(
-                f'job_id = {job_id}, access_key = {access_key}, response = {res_text}'
-            )
-            res = json.loads(res_text)
+    res_text = await request_text(
+        'GET',
+        f'{OpenAPIJobAPI}/{job_id}',
+        policy=OPENAPI_POLICY,
+        raise_for_status=False,
+        headers={'accessKey': access_key},
+    )
+    logger.info(f'job_id = {job_id}, access_key = {access_key}, response = {res_text}')
+    res = json.loads(res_text)
 
-            return res
+    return res
 
 
 async def check_status_and_download_file(
@@ -110,18 +128,17 @@ async def check_status_and_download_file(
 
 async def get_token(file_path, job_id, access_key):
     request_body = {'filePath': file_path, 'jobId': job_id}
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            f"{OPENAPI_FILE_TOKEN_API}?accessKey={access_key}",
-            json=request_body,
-        ) as response:
-            response.raise_for_status()
-            payload = await response.json()
-
-            response_data_json = payload.get('data', {})
-            response_file_token = response_data_json.get('token', '')
-            response_file_path = response_data_json.get('path', '')
-            response_file_host = response_data_json.get('host', '')
+    payload = await request_json(
+        'POST',
+        f"{OPENAPI_FILE_TOKEN_API}?accessKey={access_key}",
+        policy=OPENAPI_POLICY,
+        json=request_body,
+    )
+
+    response_data_json = payload.get('data', {})
+    response_file_token = response_data_json.get('token', '')
+    response_file_path = response_data_json.get('path', '')
+    response_file_host = response_data_json.get('host', '')
 
     return response_file_host, response_file_path, response_file_token
 
@@ -134,17 +151,43 @@ async def get_token_and_download_file(file_path, job_id, access_key):
     # 构建log文件URL并检查状态
     if response_file_host and response_file_path and response_file_token:
         file_url = f"{response_file_host}/api/download/{response_file_path}?token={response_file_token}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(file_url) as file_response:
-                file_response.raise_for_status()
-                await check_status_and_download_file(
-                    file_response, file_path
-                )  # 需要你把该函数签名改一下
+        async with request('GET', file_url, policy=DOWNLOAD_POLICY) as file_response:
+            file_response.raise_for_status()
+            await check_status_and_download_file(file_response, file_path)
     else:
         logger.error(f"Incomplete {file_path} information - cannot construct file URL")
 
 
-async def get_token_and_download_dir(dir_path, job_id, access_key):
+@asynccontextmanager
+async def open_job_file(
+    file_path, job_id, access_key
+) -> AsyncIterator[Optional[aiohttp.StreamReader]]:
+    """打开远端任务文件的下载流，文件不可用时 yield None"""
+    response_file_host, response_file_path, response_file_token = await get_token(
+        file_path, job_id, access_key
+    )
+    if not (response_file_host and response_file_path and response_file_token):
+        logger.error(f"Incomplete {file_path} information - cannot construct file URL")
+        yield None
+        return
+
+    file_url = f"{response_file_host}/api/download/{response_file_path}?token={response_file_token}"
+    async with request('GET', file_url, policy=DOWNLOAD_POLICY) as file_response:
+        file_response.raise_for_status()
+        if file_response.status != 200:
+            logger.error(
+                f'`{file_path}` url returned status code: {file_response.status}'
+            )
+            yield None
+            return
+        yield file_response.content
+
+
+@asynccontextmanager
+async def open_job_dir_archive(
+    dir_path, job_id, access_key
+) -> AsyncIterator[aiohttp.StreamReader]:
+    """打开远端目录打包（zip）的下载流"""
     host, path, token = await get_token('', job_id, access_key)
     prefix = path.replace('results.txt', '')
     request_body = {
@@ -152,18 +195,23 @@ async def get_token_and_download_dir(dir_path, job_id, access_key):
         'tempDir': prefix,
         'maxCompressSize': 1073741824,
     }
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            f'{TIEFBLUE_NAS_HOST}/api/downloadr',
-            json=request_body,
-            headers={
-                'Authorization': f"Bearer {token}",
-                'Content-Type': 'application/json',
-            },
-        ) as response:
-            blob = await response.read()
-            with open(f"{dir_path.split("/")[-2]}.zip", 'wb') as f:
-                f.write(blob)
+    async with request(
+        'POST',
+        f'{TIEFBLUE_NAS_HOST}/api/downloadr',
+        policy=DOWNLOAD_POLICY,
+        json=request_body,
+        headers={
+            'Authorization': f"Bearer {token}",
+            'Content-Type': 'application/json',
+        },
+    ) as response:
+        yield response.content
+
+
+async def get_token_and_read_file(file_path, job_id, access_key) -> Optional[bytes]:
+    """与 get_token_and_download_file 相同，但直接返回文件内容，不落盘"""
+    async with open_job_file(file_path, job_id, access_key) as content:
+        return None if content is None else await content.read()
 
 
 async def get_iterate_files(
@@ -184,16 +232,17 @@ async def get_iterate_files(
         prefix += '/'
 
     request_body = {'prefix': prefix}
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            f"{host}/api/iterate",
-            json=request_body,
-            headers={
-                'Authorization': f"Bearer {token}",
-                'Content-Type': 'application/json',
-            },
-        ) as response:
-            iterate_json = await response.json()
+    iterate_json = await request_json(
+        'POST',
+        f"{host}/api/iterate",
+        policy=OPENAPI_POLICY,
+        raise_for_status=False,
+        json=request_body,
+        headers={
+            'Authorization': f"Bearer {token}",
+            'Content-Type': 'application/json',
+        },
+    )
 
     return prefix, iterate_json
 
@@ -207,26 +256,29 @@ async def parse_and_prepare_results(
             p = p[:-1]
         return p
 
+    def build_listing(_prefix: str, iterate_json: dict) -> dict:
+        objects = iterate_json.get('data', {}).get('objects', [])
+        idx = {norm(o['path']): o for o in objects}
+        return {'prefix': _prefix, 'objects': objects, 'idx': idx}
+
+    async def fetch_listing(dp: str) -> dict:
+        _prefix, iterate_json = await get_iterate_files(
+            job_id, prefix=dp, access_key=access_key
+        )
+        return build_listing(_prefix, iterate_json)
+
     async def list_dir(dir_prefix: str):
         """
         dir_prefix: jobs/xxx/xxx/ 或 jobs/xxx/xxx/trajs_files/
+        并发的文件共享同一个 listing 请求
         """
         dp = dir_prefix.replace('\\', '/')
         if not dp.endswith('/'):
             dp += '/'
 
-        if dp in listing_cache:
-            return listing_cache[dp]
-
-        _prefix, iterate_json = await get_iterate_files(
-            job_id, prefix=dp, access_key=access_key
-        )
-        objects = iterate_json.get('data', {}).get('objects', [])
-        idx = {norm(o['path']): o for o in objects}
-
-        listing_cache[dp] = {'prefix': _prefix, 'objects': objects, 'idx': idx}
-
-        return listing_cache[dp]
+        if dp not in listing_cache:
+            listing_cache[dp] = asyncio.ensure_future(fetch_listing(dp))
+        return await listing_cache[dp]
 
     def remote_candidates(rel: str):
         rel = norm(rel)
@@ -256,90 +308,85 @@ async def parse_and_prepare_results(
         obj = parent_listing['idx'].get(rf) or parent_listing['idx'].get(rd)
         return obj
 
-    async def safe_cleanup_file(file_download_path: Path):
-        """
-        删除文件，并由内向外清理空的父目录，直到当前工作目录为止。
-        """
-        file_path = file_download_path.resolve()
-        root_dir = Path.cwd().resolve()  # 获取当前工作目录的绝对路径
-
-        # 1. 删除文件本身
-        try:
-            if file_path.exists():
-                file_path.unlink()
-                logger.info(f"已删除文件: {file_path}")
-        except Exception as e:
-            logger.error(f"无法删除文件 {file_path}: {e}")
-            return
-
-        # 2. 逐级向上清理空目录
-        # target_dir 从文件所在的直接父目录开始
-        target_dir = file_path.parent
-
-        # 循环条件：目标目录属于当前目录的子目录，且不是当前目录本身
-        while target_dir.is_relative_to(root_dir) and target_dir != root_dir:
-            try:
-                # rmdir 仅在目录为空时才会成功
-                target_dir.rmdir()
-                logger.info(f"清理空目录: {target_dir}")
-                # 移动到上一层
-                target_dir = target_dir.parent
-            except OSError:
-                # 如果目录非空（比如里面还有其他 band.png）或权限不足，停止向上清理
-                logger.info(f"停止清理：目录 {target_dir} 非空或无权限")
-                break
+    async def transfer(rel: str) -> Optional[str]:
+        """远端文件/目录边下载边上传 OSS，不经过本地临时文件"""
+        nonlocal finished
+        async with semaphore:
+            obj = await find_obj(rel)
+            if obj is None:
+                logger.warning(f"{session_id} `{rel}` is not exist")
+                return None
+
+            if not obj.get('isDir'):
+                stream = open_job_file(rel, job_id, access_key)
+                filename = Path(rel).name
+            else:
+                stream = open_job_dir_archive(obj['path'], job_id, access_key)
+                filename = f"{obj['path'].split("/")[-2]}.zip"
+
+            oss_path = f"agent/{job_root_prefix}{filename}"
+            async with stream as content:
+                if content is None:
+                    raise FileNotFoundError(f'Download `{rel}` failed')
+                oss_url = await upload_to_oss(
+                    content.iter_chunked(STREAM_CHUNK_SIZE), oss_path, filename
+                )
+
+        finished += 1
+        logger.info(
+            f"{session_id} [{finished}/{len(file_keys)}] `{rel}` uploaded to {oss_path}"
+        )
+        return list(oss_url.values())[0]
 
     # Download results.txt & Prepare Parse
     RESULTS_TXT = 'results.txt'
-    await get_token_and_download_file(RESULTS_TXT, job_id, access_key)
-
-    with open(RESULTS_TXT) as f:
-        results_txt_parsed = jsonpickle.loads(
-            f.read().replace('pathlib._local.PosixPath', 'pathlib.PosixPath')
-        )
-        logger.info(f"{session_id} results_txt_parsed = {results_txt_parsed}")
-    os.remove(RESULTS_TXT)
+    results_txt = await get_token_and_read_file(RESULTS_TXT, job_id, access_key)
+    if results_txt is None:
+        raise FileNotFoundError(f'Download `{RESULTS_TXT}` failed')
 
-    final_results = {}
+    results_txt_parsed = jsonpickle.loads(
+        results_txt.decode().replace('pathlib._local.PosixPath', 'pathlib.PosixPath')
+    )
+    logger.info(f"{session_id} results_txt_parsed = {results_txt_parsed}")
 
-    # 缓存：dir_prefix -> {"idx":..., "objects":...}
-    listing_cache: dict[str, dict] = {}
+    # 缓存：dir_prefix -> Future[{"idx":..., "objects":...}]
+    listing_cache: dict[str, asyncio.Future] = {}
 
-    # 先拿 job 根 prefix（jobs/xxx/xxx/）
-    job_root_prefix, _ = await get_iterate_files(job_id, access_key=access_key)
+    # 先拿 job 根 prefix（jobs/xxx/xxx/），顺便作为根目录 listing 缓存
+    job_root_prefix, root_iterate_json = await get_iterate_files(
+        job_id, access_key=access_key
+    )
     job_root_prefix = job_root_prefix.replace('\\', '/')
     if not job_root_prefix.endswith('/'):
         job_root_prefix += '/'
+    root_listing = asyncio.get_running_loop().create_future()
+    root_listing.set_result(build_listing(job_root_prefix, root_iterate_json))
+    listing_cache[job_root_prefix] = root_listing
+
+    # 文件型结果并发处理（下载 -> 上传），最终按 results.txt 的顺序组装
+    file_keys = [k for k, v in results_txt_parsed.items() if isinstance(v, Path)]
+    semaphore = asyncio.Semaphore(RESULT_FILE_CONCURRENCY)
+    finished = 0
+    transfers = [
+        asyncio.create_task(transfer(str(results_txt_parsed[k]).replace('\\', '/')))
+        for k in file_keys
+    ]
+    try:
+        uploaded = await asyncio.gather(*transfers)
+    except BaseException:
+        # 一个文件失败时取消其余传输并等待其结束（分片上传随之 abort），不留孤儿上传
+        for task in transfers:
+            task.cancel()
+        await asyncio.gather(*transfers, return_exceptions=True)
+        raise
+    oss_urls = dict(zip(file_keys, uploaded))
 
+    final_results = {}
     for k, v in results_txt_parsed.items():
-        # 非文件型
         if not isinstance(v, Path):
             final_results[k] = v
-            continue
-
-        rel = str(v).replace('\\', '/')
-        obj = await find_obj(rel)
-
-        if obj is None:
-            logger.warning(f"{session_id} `{rel}` is not exist")
-            continue
-
-        is_dir = bool(obj.get('isDir'))
-        if not is_dir:
-            await get_token_and_download_file(rel, job_id, access_key)
-            filename = Path(rel)
-        else:
-            await get_token_and_download_dir(obj['path'], job_id, access_key)
-            filename = Path(f"{obj['path'].split("/")[-2]}.zip")
-
-        # 上传文件到 OSS
-        file_path, b64_data = await file_to_base64(filename)
-        oss_path = f"agent/{job_root_prefix}{file_path.name}"
-        oss_url = await upload_to_oss_wrapper(b64_data, oss_path, file_path.name)
-        final_results[k] = list(oss_url.values())[0]
-
-        # 删除文件
-        await safe_cleanup_file(filename)
+        elif oss_urls[k] is not None:
+            final_results[k] = oss_urls[k]
 
     return final_results
 
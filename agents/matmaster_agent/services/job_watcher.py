@@ -0,0 +1,244 @@
+"""
+Background watcher for submitted Bohrium jobs.
+
+Sessions register their jobs with watch(); one asyncio task per event loop
+polls them. Each job has its own interval: it starts at
+JOB_WATCH_MIN_INTERVAL, is multiplied by JOB_WATCH_BACKOFF (up to
+JOB_WATCH_MAX_INTERVAL) while the status stays the same and is reset whenever
+it changes. Jobs that fall due together are checked in one tick, at most
+JOB_WATCH_CONCURRENCY at a time — the OpenAPI job detail endpoint takes one
+id per call, and the list endpoint needs a user ticket rather than an
+access key.
+
+Status changes are published as JobEvent to the queues returned by
+subscribe(session_id) of every session owning the job; a failed status
+request is published as a JobEvent carrying ``error``. Terminal events are
+also kept per session until drain(session_id) takes them: the flow agent
+drains them at the start of each turn and records the final status in
+``long_running_jobs`` and the plan. Terminal states are cached (LRU,
+JOB_WATCH_CACHE_SIZE), so terminal_status() answers without a request and a
+late watch() is notified immediately.
+
+Call close_job_watcher() on shutdown to stop the polling task.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from agents.matmaster_agent.config import (
+    JOB_WATCH_BACKOFF,
+    JOB_WATCH_CACHE_SIZE,
+    JOB_WATCH_CONCURRENCY,
+    JOB_WATCH_MAX_INTERVAL,
+    JOB_WATCH_MIN_INTERVAL,
+)
+from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
+from agents.matmaster_agent.logger import PrefixFilter
+from agents.matmaster_agent.services.job import get_job_detail
+from agents.matmaster_agent.utils.job_utils import mapping_status
+
+logger = logging.getLogger(__name__)
+logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
+logger.setLevel(logging.INFO)
+
+TERMINAL_STATUSES = frozenset({'Finished', 'Failed', 'Deleted', 'Stopped'})
+
+StatusFetcher = Callable[[str, str], Awaitable[str]]
+
+
+@dataclass(frozen=True, slots=True)
+class JobEvent:
+    session_id: str
+    origin_job_id: str
+    job_id: str
+    status: Optional[str]
+    # 查询失败时的错误信息，status 为上一次已知状态
+    error: Optional[str] = None
+
+    @property
+    def terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+
+@dataclass(slots=True)
+class _WatchedJob:
+    job_id: str
+    access_key: str
+    next_poll_at: float
+    interval: float
+    # session_id -> origin_job_id
+    owners: dict[str, str] = field(default_factory=dict)
+    status: Optional[str] = None
+
+
+async def fetch_job_status(job_id: str, access_key: str) -> str:
+    res = await get_job_detail(job_id=job_id, access_key=access_key)
+    if res.get('code') != 0:
+        raise RuntimeError(f'job {job_id} detail failed: {res}')
+    return mapping_status(res['data'].get('status', -999))
+
+
+class JobWatcher:
+    def __init__(
+        self,
+        fetch_status: StatusFetcher = fetch_job_status,
+        *,
+        min_interval: float = JOB_WATCH_MIN_INTERVAL,
+        max_interval: float = JOB_WATCH_MAX_INTERVAL,
+        backoff: float = JOB_WATCH_BACKOFF,
+        concurrency: int = JOB_WATCH_CONCURRENCY,
+        cache_size: int = JOB_WATCH_CACHE_SIZE,
+    ):
+        self.fetch_status = fetch_status
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.concurrency = concurrency
+        self.cache_size = cache_size
+
+        self._jobs: dict[str, _WatchedJob] = {}
+        self._terminal: OrderedDict[str, str] = OrderedDict()
+        self._subscribers: defaultdict[str, set[asyncio.Queue]] = defaultdict(set)
+        # session_id -> origin_job_id -> 尚未被会话取走的终态事件
+        self._inbox: OrderedDict[str, dict[str, JobEvent]] = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def watch(
+        self, job_id: str, access_key: str, session_id: str, origin_job_id: str
+    ) -> None:
+        """Track ``job_id`` on behalf of ``session_id``; must run inside the loop."""
+        if status := self.terminal_status(job_id):
+            self._publish(job_id, {session_id: origin_job_id}, status)
+            return
+
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = self._jobs[job_id] = _WatchedJob(
+                job_id,
+                access_key,
+                next_poll_at=time.monotonic() + self.min_interval,
+                interval=self.min_interval,
+            )
+        job.owners[session_id] = origin_job_id
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(), name='job-watcher'
+            )
+        self._wakeup.set()
+
+    def terminal_status(self, job_id: str) -> Optional[str]:
+        status = self._terminal.get(job_id)
+        if status is not None:
+            self._terminal.move_to_end(job_id)
+        return status
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        """Queue receiving every JobEvent of ``session_id`` from now on."""
+        queue: asyncio.Queue[JobEvent] = asyncio.Queue()
+        self._subscribers[session_id].add(queue)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(session_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[session_id]
+
+    def drain(self, session_id: str) -> list[JobEvent]:
+        """Take the terminal JobEvents of ``session_id`` not drained yet."""
+        return list(self._inbox.pop(session_id, {}).values())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _publish(
+        self,
+        job_id: str,
+        owners: dict[str, str],
+        status: Optional[str],
+        error: Optional[str] = None,
+    ) -> None:
+        for session_id, origin_job_id in owners.items():
+            event = JobEvent(session_id, origin_job_id, job_id, status, error)
+            for queue in self._subscribers.get(session_id, ()):
+                queue.put_nowait(event)
+            if event.terminal:
+                self._inbox.setdefault(session_id, {})[origin_job_id] = event
+                self._inbox.move_to_end(session_id)
+                if len(self._inbox) > self.cache_size:
+                    self._inbox.popitem(last=False)
+
+    async def _run(self) -> None:
+        while self._jobs:
+            now = time.monotonic()
+            next_poll_at = min(job.next_poll_at for job in self._jobs.values())
+            if next_poll_at > now:
+                # 新任务注册时提前唤醒，重新计算下一次轮询时间
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), next_poll_at - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = [job for job in self._jobs.values() if job.next_poll_at <= now]
+            semaphore = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(self._check(job, semaphore) for job in due))
+
+    async def _check(self, job: _WatchedJob, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                status = await self.fetch_status(job.job_id, job.access_key)
+            except Exception as e:
+                logger.exception(f'job_id = {job.job_id} status check failed')
+                self._publish(job.job_id, job.owners, job.status, error=str(e))
+                status = job.status
+
+        if status == job.status:
+            job.interval = min(job.interval * self.backoff, self.max_interval)
+        else:
+            logger.info(f'job_id = {job.job_id} status {job.status} -> {status}')
+            job.status = status
+            job.interval = self.min_interval
+            self._publish(job.job_id, job.owners, status)
+        job.next_poll_at = time.monotonic() + job.interval
+
+        if status in TERMINAL_STATUSES:
+            self._jobs.pop(job.job_id, None)
+            self._terminal[job.job_id] = status
+            if len(self._terminal) > self.cache_size:
+                self._terminal.popitem(last=False)
+
+
+# event loop -> JobWatcher（asyncio 对象不能跨 loop 复用）
+_watchers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_job_watcher() -> JobWatcher:
+    """Return the JobWatcher bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    watcher = _watchers.get(loop)
+    if watcher is None:
+        watcher = _watchers[loop] = JobWatcher()
+    return watcher
+
+
+async def close_job_watcher() -> None:
+    """Stop the JobWatcher of the running event loop, if any."""
+    watcher = _watchers.pop(asyncio.get_running_loop(), None)
+    if watcher is not None:
+        await watcher.close()
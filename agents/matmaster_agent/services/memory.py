@@ -1,24 +1,96 @@
 """
 HTTP client for the remote MatMaster memory service (FastAPI).
 
-Provides: memory_write, memory_retrieve, memory_list, format_short_term_memory (all async).
+Provides: memory_write, memory_write_batch, memory_retrieve, memory_list,
+format_short_term_memory (all async). Non-blocking writes go through
+services/memory_queue.py.
 Base URL is from constant (101.126.90.82:8002); scripts can override via base_url.
-Timeouts: connect 3s, read 10s.
+Timeouts: connect 3s, read 10s (MEMORY_POLICY of the shared http_client pool;
+retrieval uses MEMORY_RETRIEVE_POLICY, which does not retry).
+
+memory_retrieve results are cached per (session, query, limit) for
+MEMORY_RETRIEVE_CACHE_TTL seconds; concurrent identical retrievals share one
+request, and a successful memory_write drops the session's entries.
+memory_cache_stats() reports hits / misses.
 """
 
+import asyncio
 import logging
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
 from typing import Any, Optional
 
 import aiohttp
 
+from agents.matmaster_agent.config import (
+    MEMORY_RETRIEVE_CACHE_SIZE,
+    MEMORY_RETRIEVE_CACHE_TTL,
+    MEMORY_WRITE_CONCURRENCY,
+)
 from agents.matmaster_agent.constant import MEMORY_SERVICE_URL
+from agents.matmaster_agent.services.http_client import (
+    MEMORY_POLICY,
+    MEMORY_RETRIEVE_POLICY,
+    request,
+)
 
 logger = logging.getLogger(__name__)
 
-_CONNECT_TIMEOUT = 3
-_READ_TIMEOUT = 10
 _MEMORY_PATH = '/api/v1/memory'
 
+# (base_url, session_id, query, limit)
+_RetrieveKey = tuple[str, str, str, int]
+
+
+@dataclass(frozen=True, slots=True)
+class _CachedRetrieval:
+    texts: list[str]
+    expires_at: float
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryCacheStats:
+    hits: int
+    misses: int
+    # 命中进行中的相同请求，未再发起请求
+    coalesced: int
+    invalidations: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+
+_retrieve_cache: OrderedDict[_RetrieveKey, _CachedRetrieval] = OrderedDict()
+_retrieve_inflight: dict[tuple[_RetrieveKey, int], asyncio.Future] = {}
+# session_id -> 进行中的检索数
+_inflight_sessions: Counter[str] = Counter()
+# session_id -> 检索进行期间的写入次数，写入前发起的检索结果不缓存、不被复用；
+# 只记录有进行中检索的会话，该会话的检索全部结束后删除
+_session_versions: dict[str, int] = {}
+_stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidations': 0}
+
+
+def memory_cache_stats() -> MemoryCacheStats:
+    return MemoryCacheStats(**_stats)
+
+
+def invalidate_memory_cache(session_id: Optional[str] = None) -> None:
+    """Drop cached retrievals of ``session_id``, or of every session."""
+    _stats['invalidations'] += 1
+    if session_id is None:
+        for sid in _inflight_sessions:
+            _session_versions[sid] = _session_versions.get(sid, 0) + 1
+        _retrieve_cache.clear()
+        return
+
+    if session_id in _inflight_sessions:
+        _session_versions[session_id] = _session_versions.get(session_id, 0) + 1
+    for key in [key for key in _retrieve_cache if key[1] == session_id]:
+        del _retrieve_cache[key]
+
 
 def _base(base_url: Optional[str] = None) -> str:
     url = (base_url or MEMORY_SERVICE_URL).strip()
@@ -27,6 +99,28 @@ def _base(base_url: Optional[str] = None) -> str:
     return url.rstrip('/')
 
 
+@dataclass(frozen=True, slots=True)
+class MemoryRecord:
+    session_id: str
+    text: str
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+async def _post_memory(record: MemoryRecord, base_url: str) -> None:
+    payload = {
+        'session_id': record.session_id,
+        'text': record.text,
+        'metadata': record.metadata,
+    }
+    async with request(
+        'POST',
+        f'{base_url}{_MEMORY_PATH}/write',
+        policy=MEMORY_POLICY,
+        json=payload,
+    ) as r:
+        r.raise_for_status()
+
+
 async def memory_write(
     session_id: str,
     text: str,
@@ -34,24 +128,77 @@ async def memory_write(
     base_url: Optional[str] = None,
 ) -> None:
     """Write one insight to the memory service for the given session."""
-    payload = {
-        'session_id': session_id,
-        'text': text,
-        'metadata': metadata or {},
-    }
     try:
-        timeout = aiohttp.ClientTimeout(
-            connect=_CONNECT_TIMEOUT,
-            total=_CONNECT_TIMEOUT + _READ_TIMEOUT,
+        await _post_memory(
+            MemoryRecord(session_id, text, metadata or {}), _base(base_url)
         )
-        async with aiohttp.ClientSession(timeout=timeout) as client:
-            async with client.post(
-                f'{_base(base_url)}{_MEMORY_PATH}/write',
-                json=payload,
-            ) as r:
-                r.raise_for_status()
     except Exception as e:
         logger.warning('memory_write failed: %s', e)
+    else:
+        invalidate_memory_cache(session_id)
+
+
+async def memory_write_batch(
+    records: list[MemoryRecord], base_url: Optional[str] = None
+) -> list[MemoryRecord]:
+    """
+    Write ``records`` with at most MEMORY_WRITE_CONCURRENCY requests in flight
+    (the service takes one insight per request). Returns the records that
+    failed and may succeed on a retry, in their original order; records the
+    service rejects (4xx other than 408 / 429) are logged and dropped.
+    """
+    semaphore = asyncio.Semaphore(MEMORY_WRITE_CONCURRENCY)
+    url = _base(base_url)
+
+    # True：已写入；False：可重试；None：被服务拒绝
+    async def write(record: MemoryRecord) -> Optional[bool]:
+        async with semaphore:
+            try:
+                await _post_memory(record, url)
+            except aiohttp.ClientResponseError as e:
+                if 400 <= e.status < 500 and e.status not in (408, 429):
+                    logger.warning(
+                        'memory_write rejected (%s), dropping record of session %s',
+                        e.status,
+                        record.session_id,
+                    )
+                    return None
+                logger.warning('memory_write failed: %s', e)
+                return False
+            except Exception as e:
+                logger.warning('memory_write failed: %s', e)
+                return False
+        return True
+
+    results = await asyncio.gather(*(write(record) for record in records))
+    for session_id in {r.session_id for r, ok in zip(records, results) if ok}:
+        invalidate_memory_cache(session_id)
+    return [record for record, ok in zip(records, results) if ok is False]
+
+
+async def _fetch_memory(
+    session_id: str, query: str, limit: int, base_url: str
+) -> list[str]:
+    payload = {
+        'session_id': session_id,
+        'query_text': query,
+        'n_results': limit,
+    }
+    async with request(
+        'POST',
+        f'{base_url}{_MEMORY_PATH}/retrieve',
+        policy=MEMORY_RETRIEVE_POLICY,
+        json=payload,
+    ) as r:
+        r.raise_for_status()
+        data = await r.json()
+    docs = data.get('data') or []
+    if not isinstance(docs, list):
+        return []
+    return [
+        ((d.get('document') or d.get('text') or '') if isinstance(d, dict) else str(d))
+        for d in docs
+    ]
 
 
 async def memory_retrieve(
@@ -61,37 +208,49 @@ async def memory_retrieve(
     base_url: Optional[str] = None,
 ) -> list[str]:
     """Retrieve relevant memory texts for the session and query. Returns list of text snippets."""
-    payload = {
-        'session_id': session_id,
-        'query_text': query,
-        'n_results': limit,
-    }
+    key = (_base(base_url), session_id, query, limit)
+    version = _session_versions.get(session_id, 0)
+
+    # 写入时会删除该会话的缓存，留在缓存中的结果都不早于最近一次写入
+    entry = _retrieve_cache.get(key)
+    if entry is not None and entry.expires_at > time.monotonic():
+        _stats['hits'] += 1
+        _retrieve_cache.move_to_end(key)
+        return list(entry.texts)
+
+    # 进行中的请求按版本区分，写入之后发起的检索不复用写入之前的请求
+    inflight_key = (key, version)
+    inflight = _retrieve_inflight.get(inflight_key)
+    if inflight is not None:
+        _stats['coalesced'] += 1
+        return list(await asyncio.shield(inflight))
+
+    _stats['misses'] += 1
+    future = asyncio.get_running_loop().create_future()
+    _retrieve_inflight[inflight_key] = future
+    _inflight_sessions[session_id] += 1
+    texts: list[str] = []
     try:
-        timeout = aiohttp.ClientTimeout(
-            connect=_CONNECT_TIMEOUT,
-            total=_CONNECT_TIMEOUT + _READ_TIMEOUT,
-        )
-        async with aiohttp.ClientSession(timeout=timeout) as client:
-            async with client.post(
-                f'{_base(base_url)}{_MEMORY_PATH}/retrieve',
-                json=payload,
-            ) as r:
-                r.raise_for_status()
-                data = await r.json()
-        docs = data.get('data') or []
-        if not isinstance(docs, list):
-            return []
-        return [
-            (
-                (d.get('document') or d.get('text') or '')
-                if isinstance(d, dict)
-                else str(d)
-            )
-            for d in docs
-        ]
+        texts = await _fetch_memory(session_id, query, limit, key[0])
     except Exception as e:
         logger.debug('memory_retrieve failed: %s', e)
-        return []
+    else:
+        if _session_versions.get(session_id, 0) == version:
+            _retrieve_cache[key] = _CachedRetrieval(
+                texts, time.monotonic() + MEMORY_RETRIEVE_CACHE_TTL
+            )
+            _retrieve_cache.move_to_end(key)
+            while len(_retrieve_cache) > MEMORY_RETRIEVE_CACHE_SIZE:
+                _retrieve_cache.popitem(last=False)
+    finally:
+        # 失败（含取消）不缓存，等待中的相同请求拿到空结果
+        del _retrieve_inflight[inflight_key]
+        _inflight_sessions[session_id] -= 1
+        if not _inflight_sessions[session_id]:
+            del _inflight_sessions[session_id]
+            _session_versions.pop(session_id, None)
+        future.set_result(texts)
+    return list(texts)
 
 
 async def memory_list(
@@ -106,17 +265,14 @@ async def memory_list(
     if limit is not None:
         payload['limit'] = limit
     try:
-        timeout = aiohttp.ClientTimeout(
-            connect=_CONNECT_TIMEOUT,
-            total=_CONNECT_TIMEOUT + _READ_TIMEOUT,
-        )
-        async with aiohttp.ClientSession(timeout=timeout) as client:
-            async with client.post(
-                f'{_base(base_url)}{_MEMORY_PATH}/list',
-                json=payload,
-            ) as r:
-                r.raise_for_status()
-                data = await r.json()
+        async with request(
+            'POST',
+            f'{_base(base_url)}{_MEMORY_PATH}/list',
+            policy=MEMORY_POLICY,
+            json=payload,
+        ) as r:
+            r.raise_for_status()
+            data = await r.json()
         raw = data.get('data')
         if not isinstance(raw, list):
             return []
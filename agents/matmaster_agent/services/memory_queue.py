@@ -0,0 +1,280 @@
+"""
+Background, batched writes to the memory service.
+
+enqueue_memory_write() returns immediately; one task per event loop collects
+records and flushes them once MEMORY_WRITE_BATCH_SIZE are pending or
+MEMORY_WRITE_FLUSH_INTERVAL seconds have passed, via memory_write_batch.
+
+Delivery is at-least-once. Each queue spools to its own file next to
+MEMORY_WRITE_SPOOL_FILE, named with the process id and a random token, so
+queues of different processes never share a file. A flush appends only the
+new records to the spool and keeps an in-memory copy of it; the file is
+removed once the service accepted everything and rewritten only when part of
+a batch went through. When a whole batch fails (service down or too slow for
+MEMORY_POLICY), the rest stays spooled and the flush is retried with
+exponential backoff up to MEMORY_WRITE_RETRY_MAX seconds. Records the service
+rejects with a 4xx are dropped (see memory_write_batch).
+
+On its first flush a queue claims, by renaming, the spool files of processes
+that have exited (and the former shared MEMORY_WRITE_SPOOL_FILE) and sends
+their records along with its own.
+
+Call close_memory_write_queue() on shutdown to flush what is left.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+import weakref
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Optional
+
+import aiofiles
+import aiofiles.os
+
+from agents.matmaster_agent.config import (
+    MEMORY_WRITE_BATCH_SIZE,
+    MEMORY_WRITE_FLUSH_INTERVAL,
+    MEMORY_WRITE_RETRY_MAX,
+    MEMORY_WRITE_SPOOL_FILE,
+)
+from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
+from agents.matmaster_agent.logger import PrefixFilter
+from agents.matmaster_agent.services.memory import MemoryRecord, memory_write_batch
+
+logger = logging.getLogger(__name__)
+logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
+logger.setLevel(logging.INFO)
+
+
+class MemoryWriteQueue:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        *,
+        batch_size: int = MEMORY_WRITE_BATCH_SIZE,
+        flush_interval: float = MEMORY_WRITE_FLUSH_INTERVAL,
+        retry_max: float = MEMORY_WRITE_RETRY_MAX,
+        spool_file: str = MEMORY_WRITE_SPOOL_FILE,
+    ):
+        self.base_url = base_url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_max = retry_max
+        self.spool_base = Path(spool_file)
+        self.spool_file = self.spool_base.with_name(
+            f'{self.spool_base.stem}.{os.getpid()}-{uuid.uuid4().hex[:8]}'
+            f'{self.spool_base.suffix}'
+        )
+        _own_spools.add(self.spool_file.name)
+
+        self._pending: list[MemoryRecord] = []
+        # spool 文件内容的内存副本，flush 时无需重新读取
+        self._spooled: list[MemoryRecord] = []
+        self._recovered = False
+        self._retry_delay = 0.0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def put(self, record: MemoryRecord) -> None:
+        """Queue ``record`` for writing; must run inside the loop."""
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(), name='memory-write-queue'
+            )
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """Write pending and spooled records; returns how many remain spooled."""
+        async with self._flush_lock:
+            claimed: list[Path] = []
+            new_records: list[MemoryRecord] = []
+            if not self._recovered:
+                claimed = await self._claim_leftover_spools()
+                for path in claimed:
+                    new_records += await self._read_spool(path)
+                self._recovered = True
+
+            n_pending = len(self._pending)
+            new_records += self._pending[:n_pending]
+            await self._append_spool(new_records)
+            del self._pending[:n_pending]
+            for path in claimed:
+                await aiofiles.os.remove(path)
+            records = self._spooled + new_records
+            self._spooled = records
+
+            remaining: list[MemoryRecord] = []
+            for start in range(0, len(records), self.batch_size):
+                chunk = records[start : start + self.batch_size]
+                failed = await memory_write_batch(chunk, self.base_url)
+                remaining += failed
+                if len(failed) == len(chunk):
+                    # 整批失败，视为服务不可用，剩余记录留在 spool 里等待重试
+                    remaining += records[start + self.batch_size :]
+                    break
+
+            if len(remaining) != len(records):
+                await self._write_spool(remaining)
+            self._spooled = remaining
+            if remaining:
+                self._retry_delay = min(
+                    max(self._retry_delay * 2, self.flush_interval), self.retry_max
+                )
+                logger.warning(
+                    f'memory write: {len(records) - len(remaining)} done, '
+                    f'{len(remaining)} spooled, retry in {self._retry_delay:.0f}s'
+                )
+            else:
+                self._retry_delay = 0.0
+                logger.info(f'memory write: {len(records)} record(s) done')
+            return len(remaining)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pending:
+            await self.flush()
+
+    async def _run(self) -> None:
+        while self._pending or self._spooled:
+            if self._retry_delay:
+                await asyncio.sleep(self._retry_delay)
+            elif len(self._pending) < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    async def _claim_leftover_spools(self) -> list[Path]:
+        """Rename the spool files of exited processes to names owned by this queue."""
+        base = self.spool_base
+        if not await aiofiles.os.path.isdir(base.parent):
+            return []
+        names = [
+            name
+            for name in await aiofiles.os.listdir(base.parent)
+            if name == base.name
+            or (name.startswith(f'{base.stem}.') and name.endswith(base.suffix))
+        ]
+        claimed = []
+        for name in names:
+            if name in _own_spools or not _is_leftover(name, base):
+                continue
+            # 重命名为本进程所有；多个进程同时认领时只有一个能成功
+            path = self.spool_file.with_name(
+                f'{self.spool_file.stem}-r{len(claimed)}{base.suffix}'
+            )
+            try:
+                await aiofiles.os.rename(base.parent / name, path)
+            except FileNotFoundError:
+                continue
+            _own_spools.add(path.name)
+            claimed.append(path)
+        if claimed:
+            logger.info(f'memory write: recovered {len(claimed)} spool file(s)')
+        return claimed
+
+    async def _read_spool(self, path: Path) -> list[MemoryRecord]:
+        records = []
+        async with aiofiles.open(path, encoding='utf-8') as f:
+            async for line in f:
+                try:
+                    records.append(MemoryRecord(**json.loads(line)))
+                except (json.JSONDecodeError, TypeError):
+                    logger.warning(f'memory write: skip malformed spool line {line!r}')
+        return records
+
+    async def _append_spool(self, records: list[MemoryRecord]) -> None:
+        if not records:
+            return
+        await aiofiles.os.makedirs(self.spool_file.parent, exist_ok=True)
+        async with aiofiles.open(self.spool_file, 'a', encoding='utf-8') as f:
+            await f.write(_dump(records))
+
+    async def _write_spool(self, records: list[MemoryRecord]) -> None:
+        if not records:
+            if await aiofiles.os.path.exists(self.spool_file):
+                await aiofiles.os.remove(self.spool_file)
+            return
+
+        tmp_file = self.spool_file.with_suffix('.tmp')
+        async with aiofiles.open(tmp_file, 'w', encoding='utf-8') as f:
+            await f.write(_dump(records))
+        # 原子替换，中途取消时 spool 要么是旧内容要么是新内容
+        await aiofiles.os.replace(tmp_file, self.spool_file)
+
+
+# 本进程创建或认领的 spool 文件名
+_own_spools: set[str] = set()
+
+
+def _is_leftover(name: str, base: Path) -> bool:
+    """True for the former shared spool and for spools of exited processes."""
+    if name == base.name:
+        return True
+    owner = name[len(base.stem) + 1 : -len(base.suffix)].split('-', 1)[0]
+    try:
+        pid = int(owner)
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        # 同一 pid（如容器重启后）但不是本进程创建的
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def _dump(records: list[MemoryRecord]) -> str:
+    return ''.join(
+        json.dumps(asdict(record), ensure_ascii=False) + '\n' for record in records
+    )
+
+
+# event loop -> MemoryWriteQueue（asyncio 对象不能跨 loop 复用）
+_queues: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_memory_write_queue() -> MemoryWriteQueue:
+    """Return the MemoryWriteQueue bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    queue = _queues.get(loop)
+    if queue is None:
+        queue = _queues[loop] = MemoryWriteQueue()
+    return queue
+
+
+def enqueue_memory_write(
+    session_id: str, text: str, metadata: Optional[dict[str, Any]] = None
+) -> None:
+    """Non-blocking memory_write: the record is written in the background."""
+    get_memory_write_queue().put(MemoryRecord(session_id, text, metadata or {}))
+
+
+async def close_memory_write_queue() -> None:
+    """Flush and stop the MemoryWriteQueue of the running event loop, if any."""
+    queue = _queues.pop(asyncio.get_running_loop(), None)
+    if queue is not None:
+        await queue.close()
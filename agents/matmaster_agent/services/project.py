@@ -1,24 +1,29 @@
 import asyncio
 import json
 
-import aiohttp
-
 from agents.matmaster_agent.constant import OPENAPI_HOST
+from agents.matmaster_agent.services.http_client import OPENAPI_POLICY, request_text
 
 
 async def get_project_list(access_key: str):
     user_project_list_url = f"{OPENAPI_HOST}/openapi/v1/open/user/project/list"
     params = {'accessKey': access_key}
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(user_project_list_url, params=params) as response:
-            res = json.loads(await response.text())
-            project_list = res.get('data', {}).get('items', [])
-
-            if project_list:
-                return [item['project_id'] for item in project_list]
-            else:
-                return project_list
+    res = json.loads(
+        await request_text(
+            'GET',
+            user_project_list_url,
+            policy=OPENAPI_POLICY,
+            raise_for_status=False,
+            params=params,
+        )
+    )
+    project_list = res.get('data', {}).get('items', [])
+
+    if project_list:
+        return [item['project_id'] for item in project_list]
+    else:
+        return project_list
 
 
 if __name__ == '__main__':
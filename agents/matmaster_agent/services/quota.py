@@ -1,29 +1,32 @@
 import asyncio
 
-import aiohttp
-
 from agents.matmaster_agent.constant import MATMASTER_TOOLS_SERVER
+from agents.matmaster_agent.services.http_client import (
+    TOOLS_SERVER_POLICY,
+    WRITE_POLICY,
+    request_json,
+)
 
 
 async def check_quota_service(user_id: str):
     headers = {'X-User-Id': user_id}
     url = f'{MATMASTER_TOOLS_SERVER}/api/v1/quota/info'
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            response.raise_for_status()  # 如果状态码不是 200，抛出异常
-            json_content = await response.json()
-            return json_content
+    # 如果状态码不是 200，抛出异常
+    return await request_json('GET', url, policy=TOOLS_SERVER_POLICY, headers=headers)
 
 
 async def use_quota_service(user_id: str):
     url = f'{MATMASTER_TOOLS_SERVER}/api/v1/quota/use'
     headers = {'X-User-Id': user_id}
-    request_json = {'user_id': user_id}
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, headers=headers, json=request_json) as response:
-            response.raise_for_status()  # 如果状态码不是 200，抛出异常
-            json_content = await response.json()
-            return json_content
+    request_json_body = {'user_id': user_id}
+    # 扣减额度非幂等，不重试；如果状态码不是 200，抛出异常
+    return await request_json(
+        'POST',
+        url,
+        policy=WRITE_POLICY,
+        headers=headers,
+        json=request_json_body,
+    )
 
 
 if __name__ == '__main__':
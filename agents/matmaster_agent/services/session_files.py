@@ -1,35 +1,194 @@
-from typing import List
+"""
+Session file records on the tools server, plus an in-process index per session.
 
-import aiohttp
+get_session_file_index() loads a session's files from the server once; after
+that insert_session_files keeps the index current, so tool callbacks resolve
+file names without network calls. An index older than SESSION_FILE_INDEX_TTL
+is still served while a background refresh picks up files added by other
+workers; resolve() also refreshes it once, awaited, when a name is not found,
+so a file just uploaded through another worker is not missed.
+"""
 
-from agents.matmaster_agent.constant import MATMASTER_TOOLS_SERVER
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from agents.matmaster_agent.config import (
+    SESSION_FILE_INDEX_SIZE,
+    SESSION_FILE_INDEX_TTL,
+)
+from agents.matmaster_agent.constant import (
+    MATMASTER_AGENT_NAME,
+    MATMASTER_TOOLS_SERVER,
+)
+from agents.matmaster_agent.logger import PrefixFilter
+from agents.matmaster_agent.services.http_client import (
+    TOOLS_SERVER_POLICY,
+    request_json,
+)
+
+logger = logging.getLogger(__name__)
+logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
+logger.setLevel(logging.INFO)
+
+
+class SessionFileIndex:
+    """Files of one session, looked up by exact URL or by a '/'-aligned suffix (basename, dir/basename, ...)."""
+
+    def __init__(self, files: Iterable[str] = (), session_id: Optional[str] = None):
+        self.session_id = session_id
+        self.files: list[str] = []
+        self._urls: set[str] = set()
+        # 'dir/name.cif', 'name.cif' -> url，同一后缀保留最早的文件
+        self._suffixes: dict[str, str] = {}
+        # 最近一次从服务端加载的时间，None 表示尚未加载
+        self.refreshed_at: Optional[float] = None
+        self.add(files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __contains__(self, url) -> bool:
+        return url in self._urls
+
+    def add(self, files: Iterable[str]) -> None:
+        for url in files:
+            if not isinstance(url, str) or url in self._urls:
+                continue
+            self._urls.add(url)
+            self.files.append(url)
+            parts = url.split('://', 1)[-1].split('/')
+            for i in range(len(parts)):
+                if suffix := '/'.join(parts[i:]):
+                    self._suffixes.setdefault(suffix, url)
+
+    def match(self, file_path: str) -> Optional[str]:
+        """
+        The session file ``file_path`` refers to, or None. An exact URL or
+        '/'-aligned suffix hit takes precedence over a substring of an earlier
+        file.
+        """
+        if not file_path:
+            return None
+        if file_path in self._urls:
+            return file_path
+        if url := self._suffixes.get(file_path.lstrip('/')):
+            return url
+        # 非路径对齐的片段（如文件名的一部分）仍按子串匹配，只在内存中扫描
+        return next((url for url in self.files if file_path in url), None)
+
+    async def resolve(self, file_path: str) -> Optional[str]:
+        """match(), refreshing the index from the tools server once on a miss."""
+        url = self.match(file_path)
+        if url is not None or not file_path or self.session_id is None:
+            return url
+        try:
+            await asyncio.shield(_refresh(self.session_id, self))
+        except Exception as e:
+            logger.warning(f'{self.session_id} refresh session files failed: {e}')
+            return None
+        return self.match(file_path)
+
+
+_indexes: OrderedDict[str, SessionFileIndex] = OrderedDict()
+_loading: dict[str, asyncio.Task] = {}
 
 
 async def get_session_files(session_id: str) -> List[str]:
     url = f'{MATMASTER_TOOLS_SERVER}/api/v1/sessions/{session_id}/files'
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            response.raise_for_status()
-            json_content = await response.json()
+    json_content = await request_json('GET', url, policy=TOOLS_SERVER_POLICY)
+
+    data = json_content.get('data') or {}
+    return data.get('files', []) if isinstance(data, dict) else []
+
+
+async def _load(session_id: str, index: SessionFileIndex) -> None:
+    index.add(await get_session_files(session_id))
+    index.refreshed_at = time.monotonic()
 
-            data = json_content.get('data') or {}
-            return data.get('files', []) if isinstance(data, dict) else []
+
+def _loaded(session_id: str, task: asyncio.Task) -> None:
+    _loading.pop(session_id, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f'{session_id} load session files failed: {task.exception()}')
+
+
+def _refresh(session_id: str, index: SessionFileIndex) -> asyncio.Task:
+    task = _loading.get(session_id)
+    if task is None:
+        task = asyncio.create_task(_load(session_id, index))
+        task.add_done_callback(lambda t: _loaded(session_id, t))
+        _loading[session_id] = task
+    return task
+
+
+async def get_session_file_index(session_id: str) -> SessionFileIndex:
+    """
+    The session's file index; only the first call for a session (or one after
+    a failed load) waits for the tools server.
+    """
+    index = _indexes.get(session_id)
+    if index is None:
+        index = _indexes[session_id] = SessionFileIndex(session_id=session_id)
+        while len(_indexes) > SESSION_FILE_INDEX_SIZE:
+            _indexes.popitem(last=False)
+    _indexes.move_to_end(session_id)
+
+    if index.refreshed_at is None:
+        await asyncio.shield(_refresh(session_id, index))
+    elif index.refreshed_at + SESSION_FILE_INDEX_TTL <= time.monotonic():
+        _refresh(session_id, index)
+    return index
 
 
 async def insert_session_files(session_id: str, files: List[str]) -> List[str]:
     url = f'{MATMASTER_TOOLS_SERVER}/api/v1/sessions/{session_id}/files'
     req = {'files': files}
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json=req) as response:
-            response.raise_for_status()
-            json_content = await response.json()
+    json_content = await request_json('POST', url, policy=TOOLS_SERVER_POLICY, json=req)
+    # 未加载过的会话不建索引，首次查询时会从服务端拿到这些文件
+    if (index := _indexes.get(session_id)) is not None:
+        index.add(files)
 
-            data = json_content.get('data') or {}
-            return data.get('files', []) if isinstance(data, dict) else []
+    data = json_content.get('data') or {}
+    return data.get('files', []) if isinstance(data, dict) else []
 
 
-if __name__ == '__main__':
-    import asyncio
+async def register_session_files(session_id: str, files: Iterable[str]) -> List[str]:
+    """
+    Record ``files`` with one insert_session_files request, skipping duplicates
+    and files the session already has. Returns the files that were inserted.
+    """
+    files = list(dict.fromkeys(files))
+    try:
+        index = await get_session_file_index(session_id)
+    except Exception as e:
+        logger.warning(f'{session_id} session files unavailable for dedup: {e}')
+    else:
+        files = [url for url in files if url not in index]
+    if files:
+        await insert_session_files(session_id, files)
+    return files
 
+
+class SessionFileBatch:
+    """Collects result file URLs of one agent pass, registered by a single flush()."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.files: list[str] = []
+
+    def add(self, files: Iterable[str]) -> None:
+        self.files.extend(files)
+
+    async def flush(self) -> List[str]:
+        files, self.files = self.files, []
+        if not files:
+            return []
+        return await register_session_files(self.session_id, files)
+
+
+if __name__ == '__main__':
     result = asyncio.run(insert_session_files('session_id', ['file_url']))
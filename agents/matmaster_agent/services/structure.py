@@ -1,11 +1,13 @@
 import asyncio
 import json
 import logging
+from dataclasses import replace
 from typing import Optional
 
 import aiohttp
 
 from agents.matmaster_agent.constant import BOHRIUM_COM, MATMASTER_AGENT_NAME
+from agents.matmaster_agent.services.http_client import DOWNLOAD_POLICY, request_text
 
 logger = logging.getLogger(__name__)
 
@@ -20,12 +22,9 @@ async def fetch_file_content(url: str, timeout: int = 30) -> Optional[str]:
         文件内容字符串，如果失败返回 None
     """
     try:
-        timeout_obj = aiohttp.ClientTimeout(total=timeout)
-        async with aiohttp.ClientSession(timeout=timeout_obj) as session:
-            async with session.get(url) as response:
-                response.raise_for_status()  # 如果状态码不是 200，抛出异常
-                content = await response.text()
-                return content
+        policy = replace(DOWNLOAD_POLICY, total_timeout=timeout)
+        # 如果状态码不是 200，抛出异常
+        return await request_text('GET', url, policy=policy)
     except aiohttp.ClientError as e:
         print(f"网络请求错误: {e}")
         return None
@@ -45,11 +44,11 @@ async def get_info_by_path(file_url, format) -> dict:
     # 统一使用小写格式，避免后端对大小写敏感导致 format is invalid
     normalized_format = (format or '').lower()
     body_json = {'fileContent': file_content, 'format': normalized_format}
-    async with aiohttp.ClientSession() as session:
-        async with session.post(info_by_path_url, json=body_json) as response:
-            raw_res = await response.text()
-            logger.info(f"[{MATMASTER_AGENT_NAME}] raw_res = {raw_res}")
-            dict_res = json.loads(raw_res)
-            logger.info(f"[{MATMASTER_AGENT_NAME}] res = {dict_res}")
+    raw_res = await request_text(
+        'POST', info_by_path_url, raise_for_status=False, json=body_json
+    )
+    logger.info(f"[{MATMASTER_AGENT_NAME}] raw_res = {raw_res}")
+    dict_res = json.loads(raw_res)
+    logger.info(f"[{MATMASTER_AGENT_NAME}] res = {dict_res}")
 
     return dict_res
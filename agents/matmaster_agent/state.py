@@ -23,3 +23,4 @@ class StateKey(StrEnum):
 
 class StepKey(StrEnum):
     STEP_DESCRIPTION = 'step_description'
+    DEPENDS_ON = 'depends_on'
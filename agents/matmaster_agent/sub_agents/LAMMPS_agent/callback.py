@@ -5,14 +5,16 @@ from google.adk.tools import ToolContext
 
 from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
 from agents.matmaster_agent.logger import PrefixFilter
-from agents.matmaster_agent.services.session_files import get_session_files
+from agents.matmaster_agent.services.session_files import (
+    get_session_file_index,
+)
 
 logger = logging.getLogger(__name__)
 logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
 logger.setLevel(logging.INFO)
 
 
-async def _replace_if_not_oss_url(file_path, actual_files, tool_name, arg_name):
+async def _replace_if_not_oss_url(file_path, session_files, tool_name, arg_name):
     """
     Checks if the file_path is an OSS URL, if not, tries to match it with actual files
     and returns the matched OSS URL or the original file_path.
@@ -22,7 +24,7 @@ async def _replace_if_not_oss_url(file_path, actual_files, tool_name, arg_name):
         parsed = urlparse(file_path)
         if parsed.scheme in ['http', 'https']:
             # If it's a URL, check if it's in the session files
-            if file_path in actual_files:
+            if file_path in session_files:
                 logger.info(
                     f"[validate_file_urls] Found real file URL: {file_path} for {tool_name}.{arg_name}"
                 )
@@ -33,16 +35,13 @@ async def _replace_if_not_oss_url(file_path, actual_files, tool_name, arg_name):
                 )
                 return file_path  # Return as is if it's a URL but not in session (maybe external)
 
-        # If it's not a URL, try to match with actual files in the session using regex
-        for actual_file_url in actual_files:
-            # Check if the file_path is part of the URL or matches the filename at the end
-            if file_path in actual_file_url or actual_file_url.endswith(
-                '/' + file_path
-            ):
-                logger.info(
-                    f"[validate_file_urls] Found real file match: {file_path} -> {actual_file_url} for {tool_name}.{arg_name}"
-                )
-                return actual_file_url
+        # If it's not a URL, look the name up in the session file index
+        actual_file_url = await session_files.resolve(file_path)
+        if actual_file_url:
+            logger.info(
+                f"[validate_file_urls] Found real file match: {file_path} -> {actual_file_url} for {tool_name}.{arg_name}"
+            )
+            return actual_file_url
 
         # If no match found, return the original value
         logger.info(
@@ -59,10 +58,11 @@ async def validate_lammps_file_urls(tool, args, tool_context: ToolContext):
     """
     session_id = tool_context.session.id
 
-    # Get actual files from the session
+    # Get the session file index (the first lookup of a session hits the server;
+    # a name that is not found triggers one refresh in resolve())
     try:
-        actual_files = await get_session_files(session_id)
-        logger.info(f"Retrieved {len(actual_files)} files from session: {actual_files}")
+        session_files = await get_session_file_index(session_id)
+        logger.info(f"Retrieved {len(session_files)} files from session")
     except Exception as e:
         logger.error(f"Failed to retrieve session files: {e}")
         return
@@ -86,14 +86,14 @@ async def validate_lammps_file_urls(tool, args, tool_context: ToolContext):
                     updated_list = []
                     for item in original_value:
                         updated_item = await _replace_if_not_oss_url(
-                            item, actual_files, tool.name, arg_name
+                            item, session_files, tool.name, arg_name
                         )
                         updated_list.append(updated_item)
                     args[arg_name] = updated_list
                 else:
                     # For single values, check and replace if needed
                     updated_value = await _replace_if_not_oss_url(
-                        original_value, actual_files, tool.name, arg_name
+                        original_value, session_files, tool.name, arg_name
                     )
                     args[arg_name] = updated_value
 
@@ -0,0 +1,241 @@
+"""
+周期性近邻搜索（cell list），供 structure_analyzer 判断表面/吸附物使用
+
+原子先折回晶胞内，再补上距晶胞 ``cutoff`` 以内的周期性镜像（ghost atoms），
+之后按边长 ``cutoff`` 的笛卡尔网格分桶，只在相邻 27 个桶内找候选原子对。
+固定密度下复杂度 O(N)，任意（三斜）晶胞下得到的都是最短镜像距离。
+不传 lattice 时退化为非周期体系。
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# 键长判据：max(default, 1.1 * (r_i + r_j))，未知元素半径按 1.0 Å 计，
+# 两个原子半径都未知时直接用 default
+BOND_SCALE = 1.1
+UNKNOWN_RADIUS = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class NeighborList:
+    """
+    有向原子对 (i, j)，包含所有距离不超过搜索半径的对（含自身的周期镜像）。
+
+    ``bonded`` 标记满足成键判据的对；原子 j 通过周期镜像与 i 相邻时，
+    ``distance`` 为镜像距离。
+    """
+
+    n_atoms: int
+    i: np.ndarray
+    j: np.ndarray
+    distance: np.ndarray
+    bonded: np.ndarray
+
+    def components(self) -> List[List[int]]:
+        """成键连通分量；分量内原子升序，分量按最小原子序号排序。"""
+        if self.n_atoms == 0:
+            return []
+        labels = _connected_labels(
+            self.n_atoms, self.i[self.bonded], self.j[self.bonded]
+        )
+        order = np.argsort(labels, kind='stable')
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        return [group.tolist() for group in np.split(order, boundaries)]
+
+    def average_nearest_distance(self, indices: Sequence[int]) -> float:
+        """
+        ``indices`` 内每个原子到组内最近原子的平均距离。
+
+        只统计搜索半径内的对，对一个连通分量而言结果是精确的
+        （每个原子都有成键邻居落在半径内）；找不到邻居的原子记 0。
+        """
+        if len(indices) == 0:
+            return 0.0
+        mask = self._group_mask(indices)
+        pairs = mask[self.i] & mask[self.j]
+        nearest = np.full(self.n_atoms, np.inf)
+        np.minimum.at(nearest, self.i[pairs], self.distance[pairs])
+        nearest = nearest[np.asarray(indices)]
+        nearest[np.isinf(nearest)] = 0.0
+        return float(nearest.mean())
+
+    def min_distance_between(
+        self, indices_a: Sequence[int], indices_b: Sequence[int]
+    ) -> float:
+        """两组原子间的最短距离；超出搜索半径时返回 inf。"""
+        pairs = (
+            self._group_mask(indices_a)[self.i] & self._group_mask(indices_b)[self.j]
+        )
+        if not pairs.any():
+            return float('inf')
+        return float(self.distance[pairs].min())
+
+    def _group_mask(self, indices: Sequence[int]) -> np.ndarray:
+        mask = np.zeros(self.n_atoms, dtype=bool)
+        mask[np.asarray(indices, dtype=np.int64)] = True
+        return mask
+
+
+def pair_cutoffs(
+    radius_i: np.ndarray, radius_j: np.ndarray, default: float
+) -> np.ndarray:
+    """按原子半径（未知为 nan）计算每个原子对的成键截断距离。"""
+    known = ~np.isnan(radius_i) | ~np.isnan(radius_j)
+    scaled = BOND_SCALE * (
+        np.nan_to_num(radius_i, nan=UNKNOWN_RADIUS)
+        + np.nan_to_num(radius_j, nan=UNKNOWN_RADIUS)
+    )
+    return np.where(known, np.maximum(default, scaled), default)
+
+
+def build_neighbor_list(
+    positions: Sequence[Sequence[float]],
+    lattice: Optional[Sequence[Sequence[float]]] = None,
+    radii: Optional[Sequence[Optional[float]]] = None,
+    bond_cut: float = 1.9,
+) -> NeighborList:
+    """
+    构建近邻表。
+
+    Args:
+        positions: 笛卡尔坐标 (N, 3)
+        lattice: 晶格矢量（行向量），为 None 或奇异矩阵时不考虑周期性
+        radii: 每个原子的共价半径，None 表示未知；不传时所有原子对都用 bond_cut
+        bond_cut: 默认（最小）成键截断距离
+    """
+    cart = np.asarray(positions, dtype=float).reshape(-1, 3)
+    n_atoms = len(cart)
+    if radii is None:
+        radius = np.full(n_atoms, np.nan)
+    else:
+        radius = np.array(
+            [np.nan if r is None else r for r in radii], dtype=float
+        ).reshape(-1)
+
+    empty = np.zeros(0, dtype=np.int64)
+    if n_atoms == 0:
+        return NeighborList(0, empty, empty, np.zeros(0), np.zeros(0, dtype=bool))
+
+    known = ~np.isnan(radius)
+    search_radius = bond_cut
+    if known.any():
+        max_radius = max(float(radius[known].max()), UNKNOWN_RADIUS)
+        search_radius = max(bond_cut, BOND_SCALE * 2 * max_radius)
+
+    ext_cart, ext_index = _with_periodic_images(cart, lattice, search_radius)
+    i, j_ext, d2 = _candidate_pairs(ext_cart, n_atoms, search_radius)
+
+    # 去掉原子与自身（非镜像）的配对
+    keep = (d2 <= search_radius * search_radius) & (j_ext != i)
+    i, j_ext, d2 = i[keep], j_ext[keep], d2[keep]
+    j = ext_index[j_ext]
+    distance = np.sqrt(d2)
+    bonded = distance <= pair_cutoffs(radius[i], radius[j], bond_cut)
+    return NeighborList(n_atoms, i, j, distance, bonded)
+
+
+def _with_periodic_images(
+    cart: np.ndarray,
+    lattice: Optional[Sequence[Sequence[float]]],
+    search_radius: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    原子折回晶胞后追加落在 ``search_radius`` 外延范围内的镜像。
+
+    返回 (坐标, 对应原子序号)；前 N 个为原胞原子本身。
+    """
+    n_atoms = len(cart)
+    identity = np.arange(n_atoms)
+    if lattice is None:
+        return cart, identity
+
+    cell = np.asarray(lattice, dtype=float).reshape(3, 3)
+    if abs(np.linalg.det(cell)) < 1e-8:
+        return cart, identity
+
+    inverse = np.linalg.inv(cell)
+    frac = cart @ inverse
+    frac -= np.floor(frac)
+    # 第 k 个方向的晶面间距为 1 / |inverse[:, k]|，padding 以分数坐标表示
+    padding = search_radius * np.linalg.norm(inverse, axis=0)
+    repeats = np.ceil(padding).astype(int)
+
+    images = [frac]
+    indices = [identity]
+    for shift in product(*(range(-m, m + 1) for m in repeats)):
+        if not any(shift):
+            continue
+        shifted = frac + np.asarray(shift, dtype=float)
+        inside = np.all((shifted >= -padding) & (shifted <= 1 + padding), axis=1)
+        if inside.any():
+            images.append(shifted[inside])
+            indices.append(identity[inside])
+
+    return np.concatenate(images) @ cell, np.concatenate(indices)
+
+
+def _candidate_pairs(
+    ext_cart: np.ndarray, n_query: int, search_radius: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """cell list：前 ``n_query`` 个原子与相邻 27 个桶内的所有原子配对。"""
+    origin = ext_cart.min(axis=0)
+    bins = np.floor((ext_cart - origin) / search_radius).astype(np.int64)
+    dims = bins.max(axis=0) + 1
+
+    bx, by, bz = bins.T
+    linear = (bx * dims[1] + by) * dims[2] + bz
+    order = np.argsort(linear, kind='stable')
+    sorted_linear = linear[order]
+
+    query_bins = bins[:n_query]
+    query_cart = ext_cart[:n_query]
+    all_i, all_j, all_d2 = [], [], []
+    for offset in product((-1, 0, 1), repeat=3):
+        neighbor_bins = query_bins + np.asarray(offset)
+        valid = np.all((neighbor_bins >= 0) & (neighbor_bins < dims), axis=1)
+        nx, ny, nz = neighbor_bins.T
+        target = (nx * dims[1] + ny) * dims[2] + nz
+        start = np.searchsorted(sorted_linear, target, side='left')
+        stop = np.searchsorted(sorted_linear, target, side='right')
+        counts = np.where(valid, stop - start, 0)
+        total = int(counts.sum())
+        if total == 0:
+            continue
+
+        i = np.repeat(np.arange(n_query), counts)
+        first = np.repeat(start, counts)
+        rank = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        j = order[first + rank]
+        delta = query_cart[i] - ext_cart[j]
+        d2 = np.einsum('ij,ij->i', delta, delta)
+
+        within = d2 <= search_radius * search_radius
+        all_i.append(i[within])
+        all_j.append(j[within])
+        all_d2.append(d2[within])
+
+    if not all_i:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+    return np.concatenate(all_i), np.concatenate(all_j), np.concatenate(all_d2)
+
+
+def _connected_labels(n_atoms: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """
+    并查集（hook + 路径压缩的向量化版本），返回每个原子所在分量的最小原子序号。
+    """
+    labels = np.arange(n_atoms)
+    while True:
+        low = np.minimum(labels[i], labels[j])
+        np.minimum.at(labels, labels[i], low)
+        np.minimum.at(labels, labels[j], low)
+        while True:
+            compressed = labels[labels]
+            if np.array_equal(compressed, labels):
+                break
+            labels = compressed
+        if np.array_equal(labels[i], labels[j]):
+            return labels
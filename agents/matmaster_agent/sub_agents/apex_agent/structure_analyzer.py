@@ -7,6 +7,11 @@ import logging
 import math
 from typing import Any, Dict, List, Optional, Tuple
 
+from agents.matmaster_agent.sub_agents.apex_agent.neighbor_list import (
+    NeighborList,
+    build_neighbor_list,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -214,63 +219,24 @@ def _normalize_symbol(symbol: str) -> str:
     return symbol[0].upper() + symbol[1:].lower()
 
 
-def _pair_bond_cut(sym_i: str, sym_j: str, default: float = 1.9) -> float:
-    si = _normalize_symbol(sym_i)
-    sj = _normalize_symbol(sym_j)
-    ri = _ATOMIC_RADIUS.get(si)
-    rj = _ATOMIC_RADIUS.get(sj)
-    if ri and rj:
-        return max(default, 1.1 * (ri + rj))
-    if ri and not rj:
-        return max(default, 1.1 * (ri + 1.0))
-    if rj and not ri:
-        return max(default, 1.1 * (rj + 1.0))
-    return default
+def _atomic_radii(species: Optional[List[str]], n_atoms: int) -> List[Optional[float]]:
+    """每个原子的共价半径，未收录的元素为 None"""
+    if not species:
+        return [None] * n_atoms
+    return [
+        _ATOMIC_RADIUS.get(_normalize_symbol(species[i] if i < len(species) else 'X'))
+        for i in range(n_atoms)
+    ]
 
 
-def _build_components(
+def _build_neighbor_list(
     positions: List[List[float]],
     species: Optional[List[str]] = None,
     bond_cut: float = 1.9,
-) -> List[List[int]]:
-    n_atoms = len(positions)
-    if n_atoms == 0:
-        return []
-
-    adjacency: List[List[int]] = [[] for _ in range(n_atoms)]
-    for i in range(n_atoms):
-        xi, yi, zi = positions[i]
-        sym_i = species[i] if species and i < len(species) else 'X'
-        for j in range(i + 1, n_atoms):
-            xj, yj, zj = positions[j]
-            dx = xi - xj
-            dy = yi - yj
-            dz = zi - zj
-            d2 = dx * dx + dy * dy + dz * dz
-            cutoff = bond_cut
-            if species:
-                sym_j = species[j] if j < len(species) else 'X'
-                cutoff = _pair_bond_cut(sym_i, sym_j, bond_cut)
-            if d2 <= cutoff * cutoff:
-                adjacency[i].append(j)
-                adjacency[j].append(i)
-
-    visited = [False] * n_atoms
-    components: List[List[int]] = []
-    for atom_idx in range(n_atoms):
-        if not visited[atom_idx]:
-            stack = [atom_idx]
-            visited[atom_idx] = True
-            component: List[int] = []
-            while stack:
-                node = stack.pop()
-                component.append(node)
-                for neighbor in adjacency[node]:
-                    if not visited[neighbor]:
-                        visited[neighbor] = True
-                        stack.append(neighbor)
-            components.append(sorted(component))
-    return components
+    lattice: Optional[List[List[float]]] = None,
+) -> NeighborList:
+    radii = _atomic_radii(species, len(positions))
+    return build_neighbor_list(positions, lattice, radii, bond_cut)
 
 
 def _component_composition(species: List[str], component: List[int]) -> Dict[str, int]:
@@ -308,35 +274,17 @@ def _known_adsorbate_set() -> set:
     return set(known)
 
 
-def _nearest_neighbor_average_distance(points: List[List[float]]) -> float:
-    if not points or len(points) == 1:
-        return 0.0
-    total = 0.0
-    for i, (xi, yi, zi) in enumerate(points):
-        nearest = None
-        for j, (xj, yj, zj) in enumerate(points):
-            if i == j:
-                continue
-            dx = xi - xj
-            dy = yi - yj
-            dz = zi - zj
-            d = (dx * dx + dy * dy + dz * dz) ** 0.5
-            if nearest is None or d < nearest:
-                nearest = d
-        total += nearest or 0.0
-    return total / float(len(points))
-
-
 def _detect_vacuum_and_adsorbate(
     lattice: List[List[float]], cart_positions: List[List[float]], species: List[str]
 ) -> Dict[str, Any]:
-    components = _build_components(cart_positions, species, bond_cut=1.9)
+    # 近邻表只建一次（考虑周期性），成键分量与距离判断都复用它
+    neighbors = _build_neighbor_list(cart_positions, species, 1.9, lattice)
+    components = neighbors.components()
     if not components:
         return {'has_vacuum': False, 'has_adsorbate': False, 'num_adsorbate_atoms': 0}
 
     main_component = max(components, key=len)
-    main_positions = [cart_positions[idx] for idx in main_component]
-    d_avg_main = _nearest_neighbor_average_distance(main_positions)
+    d_avg_main = neighbors.average_nearest_distance(main_component)
 
     known_set = _known_adsorbate_set()
     drop_components: List[List[int]] = []
@@ -347,53 +295,20 @@ def _detect_vacuum_and_adsorbate(
         if _normalize_composition(composition) in known_set and len(comp) <= 15:
             drop_components.append(comp)
 
-    def min_distance_to_main(comp: List[int]) -> float:
-        min_dist = None
-        for idx in comp:
-            xi, yi, zi = cart_positions[idx]
-            for main_idx in main_component:
-                xj, yj, zj = cart_positions[main_idx]
-                dx = xi - xj
-                dy = yi - yj
-                dz = zi - zj
-                d = (dx * dx + dy * dy + dz * dz) ** 0.5
-                if min_dist is None or d < min_dist:
-                    min_dist = d
-        return min_dist or 0.0
-
     for comp in components:
         if comp is main_component or comp in drop_components:
             continue
-        if d_avg_main > 0.0 and min_distance_to_main(comp) > d_avg_main:
+        if (
+            d_avg_main > 0.0
+            and neighbors.min_distance_between(comp, main_component) > d_avg_main
+        ):
             drop_components.append(comp)
 
     dropped_indices = {idx for comp in drop_components for idx in comp}
     has_adsorbate = len(dropped_indices) > 0
 
-    remaining_positions = [
-        p for i, p in enumerate(cart_positions) if i not in dropped_indices
-    ]
-    remaining_species = [
-        species[i] for i in range(len(cart_positions)) if i not in dropped_indices
-    ]
-    if not remaining_positions:
-        return {
-            'has_vacuum': False,
-            'has_adsorbate': has_adsorbate,
-            'num_adsorbate_atoms': len(dropped_indices),
-        }
-
-    components_after = _build_components(
-        remaining_positions, remaining_species, bond_cut=1.9
-    )
-    if not components_after:
-        return {
-            'has_vacuum': False,
-            'has_adsorbate': has_adsorbate,
-            'num_adsorbate_atoms': len(dropped_indices),
-        }
-    main_component_after = max(components_after, key=len)
-    slab_positions = [remaining_positions[idx] for idx in main_component_after]
+    # 去掉的都是完整的连通分量，剩余原子的最大分量仍是 main_component，无需重建
+    slab_positions = [cart_positions[idx] for idx in main_component]
 
     spans_fraction: List[float] = []
     for lattice_vector in lattice:
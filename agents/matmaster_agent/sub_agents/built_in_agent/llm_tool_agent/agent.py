@@ -1,4 +1,3 @@
-import copy
 from typing import AsyncGenerator
 
 from google.adk.agents import InvocationContext
@@ -9,6 +8,7 @@ from agents.matmaster_agent.core_agents.comp_agents.dntransfer_climit_agent impo
     DisallowTransferAndContentLimitLlmAgent,
 )
 from agents.matmaster_agent.flow_agents.model import PlanStepStatusEnum
+from agents.matmaster_agent.flow_agents.plan_state import with_step_fields
 from agents.matmaster_agent.llm_config import LLMConfig
 from agents.matmaster_agent.locales import i18n
 from agents.matmaster_agent.sub_agents.built_in_agent.llm_tool_agent.constant import (
@@ -33,10 +33,11 @@ class LLMToolAgent(DisallowTransferAndContentLimitLlmAgent):
         async for event in super()._run_events(ctx):
             yield event
 
-        update_plan = copy.deepcopy(ctx.session.state['plan'])
-        update_plan['steps'][ctx.session.state['plan_index']][
-            'status'
-        ] = PlanStepStatusEnum.SUCCESS
+        update_plan = with_step_fields(
+            ctx.session.state['plan'],
+            ctx.session.state['plan_index'],
+            status=PlanStepStatusEnum.SUCCESS,
+        )
         yield update_state_event(ctx, state_delta={'plan': update_plan})
 
         current_step = ctx.session.state['plan']['steps'][
@@ -1,364 +1,215 @@
+"""
+Sub-agent / toolset registry.
+
+Every sub-agent module instantiates its CalculationMCPToolset at import time, so
+importing all of them eagerly dominates cold start. The registry therefore only
+stores ``'<module>:<attr>'`` specs (relative to this package) and imports the
+owning module on first access; ``warm_up_agents`` preloads hot agents ahead of time.
+"""
+
+import importlib
+import logging
+from collections.abc import Mapping
 from enum import Enum
+from typing import Any, Iterable, Iterator, Optional
 
-from agents.matmaster_agent.sub_agents.ABACUS_agent.agent import (
-    ABACUSCalculatorAgent,
-)
 from agents.matmaster_agent.sub_agents.ABACUS_agent.constant import ABACUS_AGENT_NAME
-from agents.matmaster_agent.sub_agents.apex_agent.agent import ApexAgent, apex_toolset
 from agents.matmaster_agent.sub_agents.apex_agent.constant import ApexAgentName
-from agents.matmaster_agent.sub_agents.built_in_agent.file_parse_agent.agent import (
-    FileParseAgent,
-)
 from agents.matmaster_agent.sub_agents.built_in_agent.file_parse_agent.constant import (
     FILE_PARSE_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.built_in_agent.llm_tool_agent.agent import (
-    LLMToolAgent,
-)
 from agents.matmaster_agent.sub_agents.built_in_agent.llm_tool_agent.constant import (
     TOOL_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.chembrain_agent.agent import ChemBrainAgent
 from agents.matmaster_agent.sub_agents.chembrain_agent.constant import (
     CHEMBRAIN_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.chembrain_agent.retrosyn_agent.agent import (
-    retrosyn_toolset,
-)
-from agents.matmaster_agent.sub_agents.chembrain_agent.smiles_conversion_agent.agent import (
-    smiles_conversion_toolset,
-)
-from agents.matmaster_agent.sub_agents.chembrain_agent.unielf_agent.agent import (
-    UniELFAgent,
-    unielf_toolset,
-)
 from agents.matmaster_agent.sub_agents.chembrain_agent.unielf_agent.constant import (
     UniELFAgentName,
 )
-from agents.matmaster_agent.sub_agents.CompDART_agent.agent import (
-    CompDARTAgent,
-    compdart_toolset,
-)
 from agents.matmaster_agent.sub_agents.CompDART_agent.constant import (
     COMPDART_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.convexhull_agent.agent import (
-    ConvexHullAgent,
-    convexhull_toolset,
-)
 from agents.matmaster_agent.sub_agents.convexhull_agent.constant import (
     ConvexHullAgentName,
 )
-from agents.matmaster_agent.sub_agents.document_parser_agent.agent import (
-    DocumentParserAgentBase,
-    document_parser_toolset,
-)
 from agents.matmaster_agent.sub_agents.document_parser_agent.constant import (
     DocumentParserAgentName,
 )
-from agents.matmaster_agent.sub_agents.doe_agent.agent import (
-    DoEAgent,
-    doe_toolset,
-)
 from agents.matmaster_agent.sub_agents.doe_agent.constant import (
     DOE_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.DPACalculator_agent.agent import (
-    DPACalculationsAgent,
-    dpa_toolset,
-)
 from agents.matmaster_agent.sub_agents.DPACalculator_agent.constant import (
     DPACalulator_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.Electron_Microscope_agent.agent import (
-    ElectronMicroscopeAgent,
-    electron_microscope_toolset,
-)
 from agents.matmaster_agent.sub_agents.Electron_Microscope_agent.constant import (
     Electron_Microscope_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.finetune_dpa_agent.agent import (
-    FinetuneDPAAgent,
-    finetune_dpa_toolset,
-)
 from agents.matmaster_agent.sub_agents.finetune_dpa_agent.constant import (
     FinetuneDPAAgentName,
 )
-from agents.matmaster_agent.sub_agents.HEA_assistant_agent.agent import (
-    HEA_assistant_AgentBase,
-    hea_assistant_toolset,
-)
 from agents.matmaster_agent.sub_agents.HEA_assistant_agent.constant import (
     HEA_assistant_AgentName,
 )
-from agents.matmaster_agent.sub_agents.HEACalculator_agent.agent import (
-    HEACalculatorAgentBase,
-    hea_calculator_toolset,
-)
 from agents.matmaster_agent.sub_agents.HEACalculator_agent.constant import (
     HEACALCULATOR_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.HEAkb_agent.agent import (
-    HEAKbAgent,
-    hea_kb_toolset,
-)
 from agents.matmaster_agent.sub_agents.HEAkb_agent.constant import (
     HEA_KB_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.LAMMPS_agent.agent import (
-    LAMMPSAgent,
-    lammps_toolset,
-)
 from agents.matmaster_agent.sub_agents.LAMMPS_agent.constant import LAMMPS_AGENT_NAME
-from agents.matmaster_agent.sub_agents.MrDice_agent.bohriumpublic_agent.agent import (
-    Bohriumpublic_AgentBase,
-    bohriumpublic_toolset,
-)
 from agents.matmaster_agent.sub_agents.MrDice_agent.bohriumpublic_agent.constant import (
     BOHRIUMPUBLIC_DATABASE_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.MrDice_agent.mofdb_agent.agent import (
-    Mofdb_AgentBase,
-    mofdb_toolset,
-)
 from agents.matmaster_agent.sub_agents.MrDice_agent.mofdb_agent.constant import (
     MOFDB_DATABASE_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.MrDice_agent.openlam_agent.agent import (
-    Openlam_AgentBase,
-    openlam_toolset,
-)
 from agents.matmaster_agent.sub_agents.MrDice_agent.openlam_agent.constant import (
     OPENLAM_DATABASE_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.MrDice_agent.optimade_agent.agent import (
-    Optimade_AgentBase,
-    optimade_toolset,
-)
 from agents.matmaster_agent.sub_agents.MrDice_agent.optimade_agent.constant import (
     OPTIMADE_DATABASE_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.NMR_agent.agent import (
-    NMRAgent,
-    nmr_toolset,
-)
 from agents.matmaster_agent.sub_agents.NMR_agent.constant import (
     NMR_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.organic_reaction_agent.agent import (
-    OragnicReactionAgent,
-    organic_reaction_toolset,
-)
 from agents.matmaster_agent.sub_agents.organic_reaction_agent.constant import (
     ORGANIC_REACTION_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.perovskite_agent.agent import (
-    PerovskiteAgent,
-    perovskite_toolset,
-)
 from agents.matmaster_agent.sub_agents.perovskite_agent.constant import (
     PerovskiteAgentName,
 )
-from agents.matmaster_agent.sub_agents.Physical_adsorption_agent.agent import (
-    PhysicalAdsorptionAgent,
-    physical_adsorption_toolset,
-)
 from agents.matmaster_agent.sub_agents.Physical_adsorption_agent.constant import (
     Physical_Adsorption_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.piloteye_electro_agent.agent import (
-    PiloteyeElectroAgent,
-    piloteye_electro_toolset,
-)
 from agents.matmaster_agent.sub_agents.piloteye_electro_agent.constant import (
     PILOTEYE_ELECTRO_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.POLYMERkb_agent.agent import (
-    POLYMERKbAgent,
-    polymer_kb_toolset,
-)
 from agents.matmaster_agent.sub_agents.POLYMERkb_agent.constant import (
     POLYMER_KB_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.ScienceNavigator_agent.agent import (
-    ScienceNavigatorAgent,
-    science_navigator_toolset,
-)
 from agents.matmaster_agent.sub_agents.ScienceNavigator_agent.constant import (
     SCIENCE_NAVIGATOR_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.ssebrain_agent.agent import SSEBrainAgent
 from agents.matmaster_agent.sub_agents.ssebrain_agent.constant import (
     SSEBRAIN_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.SSEkb_agent.agent import (
-    SSEKbAgent,
-    sse_kb_toolset,
-)
 from agents.matmaster_agent.sub_agents.SSEkb_agent.constant import (
     SSE_KB_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.STEEL_PREDICT_agent.agent import (
-    STEELPredictAgent,
-    steel_predict_toolset,
-)
 from agents.matmaster_agent.sub_agents.STEEL_PREDICT_agent.constant import (
     STEEL_PREDICT_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.STEELkb_agent.agent import (
-    STEELKbAgent,
-    steel_kb_toolset,
-)
 from agents.matmaster_agent.sub_agents.STEELkb_agent.constant import (
     STEEL_KB_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.structure_generate_agent.agent import (
-    StructureGenerateAgent,
-    structure_generate_toolset,
-)
 from agents.matmaster_agent.sub_agents.structure_generate_agent.constant import (
     StructureGenerateAgentName,
 )
-from agents.matmaster_agent.sub_agents.superconductor_agent.agent import (
-    SuperconductorAgent,
-    superconductor_toolset,
-)
 from agents.matmaster_agent.sub_agents.superconductor_agent.constant import (
     SuperconductorAgentName,
 )
-from agents.matmaster_agent.sub_agents.task_orchestrator_agent.agent import (
-    TaskOrchestratorAgent,
-)
 from agents.matmaster_agent.sub_agents.task_orchestrator_agent.constant import (
     TASK_ORCHESTRATOR_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.thermoelectric_agent.agent import (
-    ThermoAgent,
-    thermoelectric_toolset,
-)
 from agents.matmaster_agent.sub_agents.thermoelectric_agent.constant import (
     ThermoelectricAgentName,
 )
 from agents.matmaster_agent.sub_agents.tools import ALL_TOOLS
-from agents.matmaster_agent.sub_agents.TPD_agent.agent import (
-    TPDAgent,
-    tpd_toolset,
-)
 from agents.matmaster_agent.sub_agents.TPD_agent.constant import (
     TPD_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.traj_analysis_agent.agent import (
-    TrajAnalysisAgent,
-    traj_analysis_toolset,
-)
 from agents.matmaster_agent.sub_agents.traj_analysis_agent.constant import (
     TrajAnalysisAgentName,
 )
-from agents.matmaster_agent.sub_agents.vaspkit_agent.agent import (
-    VASPKITAgent,
-    vaspkit_toolset,
-)
 from agents.matmaster_agent.sub_agents.vaspkit_agent.constant import (
     VASPKIT_AGENT_NAME,
 )
-from agents.matmaster_agent.sub_agents.visualizer_agent.agent import (
-    VisualizerAgent,
-    visualizer_toolset,
-)
 from agents.matmaster_agent.sub_agents.visualizer_agent.constant import (
     VisualizerAgentName,
 )
-from agents.matmaster_agent.sub_agents.XRD_agent.agent import (
-    XRDAgent,
-    xrd_toolset,
-)
 from agents.matmaster_agent.sub_agents.XRD_agent.constant import (
     XRD_AGENT_NAME,
 )
 
-ALL_TOOLSET_DICT = {
-    'apex_toolset': apex_toolset,
-    'smiles_conversion_toolset': smiles_conversion_toolset,
-    'retrosyn_toolset': retrosyn_toolset,
-    'unielf_toolset': unielf_toolset,
-    'compdart_toolset': compdart_toolset,
-    'doe_toolset': doe_toolset,
-    'document_parser_toolset': document_parser_toolset,
-    'dpa_toolset': dpa_toolset,
-    'finetune_dpa_toolset': finetune_dpa_toolset,
-    'hea_assistant_toolset': hea_assistant_toolset,
-    'hea_calculator_toolset': hea_calculator_toolset,
-    'hea_kb_toolset': hea_kb_toolset,
-    'sse_kb_toolset': sse_kb_toolset,
-    'polymer_kb_toolset': polymer_kb_toolset,
-    'steel_kb_toolset': steel_kb_toolset,
-    'steel_predict_toolset': steel_predict_toolset,
-    'optimade_toolset': optimade_toolset,
-    'bohriumpublic_toolset': bohriumpublic_toolset,
-    'openlam_toolset': openlam_toolset,
-    'mofdb_toolset': mofdb_toolset,
-    'organic_reaction_toolset': organic_reaction_toolset,
-    'perovskite_toolset': perovskite_toolset,
-    'piloteye_electro_toolset': piloteye_electro_toolset,
-    'structure_generate_toolset': structure_generate_toolset,
-    'superconductor_toolset': superconductor_toolset,
-    'thermoelectric_toolset': thermoelectric_toolset,
-    'traj_analysis_toolset': traj_analysis_toolset,
-    'visualizer_toolset': visualizer_toolset,
-    'lammps_toolset': lammps_toolset,
-    'vaspkit_toolset': vaspkit_toolset,
-    'science_navigator_toolset': science_navigator_toolset,
-    'convexhull_toolset': convexhull_toolset,
-    'nmr_toolset': nmr_toolset,
-    'xrd_toolset': xrd_toolset,
-    'tpd_toolset': tpd_toolset,
-    'electron_microscope_toolset': electron_microscope_toolset,
-    'physical_adsorption_toolset': physical_adsorption_toolset,
-}
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class LazyImportMapping(Mapping):
+    """Read-only ``name -> object`` mapping that imports ``'<module>:<attr>'`` on first access."""
+
+    def __init__(self, specs: dict[str, str]):
+        self._specs = specs
+        self._resolved: dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._resolved:
+            module_path, attr = self._specs[key].split(':')
+            module = importlib.import_module(f'{__package__}.{module_path}')
+            self._resolved[key] = getattr(module, attr)
+            logger.info(f'[LazyImportMapping] loaded {key} from {module_path}')
+        return self._resolved[key]
+
+    def __contains__(self, key: object) -> bool:
+        # 不触发 import
+        return key in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
 
-AGENT_CLASS_MAPPING = {
-    ABACUS_AGENT_NAME: ABACUSCalculatorAgent,
-    ApexAgentName: ApexAgent,
-    CHEMBRAIN_AGENT_NAME: ChemBrainAgent,
-    COMPDART_AGENT_NAME: CompDARTAgent,
-    DOE_AGENT_NAME: DoEAgent,
-    DocumentParserAgentName: DocumentParserAgentBase,
-    DPACalulator_AGENT_NAME: DPACalculationsAgent,
-    FinetuneDPAAgentName: FinetuneDPAAgent,
-    HEA_assistant_AgentName: HEA_assistant_AgentBase,
-    HEACALCULATOR_AGENT_NAME: HEACalculatorAgentBase,
-    HEA_KB_AGENT_NAME: HEAKbAgent,
-    SSE_KB_AGENT_NAME: SSEKbAgent,
-    POLYMER_KB_AGENT_NAME: POLYMERKbAgent,
-    STEEL_KB_AGENT_NAME: STEELKbAgent,
-    STEEL_PREDICT_AGENT_NAME: STEELPredictAgent,
-    LAMMPS_AGENT_NAME: LAMMPSAgent,
-    OPTIMADE_DATABASE_AGENT_NAME: Optimade_AgentBase,
-    BOHRIUMPUBLIC_DATABASE_AGENT_NAME: Bohriumpublic_AgentBase,
-    MOFDB_DATABASE_AGENT_NAME: Mofdb_AgentBase,
-    OPENLAM_DATABASE_AGENT_NAME: Openlam_AgentBase,
-    ORGANIC_REACTION_AGENT_NAME: OragnicReactionAgent,
-    PerovskiteAgentName: PerovskiteAgent,
-    PILOTEYE_ELECTRO_AGENT_NAME: PiloteyeElectroAgent,
-    SSEBRAIN_AGENT_NAME: SSEBrainAgent,
-    SCIENCE_NAVIGATOR_AGENT_NAME: ScienceNavigatorAgent,
-    StructureGenerateAgentName: StructureGenerateAgent,
-    SuperconductorAgentName: SuperconductorAgent,
-    TASK_ORCHESTRATOR_AGENT_NAME: TaskOrchestratorAgent,
-    ThermoelectricAgentName: ThermoAgent,
-    TrajAnalysisAgentName: TrajAnalysisAgent,
-    VisualizerAgentName: VisualizerAgent,
-    VASPKIT_AGENT_NAME: VASPKITAgent,
-    ConvexHullAgentName: ConvexHullAgent,
-    NMR_AGENT_NAME: NMRAgent,
-    XRD_AGENT_NAME: XRDAgent,
-    TPD_AGENT_NAME: TPDAgent,
-    Electron_Microscope_AGENT_NAME: ElectronMicroscopeAgent,
-    TOOL_AGENT_NAME: LLMToolAgent,
-    Physical_Adsorption_AGENT_NAME: PhysicalAdsorptionAgent,
-    FILE_PARSE_AGENT_NAME: FileParseAgent,
-    UniELFAgentName: UniELFAgent,
-}
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._resolved
+
+
+AGENT_CLASS_MAPPING = LazyImportMapping(
+    {
+        ABACUS_AGENT_NAME: 'ABACUS_agent.agent:ABACUSCalculatorAgent',
+        ApexAgentName: 'apex_agent.agent:ApexAgent',
+        CHEMBRAIN_AGENT_NAME: 'chembrain_agent.agent:ChemBrainAgent',
+        COMPDART_AGENT_NAME: 'CompDART_agent.agent:CompDARTAgent',
+        DOE_AGENT_NAME: 'doe_agent.agent:DoEAgent',
+        DocumentParserAgentName: 'document_parser_agent.agent:DocumentParserAgentBase',
+        DPACalulator_AGENT_NAME: 'DPACalculator_agent.agent:DPACalculationsAgent',
+        FinetuneDPAAgentName: 'finetune_dpa_agent.agent:FinetuneDPAAgent',
+        HEA_assistant_AgentName: 'HEA_assistant_agent.agent:HEA_assistant_AgentBase',
+        HEACALCULATOR_AGENT_NAME: 'HEACalculator_agent.agent:HEACalculatorAgentBase',
+        HEA_KB_AGENT_NAME: 'HEAkb_agent.agent:HEAKbAgent',
+        SSE_KB_AGENT_NAME: 'SSEkb_agent.agent:SSEKbAgent',
+        POLYMER_KB_AGENT_NAME: 'POLYMERkb_agent.agent:POLYMERKbAgent',
+        STEEL_KB_AGENT_NAME: 'STEELkb_agent.agent:STEELKbAgent',
+        STEEL_PREDICT_AGENT_NAME: 'STEEL_PREDICT_agent.agent:STEELPredictAgent',
+        LAMMPS_AGENT_NAME: 'LAMMPS_agent.agent:LAMMPSAgent',
+        OPTIMADE_DATABASE_AGENT_NAME: 'MrDice_agent.optimade_agent.agent:Optimade_AgentBase',
+        BOHRIUMPUBLIC_DATABASE_AGENT_NAME: 'MrDice_agent.bohriumpublic_agent.agent:Bohriumpublic_AgentBase',
+        MOFDB_DATABASE_AGENT_NAME: 'MrDice_agent.mofdb_agent.agent:Mofdb_AgentBase',
+        OPENLAM_DATABASE_AGENT_NAME: 'MrDice_agent.openlam_agent.agent:Openlam_AgentBase',
+        ORGANIC_REACTION_AGENT_NAME: 'organic_reaction_agent.agent:OragnicReactionAgent',
+        PerovskiteAgentName: 'perovskite_agent.agent:PerovskiteAgent',
+        PILOTEYE_ELECTRO_AGENT_NAME: 'piloteye_electro_agent.agent:PiloteyeElectroAgent',
+        SSEBRAIN_AGENT_NAME: 'ssebrain_agent.agent:SSEBrainAgent',
+        SCIENCE_NAVIGATOR_AGENT_NAME: 'ScienceNavigator_agent.agent:ScienceNavigatorAgent',
+        StructureGenerateAgentName: 'structure_generate_agent.agent:StructureGenerateAgent',
+        SuperconductorAgentName: 'superconductor_agent.agent:SuperconductorAgent',
+        TASK_ORCHESTRATOR_AGENT_NAME: 'task_orchestrator_agent.agent:TaskOrchestratorAgent',
+        ThermoelectricAgentName: 'thermoelectric_agent.agent:ThermoAgent',
+        TrajAnalysisAgentName: 'traj_analysis_agent.agent:TrajAnalysisAgent',
+        VisualizerAgentName: 'visualizer_agent.agent:VisualizerAgent',
+        VASPKIT_AGENT_NAME: 'vaspkit_agent.agent:VASPKITAgent',
+        ConvexHullAgentName: 'convexhull_agent.agent:ConvexHullAgent',
+        NMR_AGENT_NAME: 'NMR_agent.agent:NMRAgent',
+        XRD_AGENT_NAME: 'XRD_agent.agent:XRDAgent',
+        TPD_AGENT_NAME: 'TPD_agent.agent:TPDAgent',
+        Electron_Microscope_AGENT_NAME: 'Electron_Microscope_agent.agent:ElectronMicroscopeAgent',
+        TOOL_AGENT_NAME: 'built_in_agent.llm_tool_agent.agent:LLMToolAgent',
+        Physical_Adsorption_AGENT_NAME: 'Physical_adsorption_agent.agent:PhysicalAdsorptionAgent',
+        FILE_PARSE_AGENT_NAME: 'built_in_agent.file_parse_agent.agent:FileParseAgent',
+        UniELFAgentName: 'chembrain_agent.unielf_agent.agent:UniELFAgent',
+    }
+)
 
 
 class MatMasterSubAgentsEnum(str, Enum):
@@ -405,3 +256,19 @@ class MatMasterSubAgentsEnum(str, Enum):
 
 
 ALL_AGENT_TOOLS_LIST = list(ALL_TOOLS.keys())
+
+
+def warm_up_agents(agent_names: Optional[Iterable[str]] = None) -> list[str]:
+    """
+    Import the given sub-agents (and thereby build their toolsets) ahead of the
+    first request. Defaults to every registered agent; unknown names are skipped.
+    Returns the names that were loaded.
+    """
+    loaded = []
+    for agent_name in AGENT_CLASS_MAPPING if agent_names is None else agent_names:
+        if agent_name not in AGENT_CLASS_MAPPING:
+            logger.warning(f'[warm_up_agents] unknown agent {agent_name}')
+            continue
+        _ = AGENT_CLASS_MAPPING[agent_name]  # 触发 import + toolset 构建
+        loaded.append(agent_name)
+    return loaded
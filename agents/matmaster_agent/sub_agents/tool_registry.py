@@ -0,0 +1,105 @@
+"""
+Indexes over ALL_TOOLS, built once at import.
+
+The planning flow looks tools up by scene, by name (belonging agent,
+alternatives, confirmation and self-check flags) and renders the available
+tools into the plan prompt every turn; TOOL_REGISTRY answers these from
+prebuilt dicts and memoizes the per-scene-set tool lists and prompt text.
+"""
+
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from agents.matmaster_agent.flow_agents.scene_agent.model import SceneEnum
+from agents.matmaster_agent.sub_agents.tools import ALL_TOOLS
+
+
+def _scene_key(scene) -> str:
+    # state 中的场景是字符串，ALL_TOOLS 中是 SceneEnum
+    return getattr(scene, 'value', scene)
+
+
+class ToolRegistry:
+    def __init__(self, tools: dict[str, dict]):
+        self.tools = tools
+        self.names: tuple[str, ...] = tuple(tools)
+        self._order = {name: i for i, name in enumerate(self.names)}
+        self._agents = {
+            name: spec.get('belonging_agent') for name, spec in tools.items()
+        }
+        self._alternatives = {
+            name: tuple(spec.get('alternative', [])) for name, spec in tools.items()
+        }
+        self._bypass_confirmation = frozenset(
+            name
+            for name, spec in tools.items()
+            if spec.get('bypass_confirmation') is True
+        )
+        self._self_check = frozenset(
+            name for name, spec in tools.items() if spec.get('self_check', False)
+        )
+        self._need_upload_file = frozenset(
+            name
+            for name, spec in tools.items()
+            if SceneEnum.NEED_UPLOAD_FILE in spec['scene']
+        )
+        # scene -> 工具名（按 ALL_TOOLS 顺序）
+        self._by_scene: dict[str, list[str]] = {}
+        for name, spec in tools.items():
+            for scene in spec['scene']:
+                self._by_scene.setdefault(_scene_key(scene), []).append(name)
+        self._tools_for_scenes = lru_cache(maxsize=256)(self._collect_scene_tools)
+        self._tools_prompt = lru_cache(maxsize=256)(self._render_tools_prompt)
+
+    def __contains__(self, tool_name) -> bool:
+        return tool_name in self.tools
+
+    def agent_of(self, tool_name: str) -> Optional[str]:
+        return self._agents.get(tool_name)
+
+    def alternatives(self, tool_name: str) -> list[str]:
+        return list(self._alternatives.get(tool_name, ()))
+
+    def bypass_confirmation(self, tool_name: str) -> bool:
+        return tool_name in self._bypass_confirmation
+
+    def self_check(self, tool_name: str) -> bool:
+        return tool_name in self._self_check
+
+    def agents_for_tools(self, tool_names: Iterable[str]) -> list[str]:
+        """Belonging agents of ``tool_names``, deduplicated in first-use order."""
+        agents = (self._agents.get(name) for name in tool_names)
+        return list(dict.fromkeys(agent for agent in agents if agent))
+
+    def tools_for_scenes(
+        self, scenes: Iterable, upload_file: bool = True
+    ) -> tuple[str, ...]:
+        """
+        Tools tagged with any of ``scenes``, in ALL_TOOLS order; tools that need
+        an uploaded file are left out unless ``upload_file``.
+        """
+        return self._tools_for_scenes(
+            frozenset(_scene_key(scene) for scene in scenes), upload_file
+        )
+
+    def _collect_scene_tools(
+        self, scenes: frozenset[str], upload_file: bool
+    ) -> tuple[str, ...]:
+        names = {name for scene in scenes for name in self._by_scene.get(scene, ())}
+        if not upload_file:
+            names -= self._need_upload_file
+        return tuple(sorted(names, key=self._order.__getitem__))
+
+    def tools_prompt(self, tool_names: Iterable[str]) -> str:
+        """Name, scenes and description of each tool, as listed in the plan prompt."""
+        return self._tools_prompt(tuple(tool_names))
+
+    def _render_tools_prompt(self, tool_names: tuple[str, ...]) -> str:
+        return '\n'.join(
+            f"{name}\n    scene: {', '.join(self.tools[name]['scene'])}\n"
+            f"    description: {self.tools[name]['description']}"
+            for name in tool_names
+        )
+
+
+TOOL_REGISTRY = ToolRegistry(ALL_TOOLS)
@@ -1,8 +1,9 @@
 import copy
-import inspect
+import functools
 import json
 import logging
 import os
+import sys
 import traceback
 import uuid
 from typing import Iterable, Optional
@@ -16,7 +17,7 @@ from google.genai.types import Content, FunctionCall, FunctionResponse, Part
 from opik.integrations.adk import track_adk_agent_recursive
 
 from agents.matmaster_agent.base_callbacks.private_callback import _get_userId
-from agents.matmaster_agent.config import USE_PHOTON
+from agents.matmaster_agent.config import EVENT_CALLER_ATTRIBUTION, USE_PHOTON
 from agents.matmaster_agent.constant import (
     CURRENT_ENV,
     JOB_RESULT_KEY,
@@ -27,6 +28,10 @@ from agents.matmaster_agent.core_agents.base_agents.climit_agent import (
     ContentLimitLlmAgent,
 )
 from agents.matmaster_agent.flow_agents.model import PlanStepStatusEnum
+from agents.matmaster_agent.flow_agents.plan_state import (
+    loggable_state_delta,
+    with_step_fields,
+)
 from agents.matmaster_agent.flow_agents.style import separate_card
 from agents.matmaster_agent.llm_config import DEFAULT_MODEL, MatMasterLlmConfig
 from agents.matmaster_agent.locales import i18n
@@ -59,13 +64,32 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+@functools.lru_cache(maxsize=None)
+def _basename(path: str) -> str:
+    return os.path.basename(path)
+
+
+def caller_label(depth: int = 1) -> str:
+    """
+    ``filename:lineno`` of the caller ``depth`` frames above the function calling
+    this, or MATMASTER_AGENT_NAME when EVENT_CALLER_ATTRIBUTION is off.
+    """
+    if not EVENT_CALLER_ATTRIBUTION:
+        return MATMASTER_AGENT_NAME
+    # 只取一帧，不像 inspect.stack() 那样读取整条调用栈的源码上下文
+    frame = sys._getframe(depth + 1)
+    return f'{_basename(frame.f_code.co_filename)}:{frame.f_lineno}'
+
+
 def update_state_event(
-    ctx: InvocationContext, state_delta: dict, event: Optional[Event] = None
+    ctx: InvocationContext,
+    state_delta: dict,
+    event: Optional[Event] = None,
+    author: Optional[str] = None,
 ):
-    stack = inspect.stack()
-    frame = stack[1]  # stack[1] 表示调用当前函数的上一层调用
-    filename = os.path.basename(frame.filename)
-    lineno = frame.lineno
+    """author 默认为调用处的 文件名:行号（见 caller_label）"""
+    if author is None:
+        author = caller_label()
 
     origin_event_state_delta = {}
     if event and event.actions and event.actions.state_delta:
@@ -74,14 +98,20 @@ def update_state_event(
             f'[{MATMASTER_AGENT_NAME}] {ctx.session.id} origin_event_state_delta = {origin_event_state_delta}'
         )
 
-    final_state_delta = always_merger.merge(state_delta, origin_event_state_delta)
+    if origin_event_state_delta:
+        # merge 会原地修改 state_delta，而其中的 plan 与 session state 共享未改动的 step
+        final_state_delta = always_merger.merge(
+            copy.deepcopy(state_delta), origin_event_state_delta
+        )
+    else:
+        final_state_delta = state_delta
     logger.info(
-        f'[{MATMASTER_AGENT_NAME}] {ctx.session.id} {filename}:{lineno} final_state_delta = {final_state_delta}'
+        f'[{MATMASTER_AGENT_NAME}] {ctx.session.id} {author} final_state_delta = {loggable_state_delta(ctx.session.state, final_state_delta)}'
     )
     actions_with_update = EventActions(state_delta=final_state_delta)
     return Event(
         invocation_id=ctx.invocation_id,
-        author=f"{filename}:{lineno}",
+        author=author,
         actions=actions_with_update,
     )
 
@@ -345,11 +375,13 @@ async def send_error_event(err, ctx: InvocationContext, author):
         yield error_card_event
 
     # 更新 plan 为失败
-    update_plan = copy.deepcopy(ctx.session.state[PLAN])
+    update_plan = ctx.session.state[PLAN]
     if update_plan.get('steps'):
-        update_plan['steps'][ctx.session.state['plan_index']][
-            'status'
-        ] = PlanStepStatusEnum.FAILED
+        update_plan = with_step_fields(
+            update_plan,
+            ctx.session.state['plan_index'],
+            status=PlanStepStatusEnum.FAILED,
+        )
 
     yield update_state_event(
         ctx, state_delta={PLAN: update_plan, 'error_occurred': True}
@@ -474,10 +506,11 @@ def handle_tool_error(ctx, author, error_message, error_type):
     )
 
     # 更新 plan 状态为失败
-    update_plan = copy.deepcopy(ctx.session.state['plan'])
-    update_plan['steps'][ctx.session.state['plan_index']][
-        'status'
-    ] = PlanStepStatusEnum.FAILED
+    update_plan = with_step_fields(
+        ctx.session.state['plan'],
+        ctx.session.state['plan_index'],
+        status=PlanStepStatusEnum.FAILED,
+    )
     yield update_state_event(ctx, state_delta={'plan': update_plan})
 
     # 抛出相应的异常
@@ -507,12 +540,13 @@ async def display_failed_result_or_consume(
             yield event
     else:
         # 更新 plan 为成功
-        update_plan = copy.deepcopy(ctx.session.state['plan'])
         if not dict_result.get('job_id'):
             status = PlanStepStatusEnum.SUCCESS  # real-time
         else:
             status = PlanStepStatusEnum.SUBMITTED  # job-type
-        update_plan['steps'][ctx.session.state['plan_index']]['status'] = status
+        update_plan = with_step_fields(
+            ctx.session.state['plan'], ctx.session.state['plan_index'], status=status
+        )
         yield update_state_event(ctx, state_delta={'plan': update_plan})
 
         if USE_PHOTON:
@@ -1,5 +1,6 @@
 import asyncio
 import base64
+import inspect
 import logging
 import os
 import re
@@ -9,15 +10,28 @@ import time
 import zipfile
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from urllib.parse import unquote
 
 import aiofiles
 import aiohttp
 import oss2
 from oss2.credentials import EnvironmentVariableCredentialsProvider
+from oss2.models import PartInfo
 
+from agents.matmaster_agent.config import OSS_PART_SIZE, OSS_UPLOAD_PARALLEL
 from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
 from agents.matmaster_agent.logger import PrefixFilter
 
@@ -26,6 +40,28 @@ logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
 logger.setLevel(logging.INFO)
 
 
+# bytes、本地路径、file-like、bytes 迭代器 / 异步迭代器
+UploadSource = Union[
+    bytes,
+    bytearray,
+    memoryview,
+    str,
+    os.PathLike,
+    BinaryIO,
+    Iterable[bytes],
+    AsyncIterable[bytes],
+]
+
+
+@dataclass(frozen=True, slots=True)
+class OssUploadResult:
+    """Result for a streaming upload to OSS."""
+
+    oss_path: str
+    oss_url: str
+    size: int
+
+
 @dataclass(frozen=True, slots=True)
 class ReportUploadParams:
     """Parameters for uploading a markdown report to OSS."""
@@ -158,42 +194,224 @@ async def file_to_base64(file_path: Path) -> Tuple[Path, str]:
 
 
 # Step3: Upload to OSS
-async def upload_to_oss_wrapper(
-    b64_data: str,
+@lru_cache(maxsize=None)
+def _get_bucket(endpoint: str, bucket_name: str) -> oss2.Bucket:
+    auth = oss2.ProviderAuth(EnvironmentVariableCredentialsProvider())
+    return oss2.Bucket(auth, endpoint, bucket_name)
+
+
+def get_oss_bucket() -> oss2.Bucket:
+    """
+    进程内复用的 Bucket 客户端。
+
+    oss2.Bucket 内部是 requests.Session 连接池，可在多个线程间共享，
+    因此 asyncio.to_thread 发起的并发上传都复用同一个实例。
+    """
+    return _get_bucket(os.environ['OSS_ENDPOINT'], os.environ['OSS_BUCKET_NAME'])
+
+
+def oss_public_url(oss_path: str) -> str:
+    bucket_name = os.environ['OSS_BUCKET_NAME']
+    return f"https://{bucket_name}.oss-cn-zhangjiakou.aliyuncs.com/{oss_path}"
+
+
+def _download_headers(filename: str) -> Dict[str, str]:
+    return {
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Content-Type': 'text/markdown',
+    }
+
+
+async def _iter_chunks(source: UploadSource, chunk_size: int) -> AsyncIterator[bytes]:
+    """把各种输入统一成异步的 bytes 块；str / PathLike 视为本地文件路径"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start : start + chunk_size])
+    elif isinstance(source, (str, os.PathLike)):
+        f = await asyncio.to_thread(open, source, 'rb')
+        try:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                yield chunk
+        finally:
+            f.close()
+    elif inspect.iscoroutinefunction(getattr(source, 'read', None)):
+        # aiohttp StreamReader / aiofiles 文件：read 本身是协程
+        while chunk := await source.read(chunk_size):
+            yield bytes(chunk)
+    elif hasattr(source, 'read'):
+        while chunk := await asyncio.to_thread(source.read, chunk_size):
+            yield chunk
+    elif hasattr(source, '__aiter__'):
+        async for chunk in source:
+            if chunk:
+                yield bytes(chunk)
+    else:
+        for chunk in source:
+            if chunk:
+                yield bytes(chunk)
+
+
+async def _iter_parts(source: UploadSource, part_size: int) -> AsyncIterator[bytes]:
+    """按 part_size 切分（最后一块可以更短），整块输入不做额外拷贝"""
+    buffer = bytearray()
+    async for chunk in _iter_chunks(source, part_size):
+        if not buffer and len(chunk) == part_size:
+            yield chunk
+            continue
+        buffer += chunk
+        while len(buffer) >= part_size:
+            yield bytes(buffer[:part_size])
+            del buffer[:part_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _multipart_upload(
+    bucket: oss2.Bucket,
     oss_path: str,
-    filename: str,
-    *,
-    with_download_headers: bool = False,
-) -> Dict[str, dict]:
-    def _sync_upload_base64_to_oss(data: str, oss_path: str) -> str:
+    parts: AsyncIterator[bytes],
+    headers: Optional[Dict[str, str]],
+    parallel: int,
+) -> int:
+    init = await asyncio.to_thread(
+        bucket.init_multipart_upload, oss_path, headers=headers
+    )
+    upload_id = init.upload_id
+    # 信号量在读取下一块之前获取，内存中最多同时存在 parallel 个分片
+    slots = asyncio.Semaphore(parallel)
+
+    async def upload_part(part_number: int, data: bytes) -> PartInfo:
+        upload = asyncio.ensure_future(
+            asyncio.to_thread(
+                bucket.upload_part, oss_path, upload_id, part_number, data
+            )
+        )
+        try:
+            result = await asyncio.shield(upload)
+        except asyncio.CancelledError:
+            # 线程无法中断：等它结束，保证 abort 时没有仍在上传的分片
+            await asyncio.wait([upload])
+            raise
+        finally:
+            slots.release()
+        return PartInfo(part_number, result.etag, size=len(data))
+
+    failures: List[BaseException] = []
+
+    def part_done(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            failures.append(task.exception())
+
+    tasks: List[asyncio.Task] = []
+    size = 0
+    try:
+        part_number = 0
+        while True:
+            await slots.acquire()
+            # 已有分片失败时不再读取后续分片
+            if failures:
+                slots.release()
+                raise failures[0]
+            try:
+                data = await anext(parts)
+            except StopAsyncIteration:
+                slots.release()
+                break
+            part_number += 1
+            size += len(data)
+            task = asyncio.create_task(upload_part(part_number, data))
+            task.add_done_callback(part_done)
+            tasks.append(task)
+        part_infos = await asyncio.gather(*tasks)
+        await asyncio.to_thread(
+            bucket.complete_multipart_upload, oss_path, upload_id, list(part_infos)
+        )
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
         try:
-            auth = oss2.ProviderAuth(EnvironmentVariableCredentialsProvider())
-            endpoint = os.environ['OSS_ENDPOINT']
-            bucket_name = os.environ['OSS_BUCKET_NAME']
-            bucket = oss2.Bucket(auth, endpoint, bucket_name)
-            headers = None
-            if with_download_headers:
-                headers = {
-                    'Content-Disposition': f'attachment; filename="{filename}"',
-                    'Content-Type': 'text/markdown',
-                }
-            bucket.put_object(oss_path, base64.b64decode(data), headers=headers)
-            return f"https://{bucket_name}.oss-cn-zhangjiakou.aliyuncs.com/{oss_path}"
+            await asyncio.to_thread(bucket.abort_multipart_upload, oss_path, upload_id)
         except Exception as e:
-            return str(e)
+            logger.warning(f"abort multipart upload {oss_path} failed: {e}")
+        raise
+    return size
 
-    async def upload_base64_to_oss(data: str, oss_path: str) -> dict:
-        return await asyncio.to_thread(_sync_upload_base64_to_oss, data, oss_path)
 
-    """上传包装器，保留原始文件名信息"""
-    result = await upload_base64_to_oss(b64_data, oss_path)
+async def upload_stream_to_oss(
+    source: UploadSource,
+    oss_path: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    part_size: int = OSS_PART_SIZE,
+    parallel: int = OSS_UPLOAD_PARALLEL,
+) -> OssUploadResult:
+    """
+    流式上传到 OSS，失败时抛出异常。
+
+    source 可以是 bytes、本地文件路径、file-like 对象（read 可以是协程，如 aiohttp
+    StreamReader、aiofiles 文件）、bytes 迭代器或异步迭代器。
+    不超过一个分片的对象直接 put_object，更大的对象走分片上传，
+    最多 ``parallel`` 个分片同时上传，峰值内存约为 parallel * part_size。
+    """
+    bucket = get_oss_bucket()
+
+    if isinstance(source, bytes) and len(source) <= part_size:
+        await asyncio.to_thread(bucket.put_object, oss_path, source, headers=headers)
+        return OssUploadResult(oss_path, oss_public_url(oss_path), len(source))
+
+    parts = _iter_parts(source, part_size)
+    first = await anext(parts, b'')
+    second = await anext(parts, None)
+    if second is None:
+        await asyncio.to_thread(bucket.put_object, oss_path, first, headers=headers)
+        return OssUploadResult(oss_path, oss_public_url(oss_path), len(first))
+
+    async def all_parts() -> AsyncIterator[bytes]:
+        yield first
+        yield second
+        async for part in parts:
+            yield part
 
-    return {filename: result}
+    size = await _multipart_upload(bucket, oss_path, all_parts(), headers, parallel)
+    return OssUploadResult(oss_path, oss_public_url(oss_path), size)
+
+
+async def upload_to_oss(
+    source: UploadSource,
+    oss_path: str,
+    filename: str,
+    *,
+    with_download_headers: bool = False,
+) -> Dict[str, str]:
+    """上传并返回 {filename: url}；失败时 value 为错误信息"""
+    headers = _download_headers(filename) if with_download_headers else None
+    try:
+        result = await upload_stream_to_oss(source, oss_path, headers=headers)
+        return {filename: result.oss_url}
+    except Exception as e:
+        return {filename: str(e)}
+
+
+async def upload_to_oss_wrapper(
+    b64_data: str,
+    oss_path: str,
+    filename: str,
+    *,
+    with_download_headers: bool = False,
+) -> Dict[str, str]:
+    """上传包装器，保留原始文件名信息（兼容 Base64 输入）"""
+    return await upload_to_oss(
+        base64.b64decode(b64_data),
+        oss_path,
+        filename,
+        with_download_headers=with_download_headers,
+    )
 
 
 async def upload_report_md_to_oss(
     params: ReportUploadParams,
-    temp_dir_path: str = './tmp',
 ) -> Optional[ReportUploadResult]:
     """Upload markdown report content to OSS and return its URL."""
 
@@ -201,44 +419,37 @@ async def upload_report_md_to_oss(
     if not report_markdown:
         return None
 
-    async with temp_dir(temp_dir_path) as tdir:
-        filename = f'matmaster_report_{params.invocation_id}.md'
-        md_file_path = tdir / filename
-        md_file_path.write_text(report_markdown, encoding='utf-8')
-
-        _, b64_data = await file_to_base64(md_file_path)
-        oss_path = f"agent/{int(time.time())}_{filename}"
-        oss_result = await upload_to_oss_wrapper(
-            b64_data, oss_path, filename, with_download_headers=True
-        )
-        oss_url = list(oss_result.values())[0]
-        return ReportUploadResult(
-            oss_url=oss_url,
-            oss_path=oss_path,
-            filename=filename,
-        )
+    filename = f'matmaster_report_{params.invocation_id}.md'
+    oss_path = f"agent/{int(time.time())}_{filename}"
+    oss_result = await upload_to_oss(
+        report_markdown.encode('utf-8'),
+        oss_path,
+        filename,
+        with_download_headers=True,
+    )
+    return ReportUploadResult(
+        oss_url=oss_result[filename],
+        oss_path=oss_path,
+        filename=filename,
+    )
 
 
 async def extract_convert_and_upload(
     compressed_url: str, temp_dir_path: str = './tmp', session_id: str = ''
 ) -> dict:
     """
-    下载 TGZ → 解压 → JPG 转 Base64 → 上传 OSS → 自动清理
+    下载 TGZ → 解压 → 文件直接流式上传 OSS → 自动清理
     """
     async with temp_dir(temp_dir_path) as temp_path:
-        # 获取所有JPG文件的Base64编码
         logger.info(f"{session_id} compressed_url = {compressed_url}")
         files = await extract_files_from_compressed_file_url(compressed_url, temp_path)
-        conversion_tasks = [file_to_base64(file) for file in files]
-        base64_results = await asyncio.gather(*conversion_tasks)
-
-        # 准备上传任务
-        upload_tasks = []
-        for file_path, b64_data in base64_results:
-            filename = file_path.name
-            oss_path = f"agent/{int(time.time())}_{filename}"
-            upload_tasks.append(upload_to_oss_wrapper(b64_data, oss_path, filename))
 
+        upload_tasks = [
+            upload_to_oss(
+                file_path, f"agent/{int(time.time())}_{file_path.name}", file_path.name
+            )
+            for file_path in files
+        ]
         return {
             filename: result
             for item in await asyncio.gather(*upload_tasks)
@@ -0,0 +1,234 @@
+"""
+Offline language detection for user prompts.
+
+Script statistics decide CJK / Cyrillic / Arabic input directly; Latin-script
+input is told apart with a small stop-word (unigram) model. Identifiers such as
+chemical formulas (TiO2), tool names (optimize_structure) and URLs carry no
+language signal and are dropped first. ``detect_language`` returns None when
+the text is too mixed or too short to decide, leaving the caller to fall back
+to an LLM.
+
+Returned names follow the options of ``prompt.get_user_content_lang``.
+"""
+
+import re
+from typing import Optional
+
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_HAN_RE = re.compile(r'[㐀-䶿一-鿿豈-﫿]')
+_KANA_RE = re.compile(r'[぀-ヿ]')
+_HANGUL_RE = re.compile(r'[가-힯ᄀ-ᇿ]')
+_CYRILLIC_RE = re.compile(r'[Ѐ-ӿ]')
+_ARABIC_RE = re.compile(r'[؀-ۿ]')
+# 纯字母单词；含数字/下划线的 token（化学式、工具名、参数）不计入
+_LATIN_WORD_RE = re.compile(r'(?<![\w])[A-Za-zÀ-ÿ]+(?![\w])')
+
+# 汉字占比（汉字 / (汉字 + 拉丁单词)）判定阈值，介于两者之间视为混合输入
+_ZH_RATIO = 0.5
+_LATIN_RATIO = 0.15
+_MIN_SCRIPT_CHARS = 2
+
+_STOP_WORDS = {
+    'English': {
+        'the',
+        'a',
+        'an',
+        'of',
+        'and',
+        'to',
+        'in',
+        'for',
+        'with',
+        'is',
+        'are',
+        'please',
+        'me',
+        'my',
+        'this',
+        'that',
+        'calculate',
+        'structure',
+        'find',
+        'what',
+        'how',
+        'can',
+        'you',
+        'build',
+        'from',
+        'on',
+        'by',
+        'using',
+        'use',
+        'help',
+        'i',
+        'it',
+        'be',
+        'at',
+        'as',
+        'which',
+        'energy',
+        'search',
+    },
+    'Spanish': {
+        'el',
+        'la',
+        'los',
+        'las',
+        'de',
+        'del',
+        'y',
+        'en',
+        'un',
+        'una',
+        'por',
+        'para',
+        'con',
+        'que',
+        'es',
+        'calcular',
+        'estructura',
+    },
+    'French': {
+        'le',
+        'la',
+        'les',
+        'de',
+        'des',
+        'du',
+        'et',
+        'en',
+        'un',
+        'une',
+        'pour',
+        'avec',
+        'est',
+        'que',
+        'calculer',
+        'structure',
+        'sur',
+        'dans',
+    },
+    'German': {
+        'der',
+        'die',
+        'das',
+        'und',
+        'ist',
+        'ein',
+        'eine',
+        'mit',
+        'von',
+        'zu',
+        'für',
+        'bitte',
+        'berechne',
+        'struktur',
+        'den',
+        'dem',
+        'nicht',
+    },
+    'Portuguese': {
+        'o',
+        'os',
+        'as',
+        'de',
+        'do',
+        'da',
+        'e',
+        'em',
+        'um',
+        'uma',
+        'para',
+        'com',
+        'que',
+        'calcular',
+        'estrutura',
+        'por',
+        'favor',
+    },
+    'Italian': {
+        'il',
+        'lo',
+        'la',
+        'gli',
+        'le',
+        'di',
+        'del',
+        'e',
+        'in',
+        'un',
+        'una',
+        'per',
+        'con',
+        'che',
+        'calcolare',
+        'struttura',
+    },
+    'Dutch': {
+        'de',
+        'het',
+        'een',
+        'en',
+        'van',
+        'in',
+        'is',
+        'met',
+        'voor',
+        'op',
+        'bereken',
+        'structuur',
+        'alstublieft',
+    },
+}
+
+
+def _latin_language(words: list[str]) -> Optional[str]:
+    """Pick the Latin-script language whose stop words cover ``words`` best."""
+    lowered = [w.lower() for w in words]
+    scores = {
+        lang: sum(1 for w in lowered if w in stop_words)
+        for lang, stop_words in _STOP_WORDS.items()
+    }
+    top, second = sorted(scores.values(), reverse=True)[:2]
+    # 只有专有名词/缩写（如 "DPA MACE"）时，材料领域默认英文；并列时英文优先
+    if top == 0 or scores['English'] == top:
+        return 'English'
+    if top == second:
+        return None
+    return max(scores, key=scores.get)
+
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Detect the primary language of ``text``.
+
+    Returns a language name ('Chinese', 'English', 'Japanese', ...) or None
+    when the input is ambiguous (mixed scripts, no letters at all).
+    """
+    text = _URL_RE.sub(' ', text or '')
+
+    kana = len(_KANA_RE.findall(text))
+    hangul = len(_HANGUL_RE.findall(text))
+    cyrillic = len(_CYRILLIC_RE.findall(text))
+    arabic = len(_ARABIC_RE.findall(text))
+    han = len(_HAN_RE.findall(text))
+    latin_words = _LATIN_WORD_RE.findall(text)
+
+    if kana >= _MIN_SCRIPT_CHARS:
+        return 'Japanese'
+    if hangul >= _MIN_SCRIPT_CHARS:
+        return 'Korean'
+    if cyrillic >= _MIN_SCRIPT_CHARS and cyrillic > han:
+        return 'Russian'
+    if arabic >= _MIN_SCRIPT_CHARS and arabic > han:
+        return 'Arabic'
+
+    if not han and not latin_words:
+        return None
+
+    han_ratio = han / (han + len(latin_words))
+    if han >= _MIN_SCRIPT_CHARS and han_ratio >= _ZH_RATIO:
+        return 'Chinese'
+    if han_ratio <= _LATIN_RATIO:
+        return _latin_language(latin_words)
+    return None
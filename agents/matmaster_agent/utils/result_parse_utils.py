@@ -1,7 +1,7 @@
 import csv
 import io
 import logging
-from typing import List, Union
+from typing import List, Optional, Union
 
 import aiohttp
 from pydantic import BaseModel
@@ -16,7 +16,10 @@ from agents.matmaster_agent.model import (
     RenderTypeEnum,
     WebSearchItem,
 )
-from agents.matmaster_agent.services.session_files import insert_session_files
+from agents.matmaster_agent.services.session_files import (
+    SessionFileBatch,
+    register_session_files,
+)
 
 logger = logging.getLogger(__name__)
 logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
@@ -124,7 +127,7 @@ def validate_model_list(data: list, model: type[BaseModel]) -> bool:
 
 
 async def parse_result(
-    ctx, result: dict
+    ctx, result: dict, file_batch: Optional[SessionFileBatch] = None
 ) -> List[Union[dict, WebSearchItem, JobResult]]:
     """
     Parse and flatten a nested dictionary result into a list of standardized JobResult objects.
@@ -139,6 +142,9 @@ async def parse_result(
                       - Primitive values (int, float, str)
                       - Sequences (of numbers or strings)
                       - URLs (regular files or MatModeler files)
+        file_batch (SessionFileBatch, optional): Collects the file URLs instead of
+                      registering them, so that several results share one request.
+                      Without it they are registered with one request before returning.
 
     Returns:
         list: Serialized JobResult objects with appropriate types:
@@ -158,6 +164,7 @@ async def parse_result(
         >>> ]
     """
     parsed_result = []
+    file_urls = []
     new_result = {}
     for k, v in result.items():
         if type(v) is dict:
@@ -180,8 +187,8 @@ async def parse_result(
                     ).model_dump(mode='json')
                 )
             elif v.startswith('http'):
-                # 写入数据库
-                await insert_session_files(session_id=ctx.session.id, files=[v])
+                # 写入数据库（收集后一次写入）
+                file_urls.append(v)
 
                 # 按文件类型解析
                 filename = v.split('/')[-1]
@@ -255,6 +262,11 @@ async def parse_result(
                     'msg': f"{k}({type(v)}) is not supported parse, v={v}",
                 }
             )
+
+    if file_batch is not None:
+        file_batch.add(file_urls)
+    elif file_urls:
+        await register_session_files(ctx.session.id, file_urls)
     return parsed_result
 
 
@@ -0,0 +1,83 @@
+"""
+Content-addressed cache of dynamically created pydantic models.
+
+Building a model with create_model() and generating its JSON schema takes
+milliseconds, and every class created stays referenced by pydantic. The
+plan and tool-argument schemas only depend on their spec (tool set, argument
+declarations), so they are built once per digest of the canonical JSON of
+that spec and kept in an LRU of SCHEMA_CACHE_SIZE entries. Models built on
+CachedSchemaModel compute model_json_schema() once per class.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar
+
+from pydantic import BaseModel
+
+from agents.matmaster_agent.config import SCHEMA_CACHE_SIZE
+from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
+from agents.matmaster_agent.logger import PrefixFilter
+
+logger = logging.getLogger(__name__)
+logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
+logger.setLevel(logging.INFO)
+
+T = TypeVar('T')
+
+_json_schemas: 'weakref.WeakKeyDictionary[type, dict]' = weakref.WeakKeyDictionary()
+_models: OrderedDict[str, Any] = OrderedDict()
+_stats = {'hits': 0, 'misses': 0}
+
+
+class CachedSchemaModel(BaseModel):
+    """BaseModel whose JSON schema is generated once per class and arguments."""
+
+    @classmethod
+    def model_json_schema(cls, *args, **kwargs) -> dict[str, Any]:
+        schemas = _json_schemas.setdefault(cls, {})
+        key = (args, tuple(sorted(kwargs.items())))
+        if key not in schemas:
+            schemas[key] = super().model_json_schema(*args, **kwargs)
+        # 调用方（如 genai 的 schema 转换）会原地修改返回值
+        return copy.deepcopy(schemas[key])
+
+
+def spec_digest(spec: Any) -> str:
+    canonical = json.dumps(spec, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def cached_models(spec: Any, build: Callable[[], T]) -> T:
+    """
+    ``build()`` once per distinct ``spec`` (any JSON-serializable description of
+    what the models depend on); the JSON schemas of the returned model(s) are
+    generated right away so later calls only copy them.
+    """
+    digest = spec_digest(spec)
+    if digest in _models:
+        _stats['hits'] += 1
+        _models.move_to_end(digest)
+        return _models[digest]
+
+    _stats['misses'] += 1
+    models = build()
+    for model in models if isinstance(models, tuple) else (models,):
+        model.model_json_schema()
+    _models[digest] = models
+    while len(_models) > SCHEMA_CACHE_SIZE:
+        _models.popitem(last=False)
+    return models
+
+
+def schema_cache_stats() -> dict[str, int]:
+    return {**_stats, 'size': len(_models)}
+
+
+def clear_schema_cache() -> None:
+    _models.clear()
+    _json_schemas.clear()
@@ -0,0 +1,118 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Hashable, List, Optional, Tuple
+
+import tiktoken
+from google.genai.types import Content
+
+# 每个会话（及 agent）一份历史 token 前缀和，LRU 淘汰
+_HISTORY_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=1)
+def get_encoding() -> tiktoken.Encoding:
+    return tiktoken.encoding_for_model('gpt-4')
+
+
+def count_text_tokens(text: str) -> int:
+    return len(get_encoding().encode(text))
+
+
+def count_content_tokens(content: Content) -> int:
+    current_tokens = 0
+    for part in content.parts or []:
+        if part.text:
+            current_tokens += count_text_tokens(part.text)
+        elif part.function_call:
+            current_tokens += count_text_tokens(str(part.function_call.args))
+        elif part.function_response:
+            current_tokens += count_text_tokens(str(part.function_response.response))
+    return current_tokens
+
+
+def _frozen(value: Any) -> Hashable:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return tuple((key, _frozen(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(item) for item in value)
+    return str(value)
+
+
+def content_fingerprint(content: Content) -> int:
+    """
+    Identity of ``content`` for the prefix cache. Strings are hashed as they
+    are: Python caches a str's hash and ADK's deep copies keep the str
+    objects, so a content seen before costs a walk over its structure, not
+    over its text.
+    """
+    keys = []
+    for part in content.parts or []:
+        if part.text:
+            keys.append(part.text)
+        elif part.function_call:
+            call = part.function_call
+            keys.append(('call', call.name, _frozen(call.args)))
+        elif part.function_response:
+            response = part.function_response
+            keys.append(('response', response.name, _frozen(response.response)))
+        else:
+            keys.append(None)
+    return hash((content.role, tuple(keys)))
+
+
+class HistoryTokens:
+    """
+    Token counts of one conversation history as prefix sums: ``prefix[i]`` is
+    the token count of the first ``i`` contents. update() keeps the prefix
+    shared with the previous history and only encodes the contents after it.
+    """
+
+    def __init__(self):
+        self.fingerprints: List[int] = []
+        self.prefix: List[int] = [0]
+
+    def update(self, contents: List[Content]) -> None:
+        fingerprints = [content_fingerprint(content) for content in contents]
+        common = 0
+        for old, new in zip(self.fingerprints, fingerprints):
+            if old != new:
+                break
+            common += 1
+        del self.prefix[common + 1 :]
+        for content in contents[common:]:
+            self.prefix.append(self.prefix[-1] + count_content_tokens(content))
+        self.fingerprints = fingerprints
+
+    def latest_within(self, max_tokens: int) -> Tuple[int, int]:
+        # 最早的 i 使 prefix[-1] - prefix[i] < max_tokens，即最新内容从后往前累加到溢出前为止
+        total = self.prefix[-1]
+        start = min(bisect_right(self.prefix, total - max_tokens), len(self.prefix) - 1)
+        return len(self.prefix) - 1 - start, total - self.prefix[start]
+
+
+_histories: OrderedDict[Hashable, HistoryTokens] = OrderedDict()
+
+
+def latest_contents_within_limit(
+    contents: List[Content], max_tokens: int, history_key: Optional[Hashable] = None
+) -> Tuple[int, int]:
+    """
+    Return ``(count, tokens)``: how many of the most recent ``contents`` fit
+    strictly below ``max_tokens`` and their token sum.
+
+    With ``history_key`` (e.g. session and agent) the history's prefix sums are
+    kept between calls, so each call only encodes the contents appended since
+    the last one and finds the cut-off by bisection.
+    """
+    if history_key is None:
+        history = HistoryTokens()
+    else:
+        history = _histories.pop(history_key, None) or HistoryTokens()
+        _histories[history_key] = history
+        if len(_histories) > _HISTORY_CACHE_SIZE:
+            _histories.popitem(last=False)
+    history.update(contents)
+    return history.latest_within(max_tokens)
@@ -0,0 +1,117 @@
+"""
+Function declarations of an agent's tools, without an LLM round trip.
+
+Toolsets are resolved the way LlmAgent.canonical_tools does it (MCP toolsets
+call list_tools), and their declarations are cached per toolset for
+TOOL_DECLARATIONS_TTL seconds. invalidate_function_declarations() bumps the
+cache version, e.g. after a tool server is redeployed.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools import BaseTool, FunctionTool
+from google.adk.tools.base_toolset import BaseToolset
+
+from agents.matmaster_agent.config import TOOL_DECLARATIONS_TTL
+from agents.matmaster_agent.constant import MATMASTER_AGENT_NAME
+from agents.matmaster_agent.logger import PrefixFilter
+
+logger = logging.getLogger(__name__)
+logger.addFilter(PrefixFilter(MATMASTER_AGENT_NAME))
+logger.setLevel(logging.INFO)
+
+
+@dataclass(slots=True)
+class _CachedDeclarations:
+    declarations: list[dict]
+    version: int
+    expires_at: float
+
+
+_cache: 'weakref.WeakKeyDictionary[BaseToolset, _CachedDeclarations]' = (
+    weakref.WeakKeyDictionary()
+)
+_locks: 'weakref.WeakKeyDictionary[BaseToolset, asyncio.Lock]' = (
+    weakref.WeakKeyDictionary()
+)
+_version = 0
+
+
+def invalidate_function_declarations(toolset: Optional[BaseToolset] = None) -> None:
+    """Drop the cached declarations of ``toolset``, or of every toolset."""
+    global _version
+    if toolset is None:
+        _version += 1
+    else:
+        _cache.pop(toolset, None)
+
+
+def _fresh(entry: Optional[_CachedDeclarations]) -> bool:
+    return (
+        entry is not None
+        and entry.version == _version
+        and entry.expires_at > time.monotonic()
+    )
+
+
+async def _toolset_declarations(
+    toolset: BaseToolset, ctx: Optional[ReadonlyContext]
+) -> list[dict]:
+    entry = _cache.get(toolset)
+    if _fresh(entry):
+        return entry.declarations
+
+    # 同一 toolset 并发请求只 list_tools 一次
+    lock = _locks.setdefault(toolset, asyncio.Lock())
+    async with lock:
+        entry = _cache.get(toolset)
+        if _fresh(entry):
+            return entry.declarations
+
+        version = _version
+        tools = await toolset.get_tools_with_prefix(ctx)
+        declarations = [
+            declaration.to_json_dict()
+            for tool in tools
+            if (declaration := tool._get_declaration())
+        ]
+        _cache[toolset] = _CachedDeclarations(
+            declarations, version, time.monotonic() + TOOL_DECLARATIONS_TTL
+        )
+        logger.info(
+            f'{type(toolset).__name__} declarations refreshed, count = {len(declarations)}'
+        )
+        return declarations
+
+
+async def get_function_declarations(
+    tools: list, ctx: Optional[ReadonlyContext] = None
+) -> list[dict]:
+    """
+    JSON function declarations of ``tools`` (functions, BaseTools, toolsets),
+    in the same order an LlmRequest would list them.
+
+    Returns a deep copy, callers may modify it freely.
+    """
+    declarations: list[dict] = []
+    for tool_union in tools:
+        if isinstance(tool_union, BaseToolset):
+            declarations.extend(await _toolset_declarations(tool_union, ctx))
+            continue
+
+        tool = (
+            tool_union
+            if isinstance(tool_union, BaseTool)
+            else FunctionTool(func=tool_union)
+        )
+        if declaration := tool._get_declaration():
+            declarations.append(declaration.to_json_dict())
+
+    return copy.deepcopy(declarations)
@@ -0,0 +1,140 @@
+"""
+Cost of the dynamic pydantic schemas of one planning turn, cold and warm.
+
+A turn builds the multi-plans schema for the scene's tool list and the
+tool-argument schemas of --steps plan steps, and generates the JSON schema of
+each (what the LLM request does with output_schema). "cold" clears the
+schema cache before every turn, i.e. the former behavior of creating every
+model anew; "warm" repeats turns whose tool sets were seen before.
+
+Usage (from project root):
+    uv run python scripts/benchmark_dynamic_schemas.py --turns 50 --steps 3
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.core_agents.comp_agents.recommend_summary_agent.recommend_params_agent.schema import (  # noqa: E402
+    create_tool_args_schema,
+)
+from agents.matmaster_agent.flow_agents.plan_make_agent.schema import (  # noqa: E402
+    create_dynamic_multi_plans_schema,
+)
+from agents.matmaster_agent.sub_agents.tool_registry import (  # noqa: E402
+    TOOL_REGISTRY,
+)
+from agents.matmaster_agent.utils.schema_cache import (  # noqa: E402
+    clear_schema_cache,
+    schema_cache_stats,
+)
+
+
+def _declaration(tool_index: int) -> list[dict]:
+    """A function declaration shaped like the MCP tools' (enums, arrays, nested objects)."""
+    return [
+        {
+            'parameters': {
+                'type': 'OBJECT',
+                'title': f'tool_{tool_index}Arguments',
+                'required': ['structure_path'],
+                'properties': {
+                    'structure_path': {'title': 'Structure Path', 'type': 'STRING'},
+                    'method': {
+                        'title': 'Method',
+                        'type': 'STRING',
+                        'enum': ['PBE', 'PBEsol', 'SCAN', f'custom_{tool_index}'],
+                    },
+                    'kpoints': {
+                        'title': 'Kpoints',
+                        'type': 'ARRAY',
+                        'items': {'type': 'INTEGER'},
+                    },
+                    'fmax': {'title': 'Fmax', 'type': 'NUMBER'},
+                    'dftu_param': {
+                        'title': 'DFTUParam',
+                        'type': 'OBJECT',
+                        'description': 'Definition of DFT+U params',
+                        'properties': {
+                            'element': {
+                                'title': 'Element',
+                                'type': 'ARRAY',
+                                'items': {'type': 'STRING'},
+                            },
+                            'U_value': {
+                                'title': 'U Value',
+                                'type': 'ARRAY',
+                                'items': {'type': 'NUMBER'},
+                            },
+                        },
+                    },
+                },
+            }
+        }
+    ]
+
+
+def _turn(tools: tuple, steps: list[int]) -> None:
+    create_dynamic_multi_plans_schema(list(tools)).model_json_schema()
+    for tool_index in steps:
+        declaration = _declaration(tool_index)
+        required = declaration[0]['parameters']['required']
+        _, tool_schema = create_tool_args_schema(required, declaration)
+        tool_schema.model_json_schema()
+        args_schema, _ = create_tool_args_schema(
+            ['method', 'kpoints', 'dftu_param'], declaration
+        )
+        args_schema.model_json_schema()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--turns', type=int, default=50)
+    parser.add_argument('--steps', type=int, default=3)
+    parser.add_argument('--workloads', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    scenes = sorted(
+        {str(s) for spec in TOOL_REGISTRY.tools.values() for s in spec['scene']}
+    )
+    workloads = []
+    for _ in range(args.workloads):
+        tools = TOOL_REGISTRY.tools_for_scenes(rng.sample(scenes, 3) + ['universal'])
+        workloads.append((tools, [rng.randrange(20) for _ in range(args.steps)]))
+
+    def run(cold: bool) -> float:
+        t0 = time.perf_counter()
+        for i in range(args.turns):
+            if cold:
+                clear_schema_cache()
+            _turn(*workloads[i % len(workloads)])
+        return (time.perf_counter() - t0) / args.turns * 1000
+
+    # 未命中时 get_field_type 会逐字段打日志
+    logging.disable(logging.INFO)
+    cold = run(cold=True)
+    clear_schema_cache()
+    for workload in workloads:
+        _turn(*workload)
+    warm = run(cold=False)
+
+    stats = schema_cache_stats()
+    print(f'turn = plan schema + {args.steps} steps x 2 tool-args schemas')
+    print(f'cold (no cache): {cold:8.2f} ms / turn')
+    print(f'warm           : {warm:8.2f} ms / turn  (x{cold / warm:.0f})')
+    print(
+        f'cache entries={stats["size"]} hits={stats["hits"]} misses={stats["misses"]}'
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
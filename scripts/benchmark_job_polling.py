@@ -0,0 +1,100 @@
+"""
+Latency of one ResultMCPAgent polling round over many long-running jobs.
+
+Compares the former one-job-at-a-time walk (status, then result preparation,
+job after job) with ResultMCPAgent._poll_jobs. The Bohrium job API, result
+preparation and parse_result are replaced, inside the agent module only, by
+coroutines that sleep --latency seconds, so the numbers show the scheduling
+difference rather than network noise. Every --finished-every'th job is
+finished, the rest are still running.
+
+Usage (from project root):
+    uv run python scripts/benchmark_job_polling.py --jobs 20
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.core_agents.public_agents.job_agents.result_core_agent import (  # noqa: E402
+    agent as result_agent,
+)
+
+
+def _install_fakes(latency: float, finished_every: int) -> None:
+    async def get_job_detail(job_id, access_key):
+        await asyncio.sleep(latency)
+        return {'data': {'status': 2 if int(job_id) % finished_every == 0 else 1}}
+
+    async def parse_and_prepare_results(job_id, access_key):
+        await asyncio.sleep(latency * 3)
+        return {'energy': -float(job_id)}
+
+    async def parse_result(ctx, result, file_batch=None):
+        await asyncio.sleep(latency)
+        return [{'name': k, 'data': v, 'type': 'Value'} for k, v in result.items()]
+
+    result_agent.get_job_detail = get_job_detail
+    result_agent.parse_and_prepare_results = parse_and_prepare_results
+    result_agent.parse_result = parse_result
+
+
+async def legacy_round(jobs: list[tuple[str, str]]) -> dict:
+    results = {}
+    for origin_job_id, job_id in jobs:
+        query_res = await result_agent.get_job_detail(job_id=job_id, access_key='k')
+        status = result_agent.mapping_status(query_res['data']['status'])
+        if status != 'Running':
+            dict_result = await result_agent.parse_and_prepare_results(
+                job_id=job_id, access_key='k'
+            )
+            results[origin_job_id] = await result_agent.parse_result(None, dict_result)
+    return results
+
+
+async def _run(n_jobs: int, latency: float, finished_every: int) -> int:
+    _install_fakes(latency, finished_every)
+    agent = result_agent.ResultMCPAgent(
+        name='bench_result_core_agent', model='openai/bench', enable_tgz_unpack=False
+    )
+    ctx = SimpleNamespace(session=SimpleNamespace(id='bench'))
+    jobs = [(f'origin_{i}', str(i)) for i in range(n_jobs)]
+
+    t0 = time.perf_counter()
+    expected = await legacy_round(jobs)
+    legacy = time.perf_counter() - t0
+
+    results, first_event = {}, None
+    t0 = time.perf_counter()
+    async for update in agent._poll_jobs(ctx, jobs, 'k'):
+        first_event = first_event or time.perf_counter() - t0
+        if update.job_result is not None:
+            results[update.origin_job_id] = update.job_result
+    concurrent = time.perf_counter() - t0
+
+    identical = results == expected
+    print(f'jobs={n_jobs} finished={len(expected)}')
+    print(f'sequential round : {legacy:6.2f} s')
+    print(f'concurrent round : {concurrent:6.2f} s (first event {first_event:.2f} s)')
+    print(f'results identical: {identical}')
+    return 0 if identical else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--jobs', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--finished-every', type=int, default=3)
+    args = parser.parse_args()
+    return asyncio.run(_run(args.jobs, args.latency, args.finished_every))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Benchmark for the periodic neighbor search used by the APEX surface check
+(sub_agents/apex_agent/neighbor_list.py).
+
+Builds synthetic fcc Cu(100) slabs (vacuum along z, CO molecules on top) of
+1k-50k atoms and times analyze_surface_structure end to end. For small slabs
+it also times the previous pure-Python O(N^2) component search and, with
+--check, compares components against a brute-force minimum-image search.
+
+Usage (from project root):
+    uv run python scripts/benchmark_neighbor_list.py
+    uv run python scripts/benchmark_neighbor_list.py --atoms 1000 5000 --check
+"""
+
+import argparse
+import sys
+import time
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.sub_agents.apex_agent.neighbor_list import (  # noqa: E402
+    pair_cutoffs,
+)
+from agents.matmaster_agent.sub_agents.apex_agent.structure_analyzer import (  # noqa: E402
+    _atomic_radii,
+    _build_neighbor_list,
+    analyze_surface_structure,
+)
+
+_A = 3.61  # Cu 晶格常数
+_LAYERS = 6
+_VACUUM = 15.0
+
+
+def make_slab(n_atoms: int, n_adsorbates: int = 4) -> dict:
+    n_xy = max(1, round((n_atoms / (4 * _LAYERS)) ** 0.5))
+    basis = np.array([[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5], [0, 0.5, 0.5]])
+    cells = np.array(list(product(range(n_xy), range(n_xy), range(_LAYERS))))
+    positions = ((cells[:, None, :] + basis[None, :, :]).reshape(-1, 3)) * _A
+    top = positions[:, 2].max()
+
+    lattice = [
+        [n_xy * _A, 0.0, 0.0],
+        [0.0, n_xy * _A, 0.0],
+        [0.0, 0.0, _LAYERS * _A + _VACUUM],
+    ]
+    cart = positions.tolist()
+    species = ['Cu'] * len(cart)
+    for k in range(n_adsorbates):
+        x = (k + 0.5) * lattice[0][0] / n_adsorbates
+        cart += [[x, x, top + 1.9], [x, x, top + 3.05]]
+        species += ['C', 'O']
+    return {
+        'lattice_matrix': lattice,
+        'cart_positions': cart,
+        'species_per_atom': species,
+    }
+
+
+def legacy_components(positions: list, species: list, bond_cut: float = 1.9) -> int:
+    """旧实现：纯 Python 双重循环，不考虑周期性；返回分量数。"""
+    radii = _atomic_radii(species, len(positions))
+    n_atoms = len(positions)
+    adjacency = [[] for _ in range(n_atoms)]
+    for i in range(n_atoms):
+        xi, yi, zi = positions[i]
+        for j in range(i + 1, n_atoms):
+            xj, yj, zj = positions[j]
+            d2 = (xi - xj) ** 2 + (yi - yj) ** 2 + (zi - zj) ** 2
+            ri, rj = radii[i], radii[j]
+            cutoff = bond_cut
+            if ri or rj:
+                cutoff = max(bond_cut, 1.1 * ((ri or 1.0) + (rj or 1.0)))
+            if d2 <= cutoff * cutoff:
+                adjacency[i].append(j)
+                adjacency[j].append(i)
+    seen, count = set(), 0
+    for start in range(n_atoms):
+        if start in seen:
+            continue
+        count += 1
+        stack = [start]
+        seen.add(start)
+        while stack:
+            for neighbor in adjacency[stack.pop()]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+    return count
+
+
+def brute_force_components(structure: dict, bond_cut: float = 1.9) -> list:
+    """稠密矩阵 + 27 个镜像的最短镜像距离，仅用于小体系校验。"""
+    cart = np.asarray(structure['cart_positions'])
+    cell = np.asarray(structure['lattice_matrix'])
+    radii = _atomic_radii(structure['species_per_atom'], len(cart))
+    radii = np.array([np.nan if r is None else r for r in radii])
+    shifts = np.array(list(product((-1, 0, 1), repeat=3))) @ cell
+    delta = cart[:, None, None, :] - cart[None, :, None, :] + shifts[None, None]
+    distance = np.sqrt((delta**2).sum(-1)).min(-1)
+    cut = pair_cutoffs(radii[:, None], radii[None, :], bond_cut)
+    adjacency = distance <= cut
+    np.fill_diagonal(adjacency, False)
+
+    labels = -np.ones(len(cart), dtype=int)
+    components = []
+    for start in range(len(cart)):
+        if labels[start] >= 0:
+            continue
+        stack, members = [start], []
+        labels[start] = start
+        while stack:
+            node = stack.pop()
+            members.append(node)
+            for neighbor in np.flatnonzero(adjacency[node] & (labels < 0)):
+                labels[neighbor] = start
+                stack.append(neighbor)
+        components.append(sorted(members))
+    return components
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--atoms', type=int, nargs='+', default=[1000, 5000, 10000, 20000, 50000]
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--legacy-max', type=int, default=2000, help='time the O(N^2) search up to N'
+    )
+    parser.add_argument('--check', action='store_true', help='compare to brute force')
+    args = parser.parse_args()
+
+    status = 0
+    for n_atoms in args.atoms:
+        structure = make_slab(n_atoms)
+        n = len(structure['cart_positions'])
+
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            result = analyze_surface_structure(structure)
+            timings.append(time.perf_counter() - t0)
+        line = f'atoms={n:>6} analyze={min(timings) * 1000:9.1f} ms {result}'
+
+        if n <= args.legacy_max:
+            t0 = time.perf_counter()
+            legacy_components(
+                structure['cart_positions'], structure['species_per_atom']
+            )
+            line += f' legacy_components={(time.perf_counter() - t0) * 1000:.1f} ms'
+        print(line)
+
+        if args.check and n <= args.legacy_max:
+            expected = brute_force_components(structure)
+            got = _build_neighbor_list(
+                structure['cart_positions'],
+                structure['species_per_atom'],
+                1.9,
+                structure['lattice_matrix'],
+            ).components()
+            ok = got == expected
+            status |= not ok
+            print(f'  check components={len(got)} match_brute_force={ok}')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
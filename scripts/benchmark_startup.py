@@ -0,0 +1,65 @@
+"""
+Cold-start benchmark for the lazy sub-agent registry (sub_agents/mapping.py).
+
+Each measurement runs in a fresh interpreter so import caches do not leak
+between runs:
+  - lazy:  import the registry only (what agent.py pays at startup)
+  - eager: import the registry and resolve every agent + toolset (old behaviour)
+  - hot:   import the registry and warm up the given agents
+
+Usage (from project root):
+    uv run python scripts/benchmark_startup.py --repeat 5
+    uv run python scripts/benchmark_startup.py --hot structure_generate_agent optimade_agent
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+_SNIPPET = """
+import time
+t0 = time.perf_counter()
+from agents.matmaster_agent.sub_agents.mapping import warm_up_agents
+{warm_up}
+print(time.perf_counter() - t0)
+"""
+
+
+def _measure(warm_up: str) -> float:
+    out = subprocess.run(
+        [sys.executable, '-c', _SNIPPET.format(warm_up=warm_up)],
+        cwd=_PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark sub-agent cold start')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--hot', nargs='*', default=[], help='agents to warm up')
+    args = parser.parse_args()
+
+    cases = {
+        'lazy': '',
+        'eager': 'warm_up_agents()',
+    }
+    if args.hot:
+        cases['hot'] = f'warm_up_agents({args.hot!r})'
+
+    for name, warm_up in cases.items():
+        samples = [_measure(warm_up) for _ in range(args.repeat)]
+        print(
+            f'{name:>6}: median {statistics.median(samples):.3f}s '
+            f'(min {min(samples):.3f}s, max {max(samples):.3f}s, n={args.repeat})'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Per-step latency of obtaining function declarations in BaseAgentWithRecAndSum.
+
+Compares the former ToolConnectAgent path (list_tools + one LLM round trip
+whose only output used was the declarations) with
+utils/tool_declarations.get_function_declarations, cold and cached. The MCP
+server is mocked by a toolset whose list_tools sleeps --list-latency seconds;
+the LLM round trip is mocked by sleeping --llm-latency seconds.
+
+Usage (from project root):
+    uv run python scripts/benchmark_tool_declarations.py --steps 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from google.adk.agents.readonly_context import ReadonlyContext  # noqa: E402
+from google.adk.tools import BaseTool, FunctionTool  # noqa: E402
+from google.adk.tools.base_toolset import BaseToolset  # noqa: E402
+
+from agents.matmaster_agent.utils.tool_declarations import (  # noqa: E402
+    get_function_declarations,
+    invalidate_function_declarations,
+)
+
+
+def optimize_structure(structure_path: str, fmax: float = 0.05) -> dict:
+    """Relax a structure with a machine-learning potential."""
+    return {}
+
+
+def calculate_phonon(structure_path: str, supercell: list[int]) -> dict:
+    """Phonon band structure and DOS."""
+    return {}
+
+
+def run_molecular_dynamics(structure_path: str, temperature: float, steps: int) -> dict:
+    """NVT/NPT molecular dynamics."""
+    return {}
+
+
+class MockMCPToolset(BaseToolset):
+    """Stands in for an MCP toolset; every get_tools is one list_tools call."""
+
+    def __init__(self, list_latency: float):
+        super().__init__()
+        self.list_latency = list_latency
+        self.list_calls = 0
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None):
+        self.list_calls += 1
+        await asyncio.sleep(self.list_latency)
+        funcs = [optimize_structure, calculate_phonon, run_molecular_dynamics]
+        return [FunctionTool(func=func) for func in funcs]
+
+    async def close(self) -> None:
+        pass
+
+
+async def legacy_step(toolset: MockMCPToolset, llm_latency: float) -> list[dict]:
+    tools: list[BaseTool] = await toolset.get_tools()
+    declarations = [tool._get_declaration().to_json_dict() for tool in tools]
+    await asyncio.sleep(llm_latency)
+    return declarations
+
+
+async def _run(steps: int, list_latency: float, llm_latency: float) -> int:
+    toolset = MockMCPToolset(list_latency)
+
+    def timed(samples: list[float], t0: float) -> None:
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    legacy, cached = [], []
+    for _ in range(steps):
+        t0 = time.perf_counter()
+        expected = await legacy_step(toolset, llm_latency)
+        timed(legacy, t0)
+
+    invalidate_function_declarations()
+    t0 = time.perf_counter()
+    got = await get_function_declarations([toolset])
+    cold = (time.perf_counter() - t0) * 1000
+    identical = got == expected
+
+    calls_before = toolset.list_calls
+    for _ in range(steps):
+        t0 = time.perf_counter()
+        await get_function_declarations([toolset])
+        timed(cached, t0)
+
+    print(f'legacy (list_tools + LLM): median {statistics.median(legacy):8.1f} ms')
+    print(f'direct, cold cache       : {cold:8.1f} ms')
+    print(f'direct, cached           : median {statistics.median(cached):8.3f} ms')
+    print(f'list_tools calls while cached: {toolset.list_calls - calls_before}')
+    print(f'declarations identical to listing: {identical}')
+    return 0 if identical else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--steps', type=int, default=10)
+    parser.add_argument('--list-latency', type=float, default=0.3)
+    parser.add_argument('--llm-latency', type=float, default=3.0)
+    args = parser.parse_args()
+    return asyncio.run(_run(args.steps, args.list_latency, args.llm_latency))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Per-turn planning overhead of tool lookups over ALL_TOOLS.
+
+One simulated turn does what the flow does around plan making: the scene
+filtered tool list, the available-tools prompt text, the belonging agents of
+the plan steps, the confirmation bypass check and the alternative / self-check
+lookups of each step. The former linear scans over ALL_TOOLS are compared
+with the flow_agents/utils functions backed by TOOL_REGISTRY, after checking
+that both give identical results for every sampled scene set.
+
+Usage (from project root):
+    uv run python scripts/benchmark_tool_registry.py --turns 2000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.flow_agents import utils  # noqa: E402
+from agents.matmaster_agent.flow_agents.scene_agent.model import (  # noqa: E402
+    SceneEnum,
+)
+from agents.matmaster_agent.sub_agents.tool_registry import (  # noqa: E402
+    TOOL_REGISTRY,
+)
+from agents.matmaster_agent.sub_agents.tools import ALL_TOOLS  # noqa: E402
+
+
+def legacy_turn(scenes: list[str], upload_file: bool, plan_tools: list[str]):
+    tools = [
+        k for k, v in ALL_TOOLS.items() if any(scene in v['scene'] for scene in scenes)
+    ]
+    if not upload_file:
+        tools = [
+            t for t in tools if SceneEnum.NEED_UPLOAD_FILE not in ALL_TOOLS[t]['scene']
+        ]
+    info = {
+        item: {
+            'scene': ALL_TOOLS[item]['scene'],
+            'description': ALL_TOOLS[item]['description'],
+        }
+        for item in tools
+    }
+    prompt = '\n'.join(
+        f"{key}\n    scene: {', '.join(value['scene'])}\n    description: {value['description']}"
+        for key, value in info.items()
+    )
+    agents = []
+    for tool_name in plan_tools:
+        agent = ALL_TOOLS.get(tool_name, {}).get('belonging_agent')
+        if agent and agent not in agents:
+            agents.append(agent)
+    bypass = (
+        len(plan_tools) == 1
+        and ALL_TOOLS.get(plan_tools[0], {}).get('bypass_confirmation') is True
+    )
+    checks = [
+        (ALL_TOOLS[t].get('alternative', []), ALL_TOOLS[t].get('self_check', False))
+        for t in plan_tools
+    ]
+    return tools, prompt, agents, bypass, checks
+
+
+def registry_turn(scenes: list[str], upload_file: bool, plan_tools: list[str]):
+    ctx = SimpleNamespace(
+        session=SimpleNamespace(
+            state={
+                'upload_file': upload_file,
+                'plan': {'steps': [{'tool_name': t} for t in plan_tools]},
+            }
+        )
+    )
+    tools = utils.get_tools_list(ctx, scenes)
+    prompt = TOOL_REGISTRY.tools_prompt(tools)
+    agents = TOOL_REGISTRY.agents_for_tools(plan_tools)
+    bypass = len(plan_tools) == 1 and utils.should_bypass_confirmation(ctx)
+    checks = [
+        (utils.find_alternative_tool(t), utils.has_self_check(t)) for t in plan_tools
+    ]
+    return tools, prompt, agents, bypass, checks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--turns', type=int, default=2000)
+    parser.add_argument('--scene-sets', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    all_scenes = sorted({str(s) for spec in ALL_TOOLS.values() for s in spec['scene']})
+    names = list(ALL_TOOLS)
+    # 多轮对话中场景组合会重复出现
+    workloads = [
+        (
+            rng.sample(all_scenes, rng.randint(1, 4)) + ['universal'],
+            rng.random() < 0.5,
+            rng.sample(names, rng.randint(1, 4)),
+        )
+        for _ in range(args.scene_sets)
+    ]
+    identical = all(legacy_turn(*w) == registry_turn(*w) for w in workloads)
+
+    timings = {}
+    for label, turn in (('linear scans', legacy_turn), ('registry', registry_turn)):
+        t0 = time.perf_counter()
+        for i in range(args.turns):
+            turn(*workloads[i % len(workloads)])
+        timings[label] = (time.perf_counter() - t0) / args.turns * 1e6
+
+    print(
+        f'tools={len(ALL_TOOLS)} scenes={len(all_scenes)} scene sets={len(workloads)}'
+    )
+    for label, us in timings.items():
+        print(f'{label:>12}: {us:8.1f} us / turn')
+    print(f'speedup x{timings["linear scans"] / timings["registry"]:.1f}')
+    print(f'results identical: {identical}')
+    return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Build or extend the local ICL index (services/icl_local.py).
+
+Without --add the index is rebuilt from agents/matmaster_agent/icl_examples.json;
+every --add file (JSON list, {"examples": [...]} or JSONL of examples) is
+added incrementally on top of the existing index. The script then reports
+self-retrieval hit@1 for both fields, the mean query latency, and the top
+matches of each --query.
+
+Usage (from project root):
+    uv run python scripts/build_icl_index.py
+    uv run python scripts/build_icl_index.py --add exported_examples.jsonl --query "计算 Si 的声子谱"
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.config import ICL_LOCAL_INDEX_FILE  # noqa: E402
+from agents.matmaster_agent.services.icl import (  # noqa: E402
+    scene_tags_from_examples,
+    toolchain_from_examples,
+)
+from agents.matmaster_agent.services.icl_local import (  # noqa: E402
+    LocalIclRetriever,
+    load_seed_examples,
+    seed_digest,
+)
+
+
+def _read_examples(path: Path) -> list[dict]:
+    text = path.read_text(encoding='utf-8')
+    if path.suffix == '.jsonl':
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    return data['examples'] if isinstance(data, dict) else data
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--index', default=ICL_LOCAL_INDEX_FILE)
+    parser.add_argument('--add', type=Path, action='append', default=[])
+    parser.add_argument('--query', action='append', default=[])
+    args = parser.parse_args()
+
+    if args.add and Path(args.index).exists():
+        retriever = LocalIclRetriever.load(args.index)
+    else:
+        retriever = LocalIclRetriever(load_seed_examples())
+        retriever.seed_digest = seed_digest()
+    for path in args.add:
+        added = retriever.add_examples(_read_examples(path))
+        print(f'{path}: {added} new example(s)')
+    retriever.save(args.index)
+    print(f'index {args.index}: {len(retriever)} examples')
+
+    reloaded = LocalIclRetriever.load(args.index)
+    hits = {'input': 0, 'update_input': 0}
+    t0 = time.perf_counter()
+    for example in reloaded.examples:
+        top = reloaded.select_examples(example['input'], k=1)
+        hits['input'] += bool(top) and top[0]['input'] == example['input']
+        top = reloaded.select_update_examples(example['update_input'], k=1)
+        hits['update_input'] += bool(top) and top[0]['input'] == example['input']
+    per_query = (time.perf_counter() - t0) * 1000 / (2 * len(reloaded))
+    for field, hit in hits.items():
+        print(f'self-retrieval hit@1 ({field}): {hit}/{len(reloaded)}')
+    print(f'mean query latency: {per_query:.3f} ms')
+
+    for query in args.query:
+        examples = reloaded.select_update_examples(query)
+        print(f'\nquery: {query}')
+        print(scene_tags_from_examples(examples))
+        print(toolchain_from_examples(examples))
+
+    return 0 if all(hit == len(reloaded) for hit in hits.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Check the pooled HTTP client (services/http_client.py) against a local aiohttp
+stub.
+
+Covers: retry of retryable statuses and the give-up after policy.retries,
+no retry for other statuses, retry of a timed-out request, the total and
+sock_read timeouts, the no-retry MEMORY_RETRIEVE_POLICY, and that all requests
+of a loop share one ClientSession and reuse pooled connections.
+
+Usage (from project root):
+    uv run python scripts/check_http_client.py
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from dataclasses import replace
+from pathlib import Path
+
+from aiohttp import web
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.services.http_client import (  # noqa: E402
+    DOWNLOAD_POLICY,
+    MEMORY_RETRIEVE_POLICY,
+    EndpointPolicy,
+    close_http_client,
+    get_http_client,
+    request,
+    request_text,
+)
+
+
+class Stub:
+    """Routes whose first ``fail`` calls misbehave, then answer 'ok'."""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.peers: set = set()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/flaky/{status}/{fail}', self.flaky)
+        app.router.add_get('/slow/{delay}/{fail}', self.slow)
+        app.router.add_get('/stall', self.stall)
+        app.router.add_get('/ok', self.ok)
+        return app
+
+    async def flaky(self, request: web.Request) -> web.Response:
+        self.calls[request.path] += 1
+        if self.calls[request.path] <= int(request.match_info['fail']):
+            return web.Response(status=int(request.match_info['status']))
+        return web.Response(text='ok')
+
+    async def slow(self, request: web.Request) -> web.Response:
+        self.calls[request.path] += 1
+        if self.calls[request.path] <= int(request.match_info['fail']):
+            await asyncio.sleep(float(request.match_info['delay']))
+        return web.Response(text='ok')
+
+    async def stall(self, request: web.Request) -> web.StreamResponse:
+        # 先返回部分内容，随后停止发送
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(b'partial')
+        await asyncio.sleep(5)
+        return response
+
+    async def ok(self, request: web.Request) -> web.Response:
+        self.peers.add(request.transport.get_extra_info('peername'))
+        return web.Response(text='ok')
+
+
+async def _run() -> list[str]:
+    errors = []
+
+    def expect(label, ok):
+        print(f'{"ok  " if ok else "FAIL"} {label}')
+        if not ok:
+            errors.append(label)
+
+    stub = Stub()
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+    policy = EndpointPolicy(connect_timeout=1, total_timeout=2, retries=2, backoff=0)
+
+    try:
+        text = await request_text('GET', f'{base}/flaky/503/2', policy=policy)
+        expect(
+            'retryable status retried until success',
+            text == 'ok' and stub.calls['/flaky/503/2'] == 3,
+        )
+
+        async with request('GET', f'{base}/flaky/503/5', policy=policy) as r:
+            status = r.status
+        expect(
+            'gives up after policy.retries',
+            status == 503 and stub.calls['/flaky/503/5'] == 3,
+        )
+
+        async with request('GET', f'{base}/flaky/404/1', policy=policy) as r:
+            status = r.status
+        expect(
+            'non-retryable status not retried',
+            status == 404 and stub.calls['/flaky/404/1'] == 1,
+        )
+
+        quick = replace(policy, total_timeout=0.3)
+        text = await request_text('GET', f'{base}/slow/1/1', policy=quick)
+        expect(
+            'timed-out request retried',
+            text == 'ok' and stub.calls['/slow/1/1'] == 2,
+        )
+
+        t0 = time.perf_counter()
+        try:
+            await request_text(
+                'GET', f'{base}/slow/1/9', policy=replace(quick, retries=0)
+            )
+            timed_out = False
+        except asyncio.TimeoutError:
+            timed_out = True
+        expect(
+            f'total timeout enforced ({(time.perf_counter() - t0) * 1000:.0f} ms)',
+            timed_out and time.perf_counter() - t0 < 0.8,
+        )
+
+        try:
+            await request_text(
+                'GET',
+                f'{base}/slow/1/9',
+                policy=replace(MEMORY_RETRIEVE_POLICY, total_timeout=0.3),
+            )
+        except asyncio.TimeoutError:
+            pass
+        expect(
+            'MEMORY_RETRIEVE_POLICY does not retry',
+            stub.calls['/slow/1/9'] == 2,
+        )
+
+        expect(
+            'DOWNLOAD_POLICY has a bounded total timeout',
+            DOWNLOAD_POLICY.client_timeout().total is not None,
+        )
+        stall = replace(
+            DOWNLOAD_POLICY, total_timeout=None, sock_read_timeout=0.3, retries=0
+        )
+        t0 = time.perf_counter()
+        try:
+            await request_text('GET', f'{base}/stall', policy=stall)
+            stalled = False
+        except asyncio.TimeoutError:
+            stalled = True
+        expect(
+            f'sock_read timeout ends a stalled download '
+            f'({(time.perf_counter() - t0) * 1000:.0f} ms)',
+            stalled and time.perf_counter() - t0 < 2,
+        )
+
+        client = get_http_client()
+        await asyncio.gather(
+            *(request_text('GET', f'{base}/ok', policy=policy) for _ in range(4))
+        )
+        for _ in range(20):
+            await request_text('GET', f'{base}/ok', policy=policy)
+        expect('one ClientSession per loop', get_http_client() is client)
+        expect(
+            f'pooled connections reused ({len(stub.peers)} for 24 requests)',
+            len(stub.peers) <= 4,
+        )
+    finally:
+        await close_http_client()
+        await runner.cleanup()
+    return errors
+
+
+def main() -> int:
+    argparse.ArgumentParser(description=__doc__.splitlines()[1]).parse_args()
+    errors = asyncio.run(_run())
+    print('OK' if not errors else f'{len(errors)} checks failed')
+    return 0 if not errors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Concurrency check for the per-session i18n language (locales.SessionI18N).
+
+Spawns many asyncio tasks that each pick a language, yield to the event loop
+repeatedly and verify that ``i18n.language`` / ``i18n.t`` still return their
+own language's strings while the other tasks keep switching theirs.
+
+Usage (from project root):
+    uv run python scripts/check_i18n_concurrency.py --sessions 500 --rounds 20
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.locales import i18n, translations  # noqa: E402
+
+
+async def _session(language: str, rounds: int) -> int:
+    i18n.language = language
+    errors = 0
+    for _ in range(rounds):
+        await asyncio.sleep(random.random() / 1000)
+        expected = translations[language]['Plan']
+        if i18n.language != language or i18n.t('Plan') != expected:
+            errors += 1
+    return errors
+
+
+async def _run(sessions: int, rounds: int) -> int:
+    languages = list(translations)
+    results = await asyncio.gather(
+        *(_session(languages[i % len(languages)], rounds) for i in range(sessions))
+    )
+    return sum(results)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    errors = asyncio.run(_run(args.sessions, args.rounds))
+    print(f'sessions={args.sessions} rounds={args.rounds} wrong_strings={errors}')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Check for the async ICL example selection (services/icl.py) against a local
+stand-in of the ICL service.
+
+1. concurrent lookups of the same query in different spellings share one
+   request, and repeats are served from the cache;
+2. a service slower than the latency budget yields the fallback (local
+   retriever) within the budget, and the late answer is cached for the next
+   lookup;
+3. the event loop keeps running meanwhile (max ticker lag is reported).
+
+Usage (from project root):
+    uv run python scripts/check_icl_cache.py --sessions 10
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.services import icl  # noqa: E402
+from agents.matmaster_agent.services.http_client import (  # noqa: E402
+    close_http_client,
+)
+
+logger = logging.getLogger('check_icl_cache')
+
+
+class IclServiceStub:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/api/v1/icl/{endpoint}', self.select)
+        return app
+
+    async def select(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        query = (await request.json())['query']
+        example = {
+            'input': query,
+            'update_input': f'{query} (expanded)',
+            'toolchain': ['optimize_structure'],
+            'scene_tags': ['optimize_structure'],
+        }
+        return web.json_response({'data': [example]})
+
+
+def _from_service(examples: list[dict]) -> bool:
+    return examples[0]['update_input'].endswith('(expanded)')
+
+
+async def _max_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    lag = 0.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(lag, time.perf_counter() - t0 - interval)
+    return lag
+
+
+async def _run(sessions: int, latency: float) -> int:
+    stub = IclServiceStub(latency)
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    icl.ICL_SERVICE_URL = f'127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_max_lag(stop))
+    spellings = ['优化 Fe 结构', '优化  fe 结构。', '优化 Ｆｅ 结构']
+    ok = True
+    try:
+        # 1. 并发 + 缓存
+        results = await asyncio.gather(
+            *(
+                icl.select_examples(spellings[i % 3], f's{i}', 'test', logger)
+                for i in range(sessions)
+            )
+        )
+        first_calls = stub.calls
+        await icl.select_examples('优化 FE 结构', 'late', 'test', logger)
+        shared = first_calls == 1 and stub.calls == 1
+        same = all(r == results[0] for r in results) and _from_service(results[0])
+        ok &= shared and same
+        print(
+            f'{sessions} concurrent lookups, {len(spellings)} spellings -> '
+            f'{first_calls} request(s); repeat served from cache={stub.calls == 1}'
+        )
+
+        # 2. 超出延迟预算
+        stub.latency = icl.ICL_LATENCY_BUDGET * 1.5
+        t0 = time.perf_counter()
+        slow = await icl.select_update_examples('计算 Si 能带', 's1', 'test', logger)
+        waited = time.perf_counter() - t0
+        fallback = not _from_service(slow) and waited < stub.latency
+        await asyncio.sleep(stub.latency - waited + 0.2)
+        t0 = time.perf_counter()
+        cached = await icl.select_update_examples('计算 si 能带', 's2', 'test', logger)
+        late_cached = _from_service(cached)
+        ok &= fallback and late_cached
+        print(
+            f'slow service: fallback after {waited:.2f}s '
+            f'(budget {icl.ICL_LATENCY_BUDGET}s) ok={fallback}; late answer '
+            f'cached={late_cached} ({(time.perf_counter() - t0) * 1000:.2f} ms)'
+        )
+    finally:
+        stop.set()
+        lag = await ticker
+        await close_http_client()
+        await runner.cleanup()
+
+    print(f'max event loop lag={lag * 1000:.1f} ms')
+    print(f'ok={ok}')
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.3)
+    args = parser.parse_args()
+    return asyncio.run(_run(args.sessions, args.latency))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
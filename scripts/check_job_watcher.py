@@ -0,0 +1,155 @@
+"""
+Offline check for services/job_watcher.JobWatcher against scripts/fake_job_api.
+
+Several sessions watch overlapping sets of jobs; the check verifies that
+every session receives the terminal event of exactly its own jobs, that
+adaptive backoff issues fewer detail requests than fixed-interval polling,
+that a late watch() of a finished job is answered from the terminal cache
+without a request, that drain() hands each session its terminal events once,
+that a failed status check reaches subscribers as an error event, and that
+sandbox_cli.poll_job_status returns the final status and downloads the log,
+or gives up after max_errors failed checks.
+
+Usage (from project root):
+    uv run python scripts/check_job_watcher.py --jobs 12 --duration 3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.services.http_client import (  # noqa: E402
+    close_http_client,
+)
+from agents.matmaster_agent.services.job_watcher import JobWatcher  # noqa: E402
+from scripts.fake_job_api import FakeJobAPI, point_job_services_at  # noqa: E402
+from scripts.sandbox_cli import poll_job_status  # noqa: E402
+
+MIN_INTERVAL = 0.05
+MAX_INTERVAL = 1.0
+
+
+async def _collect(queue: asyncio.Queue, expected: set[str]) -> dict[str, str]:
+    received = {}
+    while set(received) != expected:
+        event = await queue.get()
+        if event.terminal:
+            received[event.origin_job_id] = event.status
+    return received
+
+
+async def _run(n_jobs: int, duration: float) -> int:
+    api = FakeJobAPI(duration)
+    point_job_services_at(await api.start())
+    watcher = JobWatcher(
+        min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, backoff=2
+    )
+
+    job_ids = [f'{"fail" if i % 4 == 0 else "job"}{i}' for i in range(n_jobs)]
+    # session_i 拥有下标 ≡ i (mod 3) 的任务，外加第一个任务（多个会话共享）
+    sessions = {f'session_{s}': {job_ids[0]} | set(job_ids[s::3]) for s in range(3)}
+    queues = {session_id: watcher.subscribe(session_id) for session_id in sessions}
+    for session_id, owned in sessions.items():
+        for job_id in owned:
+            watcher.watch(job_id, 'ak', session_id, f'origin_{job_id}')
+
+    ok = True
+    try:
+        t0 = time.perf_counter()
+        received = await asyncio.wait_for(
+            asyncio.gather(
+                *(
+                    _collect(queues[session_id], {f'origin_{j}' for j in owned})
+                    for session_id, owned in sessions.items()
+                )
+            ),
+            timeout=duration + 4 * MAX_INTERVAL,
+        )
+        elapsed = time.perf_counter() - t0
+        for result in received:
+            for origin_job_id, status in result.items():
+                expected = 'Failed' if 'fail' in origin_job_id else 'Finished'
+                ok &= status == expected
+
+        requests = sum(api.detail_calls[job_id] for job_id in job_ids)
+        fixed = n_jobs * int(duration / MIN_INTERVAL)
+        ok &= requests < fixed
+        print(
+            f'jobs={n_jobs} sessions={len(sessions)} all terminal in {elapsed:.2f}s, '
+            f'detail requests={requests} (fixed {MIN_INTERVAL}s polling ~{fixed})'
+        )
+
+        late = watcher.subscribe('late_session')
+        before = api.detail_calls[job_ids[1]]
+        watcher.watch(job_ids[1], 'ak', 'late_session', 'late')
+        event = late.get_nowait()
+        cached = event.terminal and api.detail_calls[job_ids[1]] == before
+        ok &= cached
+        print(f'late watch answered from cache: {cached}')
+
+        drained = {
+            session_id: {event.origin_job_id for event in watcher.drain(session_id)}
+            for session_id in sessions
+        }
+        drain_ok = all(
+            drained[session_id] == {f'origin_{j}' for j in owned}
+            for session_id, owned in sessions.items()
+        ) and not any(watcher.drain(session_id) for session_id in sessions)
+        ok &= drain_ok
+        print(f'drain returns each session its terminal events once: {drain_ok}')
+
+        errors = watcher.subscribe('error_session')
+        watcher.watch('missing_job', 'ak', 'error_session', 'missing')
+        event = await asyncio.wait_for(errors.get(), timeout=4 * MIN_INTERVAL + 1)
+        error_ok = event.error is not None and not event.terminal
+        ok &= error_ok
+        print(f'failed status check published as error event: {error_ok}')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                status = await poll_job_status('cli_job', 'ak', MIN_INTERVAL, 0.5)
+                log_ok = Path('log').is_file()
+            finally:
+                os.chdir(cwd)
+        ok &= status == 'Finished' and log_ok
+        print(f'sandbox_cli poll: status={status} log downloaded={log_ok}')
+
+        t0 = time.perf_counter()
+        status = await asyncio.wait_for(
+            poll_job_status('missing_cli', 'ak', MIN_INTERVAL, 0.2, max_errors=3),
+            timeout=5,
+        )
+        ok &= status is None
+        print(
+            f'sandbox_cli poll of a missing job: status={status} '
+            f'after {time.perf_counter() - t0:.2f}s'
+        )
+    finally:
+        await watcher.close()
+        await close_http_client()
+        await api.stop()
+
+    print(f'ok={ok}')
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--jobs', type=int, default=12)
+    parser.add_argument('--duration', type=float, default=3)
+    args = parser.parse_args()
+    return asyncio.run(_run(args.jobs, args.duration))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
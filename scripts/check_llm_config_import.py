@@ -0,0 +1,119 @@
+"""
+Import-time check of llm_config with the network blocked.
+
+In a fresh interpreter whose sockets refuse to connect or resolve, imports
+agents.matmaster_agent.llm_config and checks that neither litellm, the ADK
+LiteLlm wrapper nor opik got imported, no LiteLlm or OpikTracer was built and
+no connection was attempted. Then checks that the first attribute access
+builds (and caches) exactly the model asked for, and that opik_tracer is only
+created when first read.
+
+Usage (from project root):
+    uv run python scripts/check_llm_config_import.py
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+_SNIPPET = """
+import json
+import socket
+import sys
+
+attempts = []
+
+
+def _blocked(kind):
+    def refuse(*args, **kwargs):
+        attempts.append(kind)
+        raise OSError(f'network blocked ({kind})')
+
+    return refuse
+
+
+socket.socket.connect = _blocked('connect')
+socket.socket.connect_ex = _blocked('connect_ex')
+socket.create_connection = _blocked('create_connection')
+socket.getaddrinfo = _blocked('getaddrinfo')
+
+heavy = ('litellm', 'google.adk.models.lite_llm', 'opik')
+from agents.matmaster_agent import llm_config  # noqa: E402
+
+config = llm_config.MatMasterLlmConfig
+report = {
+    'imported_at_import': [m for m in heavy if m in sys.modules],
+    'models_at_import': list(config._models),
+    'tracer_at_import': config._opik_tracer is not None,
+    'attempts_at_import': list(attempts),
+}
+
+model = config.gpt_4o
+report['models_after_access'] = list(config._models)
+report['model_type'] = type(model).__name__
+report['cached'] = config.gpt_4o is model
+report['tracer_after_model'] = config._opik_tracer is not None
+tracer = config.opik_tracer
+report['tracer_type'] = type(tracer).__name__
+report['tracer_cached'] = config.opik_tracer is tracer
+print(json.dumps(report))
+"""
+
+
+def main() -> int:
+    argparse.ArgumentParser(description=__doc__.splitlines()[1]).parse_args()
+
+    env = {
+        **os.environ,
+        # litellm 导入时默认拉取远程价格表
+        'LITELLM_LOCAL_MODEL_COST_MAP': 'True',
+        'ENABLE_OPIK_TRACER': '1',
+    }
+    out = subprocess.run(
+        [sys.executable, '-c', _SNIPPET],
+        cwd=_PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode != 0:
+        print(out.stderr)
+        return 1
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+
+    checks = [
+        (
+            'no litellm / LiteLlm / opik import at import time',
+            report['imported_at_import'] == [],
+        ),
+        ('no LiteLlm built at import time', report['models_at_import'] == []),
+        ('no tracer built at import time', not report['tracer_at_import']),
+        ('no network access at import time', report['attempts_at_import'] == []),
+        (
+            'first access builds only the requested model',
+            report['models_after_access'] == ['azure/gpt-4o']
+            and report['model_type'] == 'LiteLlm',
+        ),
+        ('model cached after first access', report['cached']),
+        ('tracer not built by model access', not report['tracer_after_model']),
+        (
+            'tracer built on first read and cached',
+            report['tracer_type'] == 'OpikTracer' and report['tracer_cached'],
+        ),
+    ]
+    failed = 0
+    for label, ok in checks:
+        print(f'{"ok  " if ok else "FAIL"} {label}')
+        failed += not ok
+    print(json.dumps(report, ensure_ascii=False))
+    print('OK' if not failed else f'{failed} checks failed')
+    return 0 if not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Check for the memory_retrieve cache (services/memory.py) against a local
+stand-in of the memory service.
+
+Simulates one user turn in which --calls model calls of MCP agents inject
+memory concurrently, then a second wave after the first completes, then a
+memory_write followed by another retrieval. A write that lands while a
+retrieval is in flight must keep that retrieval's result out of the cache, and
+after --sessions sessions have written the per-session version map must be
+empty again. Reports the retrieve requests that reached the service and the
+cache statistics.
+
+Usage (from project root):
+    uv run python scripts/check_memory_cache.py --calls 12
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.services import memory  # noqa: E402
+from agents.matmaster_agent.services.http_client import (  # noqa: E402
+    close_http_client,
+)
+from agents.matmaster_agent.services.memory import (  # noqa: E402
+    format_short_term_memory,
+    memory_cache_stats,
+    memory_retrieve,
+    memory_write,
+)
+
+
+class MemoryServiceStub:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.documents: dict[str, list[str]] = {}
+        self.retrieve_calls = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/api/v1/memory/write', self.write)
+        app.router.add_post('/api/v1/memory/retrieve', self.retrieve)
+        return app
+
+    async def write(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.documents.setdefault(body['session_id'], []).append(body['text'])
+        return web.json_response({'code': 0})
+
+    async def retrieve(self, request: web.Request) -> web.Response:
+        self.retrieve_calls += 1
+        await asyncio.sleep(self.latency)
+        body = await request.json()
+        docs = self.documents.get(body['session_id'], [])[: body['n_results']]
+        return web.json_response({'data': [{'document': d} for d in docs]})
+
+
+async def _run(calls: int, latency: float, sessions: int) -> int:
+    stub = MemoryServiceStub(latency)
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base_url = f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+
+    def inject():
+        return format_short_term_memory(
+            'relax Fe bcc with DPA', session_id='s1', base_url=base_url
+        )
+
+    try:
+        await memory_write('s1', 'user prefers DPA-3.1', base_url=base_url)
+        first = await asyncio.gather(*(inject() for _ in range(calls)))
+        after_first = stub.retrieve_calls
+        second = await asyncio.gather(*(inject() for _ in range(calls)))
+        after_second = stub.retrieve_calls
+
+        await memory_write('s1', 'fmax 0.01 eV/A', base_url=base_url)
+        third = await inject()
+        after_write = stub.retrieve_calls
+
+        # 检索进行中写入：该检索结果不缓存，下一次检索重新请求
+        pending = asyncio.create_task(memory_retrieve('s2', 'q', base_url=base_url))
+        await asyncio.sleep(latency / 2)
+        await memory_write('s2', 'written mid-flight', base_url=base_url)
+        await pending
+        calls_before = stub.retrieve_calls
+        fresh = await memory_retrieve('s2', 'q', base_url=base_url)
+        mid_flight_ok = (
+            stub.retrieve_calls == calls_before + 1 and 'written mid-flight' in fresh
+        )
+
+        # 大量会话写入后，版本表不随会话数增长
+        await asyncio.gather(
+            *(
+                memory_retrieve(f'bulk{i}', 'q', base_url=base_url)
+                for i in range(sessions)
+            ),
+            *(
+                memory_write(f'bulk{i}', 'x', base_url=base_url)
+                for i in range(sessions)
+            ),
+        )
+        versions_left = len(memory._session_versions)
+        inflight_left = len(memory._inflight_sessions)
+    finally:
+        await close_http_client()
+        await runner.cleanup()
+
+    stats = memory_cache_stats()
+    ok = (
+        after_first == 1
+        and after_second == 1
+        and after_write == 2
+        and len(set(first + second)) == 1
+        and 'fmax 0.01' in third
+        and mid_flight_ok
+        and versions_left == 0
+        and inflight_left == 0
+    )
+    print(
+        f'concurrent wave: {calls} calls -> {after_first} request(s); '
+        f'repeat wave -> {after_second - after_first}; '
+        f'after write -> {after_write - after_second} (sees new insight: '
+        f'{"fmax 0.01" in third})'
+    )
+    print(f'write during an in-flight retrieval not served stale: {mid_flight_ok}')
+    print(
+        f'{sessions} writing sessions -> {versions_left} version entries, '
+        f'{inflight_left} in-flight sessions left'
+    )
+    print(
+        f'hits={stats.hits} coalesced={stats.coalesced} misses={stats.misses} '
+        f'invalidations={stats.invalidations} hit_rate={stats.hit_rate:.2f}'
+    )
+    print(f'ok={ok}')
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--sessions', type=int, default=500)
+    args = parser.parse_args()
+    return asyncio.run(_run(args.calls, args.latency, args.sessions))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Check for the background memory write queue (services/memory_queue.py)
+against a local stand-in of the memory service.
+
+1. healthy service: enqueueing returns immediately and every record is
+   written exactly once, in batches;
+2. service down: records end up in the queue's spool file and are
+   delivered once the service is back;
+3. rejected: records the service answers with a 4xx are dropped, not retried;
+4. two queues on the same spool base (as two worker processes) keep separate
+   spool files and deliver every record exactly once;
+5. restart: spools left by an exited process and the former shared spool
+   file are claimed and sent by a new queue.
+
+Usage (from project root):
+    uv run python scripts/check_memory_queue.py --records 40
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from aiohttp import web
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.services.http_client import (  # noqa: E402
+    close_http_client,
+)
+from agents.matmaster_agent.services.memory import MemoryRecord  # noqa: E402
+from agents.matmaster_agent.services.memory_queue import (  # noqa: E402
+    MemoryWriteQueue,
+)
+
+
+class MemoryServiceStub:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.up = True
+        self.written: Counter[str] = Counter()
+        self.calls: Counter[str] = Counter()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/api/v1/memory/write', self.write)
+        return app
+
+    async def write(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+        if not self.up:
+            return web.Response(status=500)
+        text = (await request.json())['text']
+        self.calls[text] += 1
+        if text.startswith('bad'):
+            return web.Response(status=422)
+        self.written[text] += 1
+        return web.json_response({'code': 0})
+
+
+async def _wait_until(predicate, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.02)
+    return True
+
+
+def _dead_pid() -> int:
+    pid = 4_000_000
+    while True:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return pid
+        except PermissionError:
+            pass
+        pid += 1
+
+
+async def _run(n_records: int, latency: float) -> int:
+    stub = MemoryServiceStub(latency)
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base_url = f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = Path(tmp) / 'spool.jsonl'
+
+        def new_queue() -> MemoryWriteQueue:
+            return MemoryWriteQueue(
+                base_url,
+                batch_size=8,
+                flush_interval=0.1,
+                retry_max=0.4,
+                spool_file=str(spool),
+            )
+
+        try:
+            # 1. 正常服务
+            queue = new_queue()
+            t0 = time.perf_counter()
+            for i in range(n_records):
+                queue.put(MemoryRecord('s1', f'insight {i}'))
+            enqueue_ms = (time.perf_counter() - t0) * 1000
+            done = await _wait_until(lambda: len(stub.written) == n_records, 10)
+            once = all(count == 1 for count in stub.written.values())
+            ok &= done and once
+            print(
+                f'healthy: {n_records} enqueued in {enqueue_ms:.2f} ms, '
+                f'all written={done}, exactly once={once}'
+            )
+
+            # 2. 服务不可用 -> spool -> 恢复后送达
+            stub.up = False
+            for i in range(5):
+                queue.put(MemoryRecord('s1', f'down {i}'))
+            spooled = await _wait_until(queue.spool_file.exists, 10)
+            stub.up = True
+            delivered = await _wait_until(
+                lambda: all(stub.written[f'down {i}'] >= 1 for i in range(5)), 10
+            )
+            await _wait_until(lambda: not queue.spool_file.exists(), 5)
+            cleared = not queue.spool_file.exists()
+            ok &= spooled and delivered and cleared
+            print(
+                f'service down: spooled={spooled}, delivered after recovery='
+                f'{delivered}, spool cleared={cleared}'
+            )
+
+            # 3. 4xx 拒绝的记录直接丢弃
+            queue.put(MemoryRecord('s1', 'bad record'))
+            queue.put(MemoryRecord('s1', 'good record'))
+            await _wait_until(lambda: stub.written['good record'], 10)
+            await asyncio.sleep(0.5)
+            dropped = stub.calls['bad record'] == 1 and not queue.spool_file.exists()
+            ok &= dropped
+            print(f'rejected: sent once and dropped={dropped}')
+            await queue.close()
+
+            # 4. 两个队列（模拟两个进程）共用 spool 配置
+            stub.up = False
+            queues = [new_queue(), new_queue()]
+            for i in range(20):
+                queues[i % 2].put(MemoryRecord('s3', f'shared {i}'))
+            separate = await _wait_until(
+                lambda: all(q.spool_file.exists() for q in queues), 10
+            ) and (queues[0].spool_file != queues[1].spool_file)
+            stub.up = True
+            delivered = await _wait_until(
+                lambda: all(stub.written[f'shared {i}'] for i in range(20)), 10
+            )
+            once = all(stub.written[f'shared {i}'] == 1 for i in range(20))
+            ok &= separate and delivered and once
+            print(
+                f'two queues: separate spool files={separate}, '
+                f'all delivered={delivered}, exactly once={once}'
+            )
+            for q in queues:
+                await q.close()
+
+            # 5. 已退出进程及旧版共享 spool 留下的记录
+            line = '{{"session_id": "s2", "text": "{}", "metadata": {{}}}}\n'
+            spool.write_text(line.format('left over'))
+            dead = spool.with_name(f'{spool.stem}.{_dead_pid()}-0{spool.suffix}')
+            dead.write_text(line.format('left by exited process'))
+            queue = new_queue()
+            queue.put(MemoryRecord('s2', 'new'))
+            recovered = await _wait_until(
+                lambda: stub.written['left over']
+                and stub.written['left by exited process']
+                and stub.written['new'],
+                10,
+            )
+            await queue.close()
+            claimed = not spool.exists() and not dead.exists()
+            ok &= recovered and claimed
+            print(
+                f'restart: leftover records sent={recovered}, '
+                f'leftover files claimed={claimed}'
+            )
+        finally:
+            await close_http_client()
+            await runner.cleanup()
+
+    print(f'ok={ok}')
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+    return asyncio.run(_run(args.records, args.latency))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Check for the streaming OSS uploader (utils/io_oss.upload_stream_to_oss)
+against a local OSS-compatible stub.
+
+The stub is an aiohttp server speaking the path-style subset oss2 uses:
+PutObject, InitiateMultipartUpload, UploadPart, CompleteMultipartUpload and
+AbortMultipartUpload. Every input kind (bytes, path, file-like, async reader,
+iterator, async iterator) is uploaded below and above the part size. The check
+verifies the stored bytes, whether multipart was used, and that no more than
+``parallel`` parts were in flight at once. A multipart upload whose second
+part is rejected must stop reading the source, and be aborted only once no
+part upload is still running.
+
+Usage (from project root):
+    uv run python scripts/check_oss_upload.py --size-mb 20
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from aiohttp import web
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.utils.io_oss import upload_stream_to_oss  # noqa: E402
+
+BUCKET = 'local-bucket'
+PART_SIZE = 256 * 1024
+PARALLEL = 3
+FAIL_PART = 2
+
+
+class OssStub:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.multipart_keys: set[str] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.in_flight_at_abort: Optional[int] = None
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=1024**3)
+        app.router.add_route('*', f'/{BUCKET}/{{key:.+}}', self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        key = request.match_info['key']
+        query = request.query
+        if request.method == 'POST' and 'uploads' in query:
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = {}
+            return self._xml(
+                '<InitiateMultipartUploadResult>'
+                f'<Bucket>{BUCKET}</Bucket><Key>{key}</Key>'
+                f'<UploadId>{upload_id}</UploadId>'
+                '</InitiateMultipartUploadResult>'
+            )
+        if request.method == 'PUT' and 'uploadId' in query:
+            if key.startswith('fail/') and query['partNumber'] == str(FAIL_PART):
+                await request.read()
+                return web.Response(status=403, text='rejected')
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                data = await request.read()
+                await asyncio.sleep(self.latency)
+            finally:
+                self.in_flight -= 1
+            self.uploads[query['uploadId']][int(query['partNumber'])] = data
+            return web.Response(headers={'ETag': f'"{query["partNumber"]}"'})
+        if request.method == 'POST' and 'uploadId' in query:
+            parts = self.uploads.pop(query['uploadId'])
+            self.objects[key] = b''.join(parts[n] for n in sorted(parts))
+            self.multipart_keys.add(key)
+            return self._xml(
+                '<CompleteMultipartUploadResult>'
+                f'<Bucket>{BUCKET}</Bucket><Key>{key}</Key><ETag>"0"</ETag>'
+                '</CompleteMultipartUploadResult>'
+            )
+        if request.method == 'DELETE' and 'uploadId' in query:
+            self.in_flight_at_abort = self.in_flight
+            self.uploads.pop(query['uploadId'], None)
+            return web.Response(status=204)
+        if request.method == 'PUT':
+            self.objects[key] = await request.read()
+            return web.Response(headers={'ETag': '"0"'})
+        return web.Response(status=405)
+
+    @staticmethod
+    def _xml(body: str) -> web.Response:
+        return web.Response(
+            text=f'<?xml version="1.0" encoding="UTF-8"?>{body}',
+            content_type='application/xml',
+        )
+
+
+def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def _achunks(data: bytes, size: int):
+    for chunk in _chunks(data, size):
+        await asyncio.sleep(0)
+        yield chunk
+
+
+class _CountingSource:
+    """Async iterator that records how many bytes were read from it."""
+
+    def __init__(self, data: bytes, size: int):
+        self.consumed = 0
+        self._chunks = _chunks(data, size)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        await asyncio.sleep(0)
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            raise StopAsyncIteration
+        self.consumed += len(chunk)
+        return chunk
+
+
+class _AsyncReader:
+    """Reader whose ``read`` is a coroutine, like aiohttp StreamReader / aiofiles."""
+
+    def __init__(self, data: bytes):
+        self._file = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        await asyncio.sleep(0)
+        return self._file.read(size)
+
+
+async def _run(size: int, latency: float) -> int:
+    stub = OssStub(latency)
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    os.environ.update(
+        OSS_ENDPOINT=f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}',
+        OSS_BUCKET_NAME=BUCKET,
+        OSS_ACCESS_KEY_ID='local',
+        OSS_ACCESS_KEY_SECRET='local',
+    )
+
+    failures = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for label, n_bytes in (('small', PART_SIZE // 2), ('large', size)):
+                payload = os.urandom(n_bytes)
+                path = Path(tmp) / f'{label}.bin'
+                path.write_bytes(payload)
+                sources = {
+                    'bytes': lambda payload=payload: payload,
+                    'path': lambda path=path: path,
+                    'file': lambda payload=payload: io.BytesIO(payload),
+                    'async_reader': lambda payload=payload: _AsyncReader(payload),
+                    'iterator': lambda payload=payload: _chunks(payload, 100_000),
+                    'async_iterator': lambda payload=payload: _achunks(
+                        payload, 100_000
+                    ),
+                }
+                for kind, make_source in sources.items():
+                    key = f'check/{label}_{kind}.bin'
+                    result = await upload_stream_to_oss(
+                        make_source(), key, part_size=PART_SIZE, parallel=PARALLEL
+                    )
+                    ok = (
+                        stub.objects.get(key) == payload
+                        and result.size == n_bytes
+                        and (key in stub.multipart_keys) == (n_bytes > PART_SIZE)
+                    )
+                    failures += not ok
+                    print(
+                        f'{label:>5} {kind:<14} size={n_bytes} '
+                        f'multipart={key in stub.multipart_keys} ok={ok}'
+                    )
+
+        source = _CountingSource(os.urandom(20 * PART_SIZE), 100_000)
+        try:
+            await upload_stream_to_oss(
+                source, 'fail/large.bin', part_size=PART_SIZE, parallel=PARALLEL
+            )
+            raised = False
+        except Exception:
+            raised = True
+        stopped = source.consumed <= (FAIL_PART + PARALLEL + 1) * PART_SIZE
+        drained = stub.in_flight_at_abort == 0 and not stub.uploads
+        print(
+            f'failed part: raised={raised}, read {source.consumed} of '
+            f'{20 * PART_SIZE} bytes, parts in flight at abort='
+            f'{stub.in_flight_at_abort} ok={raised and stopped and drained}'
+        )
+        failures += not (raised and stopped and drained)
+    finally:
+        await runner.cleanup()
+
+    bounded = stub.max_in_flight <= PARALLEL
+    print(f'max parts in flight={stub.max_in_flight} (limit {PARALLEL}) ok={bounded}')
+    return 0 if failures == 0 and bounded else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=float, default=4)
+    parser.add_argument('--latency', type=float, default=0.02, help='per-part delay')
+    args = parser.parse_args()
+    return asyncio.run(_run(int(args.size_mb * 1024 * 1024), args.latency))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Check the dependency-aware plan scheduler (flow_agents/execution_agent/scheduler.py).
+
+Covers step_dependencies (1-based ``depends_on``, ``None`` meaning the previous
+step, ``[]`` meaning independent, bad / forward / out-of-range entries
+ignored), count_in_flight and next_runnable_step for a chain, independent
+steps, max_in_flight saturation and a FAILED dependency blocking its
+dependents. A pass over a small plan is then replayed the way the execution
+agent drives it, checking the order steps are started in.
+
+Usage (from project root):
+    uv run python scripts/check_plan_scheduler.py
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.flow_agents.execution_agent.scheduler import (  # noqa: E402
+    count_in_flight,
+    is_step_ready,
+    next_runnable_step,
+    step_dependencies,
+)
+from agents.matmaster_agent.flow_agents.model import (  # noqa: E402
+    PlanStepStatusEnum,
+)
+from agents.matmaster_agent.state import StepKey  # noqa: E402
+
+PLAN = PlanStepStatusEnum.PLAN
+SUBMITTED = PlanStepStatusEnum.SUBMITTED
+SUCCESS = PlanStepStatusEnum.SUCCESS
+FAILED = PlanStepStatusEnum.FAILED
+
+
+def _steps(*specs) -> list[dict]:
+    """``specs`` are (status, depends_on) pairs; depends_on None is omitted."""
+    steps = []
+    for status, depends_on in specs:
+        step = {'status': status}
+        if depends_on is not None:
+            step[StepKey.DEPENDS_ON] = depends_on
+        steps.append(step)
+    return steps
+
+
+def _replay(steps: list[dict], max_in_flight: int) -> list[int]:
+    """
+    One execution pass: each picked step is submitted (async job) unless it
+    was already submitted, in which case its job is polled and succeeds.
+    """
+    started, visited = [], set()
+    while (index := next_runnable_step(steps, visited, max_in_flight)) is not None:
+        visited.add(index)
+        if steps[index]['status'] == SUBMITTED:
+            steps[index]['status'] = SUCCESS
+        else:
+            steps[index]['status'] = SUBMITTED
+            started.append(index)
+    return started
+
+
+def main() -> int:
+    argparse.ArgumentParser(description=__doc__.splitlines()[1]).parse_args()
+    errors = []
+
+    def expect(label, ok):
+        print(f'{"ok  " if ok else "FAIL"} {label}')
+        if not ok:
+            errors.append(label)
+
+    # 链式：缺省 depends_on 依赖上一步
+    chain = _steps((PLAN, None), (PLAN, None), (PLAN, None))
+    expect(
+        'missing depends_on waits for the previous step',
+        [step_dependencies(chain, i) for i in range(3)] == [[], [0], [1]],
+    )
+    expect('chain starts with step 1', next_runnable_step(chain, set(), 4) == 0)
+    chain[0]['status'] = SUBMITTED
+    expect('submitted step is polled', next_runnable_step(chain, set(), 4) == 0)
+    expect(
+        'chain waits on a submitted step',
+        next_runnable_step(chain, {0}, 4) is None,
+    )
+    chain[0]['status'] = SUCCESS
+    expect('chain moves on after success', next_runnable_step(chain, set(), 4) == 1)
+
+    # 独立步骤：已提交的任务不阻塞后续步骤
+    independent = _steps((SUBMITTED, []), (PLAN, []), (PLAN, []))
+    expect(
+        'independent step runs beside a submitted one',
+        next_runnable_step(independent, {0}, 2) == 1,
+    )
+    expect(
+        'depends_on [] has no dependencies',
+        step_dependencies(independent, 2) == [],
+    )
+
+    # 非法 / 越界 / 前向 / 自引用的 depends_on 被忽略
+    bad = _steps(
+        (PLAN, []),
+        (PLAN, []),
+        (PLAN, ['1', 0, -1, 3, 4, 9, 1.0, None, 2, 2]),
+    )
+    expect(
+        'bad, self, forward and out-of-range depends_on ignored',
+        step_dependencies(bad, 2) == [1],
+    )
+    expect(
+        'depends_on of only bad entries is independent',
+        step_dependencies(_steps((PLAN, []), (PLAN, [0, 2, 'x'])), 1) == [],
+    )
+    expect('first step never depends on anything', step_dependencies(chain, 0) == [])
+
+    # max_in_flight 饱和
+    saturated = _steps((SUBMITTED, []), (SUBMITTED, []), (PLAN, []))
+    expect('count_in_flight counts submitted steps', count_in_flight(saturated) == 2)
+    expect(
+        'no new step when max_in_flight is reached',
+        next_runnable_step(saturated, {0, 1}, 2) is None,
+    )
+    expect(
+        'new step once a slot is free',
+        next_runnable_step(saturated, {0, 1}, 3) == 2,
+    )
+
+    # 失败的依赖阻塞其后继，不阻塞无关步骤
+    failed = _steps((FAILED, []), (PLAN, [1]), (PLAN, []), (PLAN, [2]))
+    expect('dependent of a FAILED step is not ready', not is_step_ready(failed, 1))
+    expect(
+        'unrelated step runs past a FAILED one',
+        next_runnable_step(failed, {0}, 4) == 2,
+    )
+    expect(
+        'transitive dependent stays blocked',
+        next_runnable_step(failed, {0, 2}, 4) is None,
+    )
+
+    # 按执行 agent 的方式回放：1、2 独立，3 依赖 1 和 2，4 依赖上一步
+    plan = _steps((PLAN, []), (PLAN, []), (PLAN, [1, 2]), (PLAN, None))
+    started = _replay(plan, max_in_flight=2)
+    expect(
+        f'replayed pass starts steps in dependency order {started}',
+        started == [0, 1] and plan[2]['status'] == PLAN,
+    )
+    started = _replay(plan, max_in_flight=2)
+    expect(
+        f'next pass starts the joined step {started}',
+        started == [2] and plan[3]['status'] == PLAN,
+    )
+
+    print('OK' if not errors else f'{len(errors)} checks failed')
+    return 0 if not errors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
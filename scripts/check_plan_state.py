@@ -0,0 +1,143 @@
+"""
+Check the copy-on-write plan updates against the former deepcopy-and-mutate.
+
+Random step update sequences (status, retry_count, description, tool_name
+changes as done by the execution loop) are applied to a plan both ways; the
+resulting plans must be equal after every update, diff_steps + apply_step_deltas
+must rebuild each new plan from the previous one, and earlier snapshots must be
+left untouched. Also reports the time per update and how many step dicts each
+new plan shares with the previous one.
+
+Usage (from project root):
+    uv run python scripts/check_plan_state.py --steps 8 --updates 2000
+"""
+
+import argparse
+import copy
+import random
+import sys
+import time
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.flow_agents.plan_state import (  # noqa: E402
+    StepDelta,
+    apply_step_deltas,
+    diff_steps,
+    loggable_state_delta,
+    with_step_fields,
+)
+from agents.matmaster_agent.state import PLAN  # noqa: E402
+
+_STATUSES = ['plan', 'process', 'submitted', 'success', 'failed']
+
+
+def _plan(n_steps: int) -> dict:
+    return {
+        'intro': '计划简介',
+        'overall': '计划总结',
+        'steps': [
+            {
+                'tool_name': f'tool_{i}',
+                'step_description': f'第 {i + 1} 步：' + '描述' * 40,
+                'status': 'plan',
+                'retry_count': 0,
+                'depends_on': list(range(i)),
+            }
+            for i in range(n_steps)
+        ],
+    }
+
+
+def _updates(rng: random.Random, n_steps: int, n: int) -> list[StepDelta]:
+    updates = []
+    for _ in range(n):
+        fields = {'status': rng.choice(_STATUSES)}
+        if rng.random() < 0.3:
+            fields['retry_count'] = rng.randint(0, 3)
+        if rng.random() < 0.2:
+            fields['step_description'] = f'重试说明 {rng.random():.6f}'
+        if rng.random() < 0.1:
+            fields['tool_name'] = f'alt_tool_{rng.randrange(10)}'
+        updates.append(StepDelta(rng.randrange(n_steps), fields))
+    return updates
+
+
+def legacy_update(plan: dict, update: StepDelta) -> dict:
+    new_plan = copy.deepcopy(plan)
+    for key, value in update.fields.items():
+        new_plan['steps'][update.index][key] = value
+    return new_plan
+
+
+def cow_update(plan: dict, update: StepDelta) -> dict:
+    return with_step_fields(plan, update.index, **update.fields)
+
+
+def check(plan: dict, updates: list[StepDelta]) -> list[str]:
+    errors = []
+    legacy, cow = plan, plan
+    snapshots = []
+    for i, update in enumerate(updates):
+        legacy = legacy_update(legacy, update)
+        previous, cow = cow, cow_update(cow, update)
+        snapshots.append((previous, copy.deepcopy(previous)))
+        if legacy != cow:
+            errors.append(f'update {i}: plans differ')
+        deltas = diff_steps(previous, cow)
+        if deltas is None or apply_step_deltas(previous, deltas) != cow:
+            errors.append(f'update {i}: diff/apply does not rebuild the plan')
+        logged = loggable_state_delta({PLAN: previous}, {PLAN: cow})
+        if logged[PLAN] != [{'step': d.index, **d.fields} for d in deltas or []]:
+            errors.append(f'update {i}: unexpected logged delta {logged[PLAN]}')
+    for i, (snapshot, frozen) in enumerate(snapshots):
+        if snapshot != frozen:
+            errors.append(f'snapshot {i} was mutated by a later update')
+    return errors
+
+
+def timed(update_fn, plan: dict, updates: list[StepDelta]) -> tuple[float, float]:
+    shared = 0
+    t0 = time.perf_counter()
+    for update in updates:
+        new_plan = update_fn(plan, update)
+        shared += sum(a is b for a, b in zip(plan['steps'], new_plan['steps']))
+        plan = new_plan
+    elapsed = (time.perf_counter() - t0) / len(updates) * 1e6
+    return elapsed, shared / len(updates)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--steps', type=int, default=8)
+    parser.add_argument('--updates', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    plan = _plan(args.steps)
+    updates = _updates(rng, args.steps, args.updates)
+
+    errors = check(plan, updates)
+    for error in errors[:10]:
+        print(f'FAIL {error}')
+
+    print(f'plan steps={args.steps} updates={args.updates}')
+    for label, update_fn in (
+        ('deepcopy', legacy_update),
+        ('copy-on-write', cow_update),
+    ):
+        us, shared = timed(update_fn, plan, updates)
+        print(
+            f'{label:>14}: {us:8.2f} us / update, '
+            f'{shared:.1f}/{args.steps} steps shared with previous plan'
+        )
+    print('OK' if not errors else f'{len(errors)} errors')
+    return 0 if not errors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
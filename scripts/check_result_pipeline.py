@@ -0,0 +1,202 @@
+"""
+End-to-end check for services/job.parse_and_prepare_results against local
+stand-ins: one aiohttp server plays the Bohrium file-token API, the job file
+host (iterate / download / downloadr) and a path-style OSS bucket.
+
+It checks that the returned mapping keeps results.txt order, skips missing
+files, points at the expected OSS paths and that every uploaded object
+matches the remote bytes. Pass --files to stress the concurrency bound. A
+second run fails one download: the error must propagate and the sibling
+transfers must stop, so no upload reaches OSS after the call has returned.
+
+Usage (from project root):
+    uv run python scripts/check_result_pipeline.py --files 40
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path, PosixPath
+
+import jsonpickle
+from aiohttp import web
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.services import job as job_service  # noqa: E402
+from agents.matmaster_agent.services.http_client import (  # noqa: E402
+    close_http_client,
+)
+
+JOB_ROOT = 'jobs/1/abc/'
+BUCKET = 'local-bucket'
+
+
+class FakeBackend:
+    def __init__(self, n_files: int, latency: float, fail: str = ''):
+        self.latency = latency
+        self.fail = fail
+        self.files = {
+            f'{JOB_ROOT}out_{i}.dat': os.urandom(2048 + i) for i in range(n_files)
+        }
+        self.files[f'{JOB_ROOT}trajs_files/traj.xyz'] = b'3\n\nH 0 0 0\n' * 100
+        self.dirs = {f'{JOB_ROOT}plots/'}
+        self.results = {'energy': -1.25, 'message': 'ok'}
+        self.results.update(
+            {f'file_{i}': PosixPath(f'out_{i}.dat') for i in range(n_files)}
+        )
+        self.results['traj'] = PosixPath('trajs_files/traj.xyz')
+        self.results['plots'] = PosixPath('plots')
+        self.results['missing'] = PosixPath('not_there.dat')
+        self.files[f'{JOB_ROOT}results.txt'] = jsonpickle.dumps(self.results).encode()
+        self.uploaded: dict[str, bytes] = {}
+        self.upload_times: list[float] = []
+        self.listings = 0
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024**2)
+        app.router.add_post('/token', self.token)
+        app.router.add_post('/api/iterate', self.iterate)
+        app.router.add_get('/api/download/{path:.+}', self.download)
+        app.router.add_post('/api/downloadr', self.downloadr)
+        app.router.add_put(f'/{BUCKET}/{{key:.+}}', self.oss_put)
+        return app
+
+    async def token(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        path = JOB_ROOT + (body['filePath'] or 'results.txt')
+        host = f'{request.scheme}://{request.host}'
+        return web.json_response({'data': {'host': host, 'path': path, 'token': 't'}})
+
+    async def iterate(self, request: web.Request) -> web.Response:
+        self.listings += 1
+        await asyncio.sleep(self.latency)
+        prefix = (await request.json())['prefix']
+        objects = [
+            {'path': path, 'isDir': False}
+            for path in self.files
+            if path.startswith(prefix) and '/' not in path[len(prefix) :]
+        ]
+        objects += [
+            {'path': d, 'isDir': True} for d in self.dirs if d.startswith(prefix)
+        ]
+        return web.json_response({'data': {'objects': objects}})
+
+    async def download(self, request: web.Request) -> web.Response:
+        if self.fail and request.match_info['path'].endswith(self.fail):
+            return web.Response(status=404)
+        await asyncio.sleep(self.latency)
+        return web.Response(body=self.files[request.match_info['path']])
+
+    async def downloadr(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+        target = (await request.json())['targetDir']
+        return web.Response(body=f'zip of {target}'.encode())
+
+    async def oss_put(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+        self.uploaded[request.match_info['key']] = await request.read()
+        self.upload_times.append(time.monotonic())
+        return web.Response(headers={'ETag': '"0"'})
+
+    def expected(self) -> dict:
+        base = f'https://{BUCKET}.oss-cn-zhangjiakou.aliyuncs.com/agent/{JOB_ROOT}'
+        expected = {}
+        for key, value in self.results.items():
+            if not isinstance(value, Path):
+                expected[key] = value
+            elif key == 'plots':
+                expected[key] = f'{base}plots.zip'
+            elif key != 'missing':
+                expected[key] = f'{base}{value.name}'
+        return expected
+
+
+async def _serve(backend: FakeBackend) -> web.AppRunner:
+    runner = web.AppRunner(backend.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+
+    job_service.OPENAPI_FILE_TOKEN_API = f'{base}/token'
+    job_service.TIEFBLUE_NAS_HOST = base
+    os.environ.update(
+        OSS_ENDPOINT=base,
+        OSS_BUCKET_NAME=BUCKET,
+        OSS_ACCESS_KEY_ID='local',
+        OSS_ACCESS_KEY_SECRET='local',
+    )
+    return runner
+
+
+async def _run_failing(n_files: int, latency: float) -> bool:
+    backend = FakeBackend(n_files, latency, fail='out_0.dat')
+    runner = await _serve(backend)
+    try:
+        try:
+            await job_service.parse_and_prepare_results(job_id='1', access_key='k')
+            raised = False
+        except Exception:
+            raised = True
+        returned_at = time.monotonic()
+        # 给仍在运行的传输留出完成时间
+        await asyncio.sleep(latency * 4)
+    finally:
+        await close_http_client()
+        await runner.cleanup()
+
+    late = sum(t > returned_at for t in backend.upload_times)
+    ok = raised and late == 0
+    print(
+        f'failed download: raised={raised}, uploads after return={late}, '
+        f'uploads before={len(backend.upload_times) - late} ok={ok}'
+    )
+    return ok
+
+
+async def _run(n_files: int, latency: float) -> int:
+    backend = FakeBackend(n_files, latency)
+    runner = await _serve(backend)
+
+    try:
+        t0 = time.perf_counter()
+        result = await job_service.parse_and_prepare_results(job_id='1', access_key='k')
+        elapsed = time.perf_counter() - t0
+    finally:
+        await close_http_client()
+        await runner.cleanup()
+
+    expected = backend.expected()
+    ok = list(result.items()) == list(expected.items())
+    for key, value in backend.files.items():
+        name = Path(key).name
+        if name != 'results.txt' and not key.endswith('not_there.dat'):
+            ok &= backend.uploaded.get(f'agent/{JOB_ROOT}{name}') == value
+    ok &= (
+        backend.uploaded.get(f'agent/{JOB_ROOT}plots.zip')
+        == b'zip of jobs/1/abc/plots/'
+    )
+
+    print(
+        f'files={len(backend.results)} elapsed={elapsed:.2f}s '
+        f'listings={backend.listings} identical={ok}'
+    )
+    ok &= await _run_failing(n_files, latency)
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.05, help='per-request delay')
+    args = parser.parse_args()
+    return asyncio.run(_run(args.files, args.latency))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
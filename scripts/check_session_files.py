@@ -0,0 +1,216 @@
+"""
+Check for the session file index (services/session_files.py) against a local
+stand-in of the tools server.
+
+1. --calls concurrent tool callbacks of a fresh session share one GET, and
+   later lookups make no request at all;
+2. files recorded through insert_session_files are found right away, files
+   another worker adds show up after the TTL via a background refresh, and
+   resolve() finds such a file before the TTL with one awaited refresh;
+3. index.match agrees with the linear scan the callbacks used before on
+   names without ambiguity, prefers an exact or '/'-aligned suffix hit over
+   an earlier substring hit (where the scan returned the earlier file), and
+   is timed against the scan for --files session files;
+4. parse_result registers all file URLs of a result with one POST, results
+   collected in a SessionFileBatch share one POST, and files the session
+   already has are not sent again.
+
+Usage (from project root):
+    uv run python scripts/check_session_files.py --calls 20 --files 500
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from aiohttp import web
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.services import session_files  # noqa: E402
+from agents.matmaster_agent.services.http_client import (  # noqa: E402
+    close_http_client,
+)
+from agents.matmaster_agent.utils.result_parse_utils import (  # noqa: E402
+    parse_result,
+)
+
+OSS = 'https://bohrium.oss-cn-zhangjiakou.aliyuncs.com/13756/27666/store'
+
+
+class ToolsServerStub:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.files: dict[str, list[str]] = {}
+        self.gets = 0
+        self.posts = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/api/v1/sessions/{sid}/files', self.list_files)
+        app.router.add_post('/api/v1/sessions/{sid}/files', self.add_files)
+        return app
+
+    async def list_files(self, request: web.Request) -> web.Response:
+        self.gets += 1
+        await asyncio.sleep(self.latency)
+        files = self.files.get(request.match_info['sid'], [])
+        return web.json_response({'data': {'files': list(files)}})
+
+    async def add_files(self, request: web.Request) -> web.Response:
+        self.posts += 1
+        files = self.files.setdefault(request.match_info['sid'], [])
+        files.extend((await request.json())['files'])
+        return web.json_response({'data': {'files': list(files)}})
+
+
+def _linear_match(file_path: str, files: list[str]):
+    """The scan the callbacks used before the index."""
+    for url in files:
+        if file_path in url or url.endswith('/' + file_path):
+            return url
+    return None
+
+
+async def _run(calls: int, n_files: int, latency: float) -> int:
+    stub = ToolsServerStub(latency)
+    runner = web.AppRunner(stub.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    session_files.MATMASTER_TOOLS_SERVER = (
+        f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+    )
+
+    files = [f'{OSS}/job_{i}/outputs/structure_{i}.cif' for i in range(n_files)]
+    files.append(f'{OSS}/upload/POSCAR')
+    stub.files['s1'] = list(files)
+    ok = True
+    try:
+        # 1. 并发首查只发一次 GET，之后不再访问服务
+        indexes = await asyncio.gather(
+            *(session_files.get_session_file_index('s1') for _ in range(calls))
+        )
+        first_gets = stub.gets
+        for _ in range(calls):
+            await session_files.get_session_file_index('s1')
+        shared = first_gets == 1 and stub.gets == 1 and len(indexes[0]) == len(files)
+        ok &= shared
+        print(
+            f'{calls} concurrent lookups -> {first_gets} GET; '
+            f'{calls} more lookups -> {stub.gets - first_gets} GET'
+        )
+
+        # 2. 本进程写入立即可见；其他 worker 写入在 TTL 后后台刷新
+        new_url = f'{OSS}/job_new/outputs/relaxed.cif'
+        await session_files.insert_session_files('s1', [new_url])
+        index = await session_files.get_session_file_index('s1')
+        inserted = index.match('relaxed.cif') == new_url and stub.gets == 1
+        stub.files['s1'].append(f'{OSS}/other_worker/band.png')
+        index.refreshed_at -= session_files.SESSION_FILE_INDEX_TTL
+        await session_files.get_session_file_index('s1')
+        await asyncio.sleep(latency * 2 + 0.1)
+        refreshed = index.match('band.png') is not None and stub.gets == 2
+        other_url = f'{OSS}/other_worker/dos.png'
+        stub.files['s1'].append(other_url)
+        gets = stub.gets
+        resolved = (
+            index.match('dos.png') is None
+            and await index.resolve('dos.png') == other_url
+            and stub.gets == gets + 1
+        )
+        ok &= inserted and refreshed and resolved
+        print(
+            f'insert visible={inserted}; stale index refreshed in background={refreshed}; '
+            f'miss resolved with one refresh={resolved}'
+        )
+
+        # 3. 无歧义时与线性扫描结果一致，并比较耗时
+        queries = [
+            'structure_7.cif',
+            f'outputs/structure_{n_files - 1}.cif',
+            'POSCAR',
+            'relaxed.cif',
+            files[3],
+            'structure_1',
+            'missing.cif',
+        ]
+        all_files = list(index.files)
+        agree = all(index.match(q) == _linear_match(q, all_files) for q in queries)
+        # 精确/后缀命中优先于更早文件的子串命中，线性扫描返回的是后者
+        ambiguous = session_files.SessionFileIndex(
+            [f'{OSS}/a/my_POSCAR', f'{OSS}/b/POSCAR']
+        )
+        prefers_suffix = (
+            ambiguous.match('POSCAR') == f'{OSS}/b/POSCAR'
+            and _linear_match('POSCAR', ambiguous.files) == f'{OSS}/a/my_POSCAR'
+        )
+        ok &= agree and prefers_suffix
+        rounds = 200
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for q in queries[:5]:
+                _linear_match(q, all_files)
+        linear = (time.perf_counter() - t0) / (rounds * 5) * 1e6
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for q in queries[:5]:
+                index.match(q)
+        indexed = (time.perf_counter() - t0) / (rounds * 5) * 1e6
+        print(
+            f'match agrees with linear scan={agree}; suffix hit preferred over '
+            f'earlier substring hit={prefers_suffix}; per lookup over '
+            f'{len(all_files)} files: linear {linear:.1f} us, index {indexed:.2f} us'
+        )
+
+        # 4. 结果文件批量写入并去重
+        ctx = SimpleNamespace(session=SimpleNamespace(id='s2'))
+        result = {
+            'energy': -3.7,
+            'outputs': {
+                f'file_{i}': f'{OSS}/job_s2/outputs/{i}.cif' for i in range(30)
+            },
+        }
+        posts = stub.posts
+        parsed = await parse_result(ctx, result)
+        one_post = stub.posts - posts == 1 and len(stub.files['s2']) == 30
+        posts = stub.posts
+        await parse_result(ctx, result)
+        deduped = stub.posts == posts
+        batch = session_files.SessionFileBatch('s2')
+        for job in range(5):
+            job_result = {f'f{i}': f'{OSS}/job_{job}/out_{i}.png' for i in range(4)}
+            await parse_result(ctx, job_result, batch)
+        await session_files.get_session_file_index('s2')
+        collected = stub.posts == posts
+        inserted = await batch.flush()
+        batched = stub.posts - posts == 1 and len(inserted) == 20
+        ok &= one_post and deduped and collected and batched
+        print(
+            f'parse_result: {len(parsed)} items, 30 files in one POST={one_post}; '
+            f'repeat skipped={deduped}; 5 results batched into one POST={batched}'
+        )
+    finally:
+        await close_http_client()
+        await runner.cleanup()
+
+    print(f'ok={ok}')
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--files', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args()
+    return asyncio.run(_run(args.calls, args.files, args.latency))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
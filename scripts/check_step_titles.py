@@ -0,0 +1,174 @@
+"""
+Check the template step titles and the background LLM title refinement.
+
+Every tool of ALL_TOOLS is titled with a Chinese, an English and an empty
+step description, without and with tool arguments, in both locales; titles
+must be non-empty, single-line, within MAX_TITLE_WIDTH and identical on
+repeated calls, start with the first clause of the step description when there
+is one and only name the tool when there is none. refine_step_title is run against a fake LLM in place
+of MatMasterLlmConfig.tool_schema_model (a title, then a failure), and the
+time to the step start is compared with awaiting a --latency LLM title as the
+execution loop did before.
+
+Usage (from project root):
+    uv run python scripts/check_step_titles.py --latency 1.5 --samples 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+from google.adk.models import LlmResponse
+from google.genai.types import Content, Part
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.flow_agents.step_title_agent import (  # noqa: E402
+    title as step_title,
+)
+from agents.matmaster_agent.locales import i18n  # noqa: E402
+from agents.matmaster_agent.sub_agents.tools import ALL_TOOLS  # noqa: E402
+
+_DESCRIPTIONS = (
+    '对上传的结构进行计算，得到目标性质。随后整理结果。',
+    'Compute the target property of the uploaded structure. '
+    'Then summarize the results.',
+    '',
+)
+_TOOL_ARGS = {
+    'input_structure': 'https://bohrium.oss/job_1/outputs/Si_relaxed.cif',
+    'functional': 'PBE',
+    'kpoint_density': 0.25,
+}
+
+
+class FakeLlm:
+    """Stands in for the LiteLlm of MatMasterLlmConfig.tool_schema_model."""
+
+    model = 'fake/title-model'
+
+    def __init__(self, title, latency: float = 0.0):
+        self.title = title
+        self.latency = latency
+        self.requests = []
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        self.requests.append(llm_request)
+        await asyncio.sleep(self.latency)
+        if self.title is None:
+            raise RuntimeError('fake completion failure')
+        yield LlmResponse(
+            content=Content(
+                role='model', parts=[Part(text=json.dumps({'title': self.title}))]
+            )
+        )
+
+
+async def _check_refine(latency: float) -> list[str]:
+    errors = []
+    step = {'tool_name': next(iter(ALL_TOOLS)), 'step_description': '计算能带结构'}
+    llm = FakeLlm('能带结构计算')
+    refined = await step_title.refine_step_title(step, 'Chinese', llm=llm)
+    if refined != '能带结构计算':
+        errors.append(f'refined title = {refined!r}')
+    request = llm.requests[0]
+    if request.model != llm.model or 'Chinese' not in str(
+        request.config.system_instruction
+    ):
+        errors.append('refinement request lacks the model or the instruction')
+    failed = await step_title.refine_step_title(step, 'Chinese', llm=FakeLlm(None))
+    if failed is not None:
+        errors.append(f'failed refinement returned {failed!r}')
+
+    # 旧流程：等待 LLM 标题后才开始步骤；新流程：模板标题后立即开始，LLM 标题在后台
+    slow = FakeLlm('能带结构计算', latency)
+    t0 = time.perf_counter()
+    await step_title.refine_step_title(step, 'Chinese', llm=slow)
+    awaited = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    step_title.template_step_title(step, 'zh')
+    task = asyncio.create_task(step_title.refine_step_title(step, 'Chinese', llm=slow))
+    started = time.perf_counter() - t0
+    task.cancel()
+
+    print(
+        f'time to step start: awaited LLM title {awaited * 1000:.0f} ms, '
+        f'template + background refinement {started * 1000:.2f} ms'
+    )
+    return errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--latency', type=float, default=1.5)
+    parser.add_argument('--samples', type=int, default=5)
+    args = parser.parse_args()
+
+    errors = []
+    steps = [
+        {'tool_name': tool, 'step_description': description}
+        for tool in ALL_TOOLS
+        for description in _DESCRIPTIONS
+    ]
+    calls = 0
+    t0 = time.perf_counter()
+    for language in ('zh', 'en'):
+        i18n.language = language
+        for step in steps:
+            clause = step_title._first_clause(step['step_description'])
+            for tool_args in (None, _TOOL_ARGS):
+                title = step_title.template_step_title(step, tool_args=tool_args)
+                if (
+                    not title
+                    or '\n' in title
+                    or step_title.title_width(title) > step_title.MAX_TITLE_WIDTH
+                    or title
+                    != step_title.template_step_title(step, tool_args=tool_args)
+                    or (clause and not title.startswith(clause[:8]))
+                    or (clause and step['tool_name'] in title)
+                ):
+                    errors.append(f'{language} {step["tool_name"]}: {title!r}')
+                calls += 2
+    per_title = (time.perf_counter() - t0) / calls * 1e6
+
+    no_description = {'tool_name': next(iter(ALL_TOOLS)), 'step_description': ''}
+    if step_title.template_step_title(no_description, 'zh') != i18n.t(
+        'StepTitleFallback', language='zh', tool_name=no_description['tool_name']
+    ):
+        errors.append('tool name is not the fallback without a description')
+
+    unknown = {'tool_name': 'not_a_tool', 'step_description': '计算能带结构。然后作图'}
+    if step_title.template_step_title(unknown, 'zh') != '计算能带结构':
+        errors.append('description clause is not the title of unknown tools')
+
+    for language, description in (('zh', _DESCRIPTIONS[0]), ('en', _DESCRIPTIONS[1])):
+        i18n.language = language
+        for tool in list(ALL_TOOLS)[: args.samples]:
+            for step in (
+                {'tool_name': tool, 'step_description': description},
+                {'tool_name': tool, 'step_description': ''},
+            ):
+                print(f'[{language}] {step_title.template_step_title(step)}')
+                print(
+                    f'[{language}] '
+                    f'{step_title.template_step_title(step, tool_args=_TOOL_ARGS)}'
+                )
+
+    logging.disable(logging.WARNING)
+    errors += asyncio.run(_check_refine(args.latency))
+    for error in errors[:10]:
+        print(f'FAIL {error}')
+    print(f'{2 * len(steps)} template titles, {per_title:.1f} us / title')
+    print('OK' if not errors else f'{len(errors)} errors')
+    return 0 if not errors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
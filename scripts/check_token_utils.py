@@ -0,0 +1,177 @@
+"""
+Check the incremental history trimming of utils/token_utils.py against the
+former uncached loop.
+
+A synthetic session grows by --turns turns (user text, function call,
+function response, model text); before every model call the history is deep
+copied like ADK does and trimmed both ways. The (count, tokens) results must
+match after every turn, also with two interleaved sessions, a history edited
+in the middle and a history that shrank. Encode calls and time per model call
+are reported for both.
+
+--encoder bytes uses a tiktoken encoding with the gpt-4 split pattern and
+byte-level ranks instead of the gpt-4 one, for machines that cannot download
+the gpt-4 ranks; counts differ, the trimming logic under test is the same.
+
+Usage (from project root):
+    uv run python scripts/check_token_utils.py --turns 200 --max-tokens 20000
+"""
+
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+
+import tiktoken
+from google.genai.types import Content, FunctionCall, FunctionResponse, Part
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.utils import token_utils  # noqa: E402
+
+# tiktoken_ext/openai_public.py cl100k_base
+_CL100K_PAT_STR = r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+
+
+class CountingEncoding:
+    """Wraps an encoding and counts encode() calls."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.calls = 0
+
+    def encode(self, text: str) -> list:
+        self.calls += 1
+        return self.encoding.encode(text)
+
+
+def byte_encoding() -> tiktoken.Encoding:
+    """A tiktoken encoding with the cl100k split pattern and byte-only ranks."""
+    return tiktoken.Encoding(
+        name='bytes',
+        pat_str=_CL100K_PAT_STR,
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+
+
+def baseline(contents, max_tokens, encoding) -> tuple[int, int]:
+    """The loop filter_safety_content ran before: re-encode from the newest."""
+    kept, record_tokens = 0, 0
+    for content in contents[::-1]:
+        current_tokens = 0
+        for part in content.parts:
+            if part.text:
+                current_tokens += len(encoding.encode(part.text))
+            elif part.function_call:
+                current_tokens += len(encoding.encode(str(part.function_call.args)))
+            elif part.function_response:
+                current_tokens += len(
+                    encoding.encode(str(part.function_response.response))
+                )
+        if record_tokens + current_tokens < max_tokens:
+            record_tokens += current_tokens
+            kept += 1
+        else:
+            break
+    return kept, record_tokens
+
+
+def turn(i: int) -> list[Content]:
+    return [
+        Content(role='user', parts=[Part(text=f'第 {i} 轮：计算结构 {i} 的能带。')]),
+        Content(
+            role='model',
+            parts=[
+                Part(
+                    function_call=FunctionCall(
+                        name='band_structure', args={'structure': f'Si_{i}.cif'}
+                    )
+                )
+            ],
+        ),
+        Content(
+            role='user',
+            parts=[
+                Part(
+                    function_response=FunctionResponse(
+                        name='band_structure',
+                        response={'result': [f'{i}.{k} eV' for k in range(40)]},
+                    )
+                )
+            ],
+        ),
+        Content(role='model', parts=[Part(text=f'结构 {i} 的带隙为 {i % 7}.1 eV。')]),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--max-tokens', type=int, default=20000)
+    parser.add_argument('--encoder', choices=('gpt-4', 'bytes'), default='gpt-4')
+    args = parser.parse_args()
+
+    if args.encoder == 'bytes':
+        encoding = CountingEncoding(byte_encoding())
+    else:
+        encoding = CountingEncoding(token_utils.get_encoding())
+    token_utils.get_encoding = lambda: encoding
+
+    errors = []
+
+    def compare(label, contents, history_key):
+        # ADK 每次模型调用都深拷贝历史
+        request_contents = copy.deepcopy(contents)
+        calls = encoding.calls
+        t0 = time.perf_counter()
+        cached = token_utils.latest_contents_within_limit(
+            request_contents, args.max_tokens, history_key=history_key
+        )
+        cached_time = time.perf_counter() - t0
+        cached_calls = encoding.calls - calls
+        request_contents = copy.deepcopy(contents)
+        calls = encoding.calls
+        t0 = time.perf_counter()
+        expected = baseline(request_contents, args.max_tokens, encoding)
+        baseline_time = time.perf_counter() - t0
+        baseline_calls = encoding.calls - calls
+        if cached != expected:
+            errors.append(f'{label}: {cached} != {expected}')
+        return cached_time, cached_calls, baseline_time, baseline_calls
+
+    history, other = [], []
+    totals = [0.0, 0, 0.0, 0]
+    for i in range(args.turns):
+        history += turn(i)
+        other += turn(args.turns + i)
+        measured = compare(f'turn {i}', history, ('s1', 'agent'))
+        totals = [total + value for total, value in zip(totals, measured)]
+        compare(f'other session turn {i}', other, ('s2', 'agent'))
+
+    edited = copy.deepcopy(history)
+    edited[len(edited) // 2].parts[0].text = '已编辑'
+    compare('history edited in the middle', edited, ('s1', 'agent'))
+    compare('history shrank', history[: len(history) // 3], ('s1', 'agent'))
+    compare('no history key', history, None)
+    compare('empty history', [], ('s3', 'agent'))
+
+    cached_time, cached_calls, baseline_time, baseline_calls = (
+        total / args.turns for total in totals
+    )
+    print(
+        f'{args.turns} turns, {len(history)} contents, per model call: '
+        f'incremental {cached_time * 1000:.2f} ms ({cached_calls:.1f} encodes), '
+        f'uncached {baseline_time * 1000:.2f} ms ({baseline_calls:.1f} encodes)'
+    )
+    for error in errors[:10]:
+        print(f'FAIL {error}')
+    print('OK' if not errors else f'{len(errors)} mismatches')
+    return 0 if not errors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
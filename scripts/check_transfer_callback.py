@@ -0,0 +1,210 @@
+"""
+Check the check_transfer after-model callback against a fake completion backend.
+
+The backend answers after --latency seconds and counts its calls, so the
+checks need no LLM: a transfer is added to a text-only response, a repeated
+response is answered from the cache, a valid transfer_to_agent call skips the
+LLM, concurrent identical checks share one request, a failed completion is not
+cached, and concurrent checks of different responses do not block the event
+loop (max loop lag is reported next to that of the former blocking call).
+
+Usage (from project root):
+    uv run python scripts/check_transfer_callback.py --latency 0.05 --sessions 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from google.adk.models import LlmResponse
+from google.genai.types import Content, FunctionCall, Part
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.base_callbacks.public_callback import (  # noqa: E402
+    check_transfer,
+    clear_transfer_check_cache,
+    transfer_check_stats,
+)
+from agents.matmaster_agent.sub_agents.MrDice_agent.constant import (  # noqa: E402
+    MrDiceTargetAgentEnum,
+)
+from agents.matmaster_agent.sub_agents.MrDice_agent.prompt import (  # noqa: E402
+    MrDiceCheckTransferPrompt,
+)
+
+_CTX = SimpleNamespace(agent_name='MrDice_agent')
+
+
+class FakeCompletion:
+    """Async completion backend: transfers to optimade_agent unless told to fail."""
+
+    def __init__(self, latency: float, blocking: bool = False):
+        self.latency = latency
+        self.blocking = blocking
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self, model, messages, response_format):
+        self.calls += 1
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        content = None
+        if not self.fail:
+            content = json.dumps(
+                {
+                    'is_transfer': True,
+                    'target_agent': 'optimade_agent',
+                    'reason': 'fake',
+                }
+            )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+
+def _response(text: str, transfer_to: str = None) -> LlmResponse:
+    parts = [Part(text=text)]
+    if transfer_to:
+        parts.append(
+            Part(
+                function_call=FunctionCall(
+                    name='transfer_to_agent', args={'agent_name': transfer_to}
+                )
+            )
+        )
+    return LlmResponse(content=Content(role='model', parts=parts))
+
+
+def _transfer_of(response) -> str:
+    if response is None:
+        return ''
+    calls = [p.function_call for p in response.content.parts if p.function_call]
+    return calls[0].args['agent_name'] if calls else ''
+
+
+async def _max_loop_lag(make_coro) -> tuple[float, object]:
+    """Run ``make_coro()`` while measuring the longest time the event loop was blocked."""
+    lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - t0 - 0.001)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    try:
+        result = await make_coro()
+    finally:
+        done = True
+        await task
+    return lag, result
+
+
+async def run(latency: float, sessions: int) -> list[str]:
+    errors = []
+    backend = FakeCompletion(latency)
+    callback = check_transfer(
+        MrDiceCheckTransferPrompt, MrDiceTargetAgentEnum, completion=backend
+    )
+
+    def expect(label, ok):
+        print(f'{"ok  " if ok else "FAIL"} {label}')
+        if not ok:
+            errors.append(label)
+
+    result = await callback(_CTX, _response('我将为你在 OPTIMADE 中检索结构'))
+    expect(
+        'text-only response gets transfer_to_agent',
+        _transfer_of(result) == 'optimade_agent',
+    )
+    expect('one completion call', backend.calls == 1)
+
+    result = await callback(_CTX, _response('我将为你在 OPTIMADE 中检索结构'))
+    expect('repeated response answered from cache', backend.calls == 1)
+    expect(
+        'cached result still adds the transfer',
+        _transfer_of(result) == 'optimade_agent',
+    )
+
+    result = await callback(_CTX, _response('转交 mofdb', transfer_to='mofdb_agent'))
+    expect(
+        'valid transfer_to_agent skips the LLM', result is None and backend.calls == 1
+    )
+
+    await callback(_CTX, _response('转交', transfer_to='unknown_agent'))
+    expect('unknown transfer target is still judged', backend.calls == 2)
+
+    calls = backend.calls
+    await asyncio.gather(*(callback(_CTX, _response('同一条回复')) for _ in range(5)))
+    expect('concurrent identical checks share one call', backend.calls == calls + 1)
+
+    backend.fail = True
+    calls = backend.calls
+    result = await callback(_CTX, _response('失败的回复'))
+    expect('failed completion returns None', result is None)
+    backend.fail = False
+    result = await callback(_CTX, _response('失败的回复'))
+    expect('failed completion is not cached', backend.calls == calls + 2)
+
+    clear_transfer_check_cache()
+    t0 = time.perf_counter()
+    lag, _ = await _max_loop_lag(
+        lambda: asyncio.gather(
+            *(callback(_CTX, _response(f'会话 {i} 的回复')) for i in range(sessions))
+        )
+    )
+    elapsed = time.perf_counter() - t0
+    expect(
+        f'{sessions} concurrent checks overlap ({elapsed * 1000:.0f} ms)',
+        elapsed < latency * sessions / 2,
+    )
+
+    blocking = check_transfer(
+        MrDiceCheckTransferPrompt,
+        MrDiceTargetAgentEnum,
+        completion=FakeCompletion(latency, blocking=True),
+    )
+    clear_transfer_check_cache()
+    blocking_lag, _ = await _max_loop_lag(
+        lambda: asyncio.gather(
+            *(blocking(_CTX, _response(f'阻塞 {i}')) for i in range(sessions))
+        )
+    )
+    print(
+        f'max event loop lag: async {lag * 1000:.1f} ms, '
+        f'blocking call {blocking_lag * 1000:.1f} ms'
+    )
+    expect('async checks keep the event loop responsive', lag < latency / 2)
+    print(f'stats: {transfer_check_stats()}')
+    return errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--sessions', type=int, default=20)
+    args = parser.parse_args()
+
+    # 回调每次判定都会打日志
+    logging.disable(logging.WARNING)
+    errors = asyncio.run(run(args.latency, args.sessions))
+    print('OK' if not errors else f'{len(errors)} checks failed')
+    return 0 if not errors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
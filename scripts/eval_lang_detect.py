@@ -0,0 +1,80 @@
+"""
+Accuracy check for the offline language detector (utils/lang_utils.py).
+
+Runs detect_language over a labelled set of typical MatMaster prompts and
+reports accuracy on decided samples, the share left to the LLM fallback
+(``None``) and every misclassification.
+
+Usage (from project root):
+    uv run python scripts/eval_lang_detect.py
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.utils.lang_utils import detect_language  # noqa: E402
+
+# (prompt, expected)；expected 为 None 表示应交给 LLM 兜底
+SAMPLES = [
+    ('帮我构建一个 Fe 的 bcc 结构', 'Chinese'),
+    (
+        '用DPA优化这个结构 https://bohrium.oss-cn-zhangjiakou.aliyuncs.com/a.cif',
+        'Chinese',
+    ),
+    ('计算 TiO2 的能带结构', 'Chinese'),
+    ('检索 OPTIMADE 中所有含 Li 和 Co 的氧化物', 'Chinese'),
+    ('请用 ABACUS 计算 Si 的弛豫', 'Chinese'),
+    ('继续', 'Chinese'),
+    ('我想要做一个 LAMMPS 的 NPT 模拟，温度 300K', 'Chinese'),
+    ('帮我画一下这个结构的 XRD 谱', 'Chinese'),
+    ('Calculate the band structure of SnSe', 'English'),
+    ('Please build a bcc Fe supercell and relax it with DPA', 'English'),
+    ('Search for perovskite materials with band gap between 1 and 2 eV', 'English'),
+    ('What is the formation energy of LiFePO4?', 'English'),
+    ('run optimize_structure on POSCAR', 'English'),
+    ('DPA MACE', 'English'),
+    ('Find papers about solid electrolytes', 'English'),
+    ('Calcular la estructura de bandas del silicio por favor', 'Spanish'),
+    ('Calculer la structure de bandes du silicium avec une méthode DFT', 'French'),
+    ('Bitte berechne die Bandstruktur von Silizium mit DFT', 'German'),
+    ('シリコンのバンド構造を計算してください', 'Japanese'),
+    ('실리콘의 밴드 구조를 계산해 주세요', 'Korean'),
+    ('Рассчитайте зонную структуру кремния', 'Russian'),
+    ('احسب بنية النطاق للسيليكون', 'Arabic'),
+    ('https://example.com/structure.cif', None),
+    ('Fe2O3 Li3PO4', None),
+    ('Please help me 优化 structure', None),
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--verbose', action='store_true', help='print every sample')
+    args = parser.parse_args()
+
+    decided = correct = fallback = 0
+    for text, expected in SAMPLES:
+        got = detect_language(text)
+        ok = got == expected
+        if got is None:
+            fallback += 1
+        else:
+            decided += 1
+            correct += int(ok)
+        if args.verbose or not ok:
+            print(f'{"OK  " if ok else "MISS"} expected={expected} got={got}: {text}')
+
+    print(
+        f'samples={len(SAMPLES)} decided={decided} '
+        f'accuracy={correct / max(decided, 1):.1%} llm_fallback={fallback}'
+    )
+    return 0 if correct == decided else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
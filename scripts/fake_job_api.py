@@ -0,0 +1,138 @@
+"""
+Local stand-in for the Bohrium sandbox job API, for offline job polling.
+
+Serves the endpoints the job services use:
+    GET  /job/{job_id}       job detail (Pending -> Running -> Finished/Failed)
+    POST /job/file/token     file token pointing back at this server
+    GET  /api/download/{p}   the job log
+
+Every job finishes --duration seconds after it is first queried; ids starting
+with ``fail`` end as Failed and ids starting with ``missing`` get an API
+error. Requests per job are counted in ``detail_calls``.
+point_job_services_at() redirects services/job.py to a running instance.
+
+Usage (from project root):
+    uv run python scripts/fake_job_api.py --port 8765 --duration 30
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from aiohttp import web
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from agents.matmaster_agent.services import job as job_service  # noqa: E402
+
+# Bohrium 状态码，见 utils/job_utils.mapping_status
+PENDING, RUNNING, FINISHED, FAILED = 0, 1, 2, -1
+
+
+class FakeJobAPI:
+    def __init__(self, duration: float = 30, latency: float = 0.0):
+        self.duration = duration
+        self.latency = latency
+        self.first_seen: dict[str, float] = {}
+        self.detail_calls: Counter[str] = Counter()
+        self.base_url = ''
+        self._runner: web.AppRunner | None = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/job/{job_id}', self.detail)
+        app.router.add_post('/job/file/token', self.token)
+        app.router.add_get('/api/download/{path:.+}', self.download)
+        return app
+
+    def status(self, job_id: str) -> int:
+        elapsed = time.monotonic() - self.first_seen.setdefault(
+            job_id, time.monotonic()
+        )
+        if elapsed < self.duration * 0.1:
+            return PENDING
+        if elapsed < self.duration:
+            return RUNNING
+        return FAILED if job_id.startswith('fail') else FINISHED
+
+    async def detail(self, request: web.Request) -> web.Response:
+        job_id = request.match_info['job_id']
+        self.detail_calls[job_id] += 1
+        await asyncio.sleep(self.latency)
+        if job_id.startswith('missing'):
+            return web.json_response({'code': 404, 'error': 'job not found'})
+        created = datetime.now() - timedelta(
+            seconds=time.monotonic() - self.first_seen.get(job_id, time.monotonic())
+        )
+        return web.json_response(
+            {
+                'code': 0,
+                'data': {
+                    'jobName': f'fake_{job_id}',
+                    'status': self.status(job_id),
+                    'createTime': created.isoformat(timespec='seconds'),
+                    'updateTime': datetime.now().isoformat(timespec='seconds'),
+                },
+            }
+        )
+
+    async def token(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        path = f'{body["jobId"]}/{body["filePath"]}'
+        return web.json_response(
+            {'data': {'host': self.base_url, 'path': path, 'token': 't'}}
+        )
+
+    async def download(self, request: web.Request) -> web.Response:
+        job_id = request.match_info['path'].split('/')[0]
+        return web.Response(text=f'job {job_id} status {self.status(job_id)}\n')
+
+    async def start(self, port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', port)
+        await site.start()
+        self.base_url = f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def point_job_services_at(base_url: str) -> None:
+    """Send services/job.py job detail and file token requests to ``base_url``."""
+    job_service.OpenAPIJobAPI = f'{base_url}/job'
+    job_service.OPENAPI_FILE_TOKEN_API = f'{base_url}/job/file/token'
+
+
+async def _serve(port: int, duration: float) -> None:
+    api = FakeJobAPI(duration)
+    base_url = await api.start(port)
+    print(f'fake job API on {base_url}/job (Ctrl+C to stop)')
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--duration', type=float, default=30)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.port, args.duration))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
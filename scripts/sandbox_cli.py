@@ -3,7 +3,6 @@ import asyncio
 import json
 import os
 import sys
-import time
 from datetime import datetime
 
 import aiohttp
@@ -15,8 +14,10 @@ from toolsy.logger import init_colored_logger
 from agents.matmaster_agent.constant import OpenAPIJobAPI
 from agents.matmaster_agent.services.job import (
     check_status_and_download_file,
+    get_job_detail,
     get_token_and_download_file,
 )
+from agents.matmaster_agent.services.job_watcher import JobWatcher
 from agents.matmaster_agent.utils.job_utils import mapping_status
 from scripts.sandbox_api import (
     kill_job,
@@ -57,49 +58,56 @@ def get_duration(create_time, update_time):
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
 
-def poll_job_status(job_id, interval=10):
-    """轮询作业状态并在每次轮询时下载最新的日志"""
-    logger.info(f"开始轮询作业 {job_id} 的状态 (间隔: {interval} 秒)")
-
-    while True:
-        try:
-            response = requests.get(
-                f"{OpenAPIJobAPI}/{job_id}?accessKey={os.getenv('MATERIALS_ACCESS_KEY')}"
-            )
-            response.raise_for_status()
-            job_info = response.json()
-
-            if job_info.get('code') != 0:
-                logger.error(f"API返回错误: {job_info}")
-                break
-
-            create_time = job_info['data']['createTime']
-            update_time = job_info['data']['updateTime']
-            duration = get_duration(create_time, update_time)
-            job_status = mapping_status(job_info['data']['status'])
-            job_name = job_info['data']['jobName']
-            logger.info(f"{job_name}[{job_status}] -- {duration}")
+async def poll_job_status(
+    job_id, access_key, interval=10, max_interval=120, max_errors=5
+):
+    """
+    通过 JobWatcher 跟踪作业状态（状态不变时间隔从 interval 退避到 max_interval），
+    每次状态变化时下载最新的日志，作业结束后返回最终状态；
+    连续 max_errors 次查询失败时停止轮询并返回 None
+    """
+    logger.info(f"开始轮询作业 {job_id} 的状态 (间隔: {interval}~{max_interval} 秒)")
+
+    job_info = {}
+
+    async def fetch_status(job_id, access_key):
+        res = await get_job_detail(job_id=job_id, access_key=access_key)
+        if res.get('code') != 0:
+            raise RuntimeError(f"API返回错误: {res}")
+        job_info.update(res['data'])
+        return mapping_status(res['data']['status'])
+
+    watcher = JobWatcher(fetch_status, min_interval=interval, max_interval=max_interval)
+    events = watcher.subscribe('sandbox_cli')
+    watcher.watch(job_id, access_key, 'sandbox_cli', job_id)
+    errors = 0
+    try:
+        while True:
+            event = await events.get()
+            if event.error:
+                errors += 1
+                logger.error(f"查询作业状态失败 ({errors}/{max_errors}): {event.error}")
+                if errors >= max_errors:
+                    logger.error('连续查询失败，停止轮询')
+                    return None
+                continue
+            errors = 0
+
+            duration = get_duration(job_info['createTime'], job_info['updateTime'])
+            logger.info(f"{job_info['jobName']}[{event.status}] -- {duration}")
 
             # 下载日志
-            get_token_and_download_file('log', job_id)
+            try:
+                await get_token_and_download_file('log', job_id, access_key)
+            except aiohttp.ClientError as e:
+                logger.error(f"日志下载失败: {e}")
 
             # 如果作业已结束，则退出轮询
-            if job_status in ['Finished', 'Failed', 'Killed']:
-                logger.info(f"作业状态为 {job_status}，停止轮询")
-                break
-
-            # 等待下次轮询
-            time.sleep(interval)
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"网络请求失败: {e}")
-            time.sleep(interval)
-        except KeyboardInterrupt:
-            logger.info('用户中断轮询')
-            break
-        except Exception as e:
-            logger.error(f"轮询过程中发生错误: {e}")
-            time.sleep(interval)
+            if event.terminal:
+                logger.info(f"作业状态为 {event.status}，停止轮询")
+                return event.status
+    finally:
+        await watcher.close()
 
 
 async def main():
@@ -136,7 +144,19 @@ async def main():
         '--interval',
         type=int,
         default=10,
-        help='Polling interval in seconds (default: 10)',
+        help='Initial polling interval in seconds (default: 10)',
+    )
+    poll_parser.add_argument(
+        '--max-interval',
+        type=int,
+        default=120,
+        help='Polling interval cap while the status is unchanged (default: 120)',
+    )
+    poll_parser.add_argument(
+        '--max-errors',
+        type=int,
+        default=5,
+        help='Stop after this many consecutive failed status checks (default: 5)',
     )
 
     args = parser.parse_args()
@@ -208,7 +228,13 @@ async def main():
     elif args.command == 'kill':
         kill_job(args.job_id)
     elif args.command == 'poll':
-        poll_job_status(args.job_id, args.interval)
+        await poll_job_status(
+            args.job_id,
+            access_key,
+            args.interval,
+            args.max_interval,
+            args.max_errors,
+        )
 
 
 if __name__ == '__main__':